@@ -0,0 +1,122 @@
+# Anggaran token per panggilan Gemini. Konteks yang melebihi anggaran dipadatkan (spasi
+# berlebih dibuang) lalu dipangkas per passage berdasarkan prioritas: urutan asli (peringkat
+# mesin pencari / BM25), kecocokan dengan kata kunci, dan kepadatan data angka/tabel.
+# Passage terpilih disusun kembali sesuai urutan aslinya.
+import re
+
+from ringkasan import KARAKTER_PER_TOKEN, perkiraan_token
+
+POLA_KATA = re.compile(r"\w{3,}")
+POLA_ANGKA = re.compile(r"\d+(?:[.,]\d+)*")
+POLA_SPASI = re.compile(r"[ \t\u00a0]+")
+POLA_BARIS_KOSONG = re.compile(r"\n\s*\n+")
+MAX_TOKEN_PASSAGE = 1000  # Passage yang lebih besar dipecah per baris agar bisa dipilih sebagian
+MIN_TOKEN_POTONGAN = 100  # Sisa anggaran di bawah ini tidak dipakai untuk memotong passage
+AKHIR_KALIMAT = (".", "!", "?", ":")
+
+
+def padatkan(teks):
+    # Kompresi murah tanpa kehilangan isi: spasi beruntun dan baris kosong berlebih dibuang
+    return POLA_BARIS_KOSONG.sub("\n\n", POLA_SPASI.sub(" ", teks)).strip()
+
+
+def _pecah_besar(passage, max_token):
+    # Teks PDF jarang memiliki baris kosong antar paragraf; baris yang mengakhiri kalimat dipakai
+    # sebagai titik potong yang disukai sehingga isi yang sama cenderung terpotong di tempat yang sama
+    if perkiraan_token(passage) <= max_token:
+        return [passage]
+    batas_karakter = max_token * KARAKTER_PER_TOKEN
+    potongan, sekarang, panjang = [], [], 0
+    for baris in passage.splitlines() or [passage]:
+        while len(baris) > batas_karakter:
+            potongan.append(baris[:batas_karakter])
+            baris = baris[batas_karakter:]
+        if panjang + len(baris) > batas_karakter and sekarang:
+            potongan.append("\n".join(sekarang))
+            sekarang, panjang = [], 0
+        sekarang.append(baris)
+        panjang += len(baris) + 1
+        if panjang >= batas_karakter // 2 and baris.rstrip().endswith(AKHIR_KALIMAT):
+            potongan.append("\n".join(sekarang))
+            sekarang, panjang = [], 0
+    if sekarang:
+        potongan.append("\n".join(sekarang))
+    return potongan
+
+
+def pecah_passage(konteks, max_token=MAX_TOKEN_PASSAGE):
+    return [
+        bagian for passage in konteks.split("\n\n") if passage.strip()
+        for bagian in _pecah_besar(passage.strip(), max_token)
+    ]
+
+
+def skor_passage(passage, posisi, jumlah, kata_kueri, utamakan_angka):
+    skor = 1 - posisi / jumlah  # Passage awal biasanya dari sumber peringkat teratas
+    if kata_kueri:
+        skor += len(kata_kueri & set(POLA_KATA.findall(passage.lower()))) / len(kata_kueri)
+    # Angka dan tabel adalah bahan utama brief berbasis data dan grafik
+    kepadatan_angka = min(1.0, len(POLA_ANGKA.findall(passage)) / max(1, len(passage) / 200))
+    skor += kepadatan_angka * (2.0 if utamakan_angka else 0.5)
+    if "|" in passage and "---" in passage:
+        skor += 1.0 if utamakan_angka else 0.3
+    return skor
+
+
+def potong_di_kalimat(passage, batas_token):
+    teks = passage[:batas_token * KARAKTER_PER_TOKEN]
+    akhir = teks.rfind(". ")
+    return teks[:akhir + 1] if akhir > len(teks) // 2 else teks
+
+
+def sesuaikan_anggaran(konteks, batas_token, kueri="", utamakan_angka=False, hitung=perkiraan_token):
+    # Mengembalikan (konteks_baru, info). hitung(teks) bisa diganti penghitung token yang lebih
+    # akurat; pemilihan passage tetap memakai perkiraan lokal agar cepat.
+    token_awal = hitung(konteks)
+    info = {"token_awal": token_awal, "token_akhir": token_awal, "dipangkas": False}
+    if token_awal <= batas_token:
+        return konteks, info
+
+    konteks = padatkan(konteks)
+    token_padat = hitung(konteks)
+    if token_padat <= batas_token:
+        info.update(token_akhir=token_padat, dipangkas=True)
+        return konteks, info
+
+    passage = pecah_passage(konteks)
+    kata_kueri = set(POLA_KATA.findall(kueri.lower()))
+    urutan = sorted(
+        range(len(passage)),
+        key=lambda i: -skor_passage(passage[i], i, len(passage), kata_kueri, utamakan_angka),
+    )
+    # Perkiraan lokal diskalakan ke penghitung yang dipakai agar anggaran tetap konsisten
+    skala = token_padat / max(1, perkiraan_token(konteks))
+    sisa = batas_token / skala
+    terpilih = {}
+    for i in urutan:
+        token = perkiraan_token(passage[i]) + 1
+        if token <= sisa:
+            terpilih[i] = passage[i]
+            sisa -= token
+        elif sisa >= MIN_TOKEN_POTONGAN or not terpilih:
+            terpilih[i] = potong_di_kalimat(passage[i], int(sisa))
+            sisa = 0
+        if sisa < 1:
+            break
+
+    hasil = "\n\n".join(terpilih[i] for i in sorted(terpilih))
+    info.update(
+        token_akhir=hitung(hasil),
+        dipangkas=True,
+        passage_awal=len(passage),
+        passage_dipakai=len(terpilih),
+    )
+    return hasil, info
+
+
+def pemakaian_token(prompt, teks, usage=None):
+    # Jumlah token satu panggilan: dari usage_metadata Gemini jika ada, selain itu perkiraan lokal
+    token_prompt = getattr(usage, "prompt_token_count", 0)
+    if token_prompt:
+        return {"token_prompt": token_prompt, "token_jawaban": getattr(usage, "candidates_token_count", 0), "token_dari": "api"}
+    return {"token_prompt": perkiraan_token(prompt), "token_jawaban": perkiraan_token(teks or ""), "token_dari": "perkiraan"}
@@ -1,14 +1,28 @@
 # Import library yang dibutuhkan
 import streamlit as st
-import pandas as pd
-import altair as alt
-import google.generativeai as genai
-from duckduckgo_search import DDGS
-from googlesearch import search
-import fitz  # PyMuPDF
-import io
-from docx import Document # Library baru untuk Word
+import sqlite3
 import time
+import uuid
+import ketahanan
+import pelacakan
+from arsip import ArsipBrief, kata_kunci_file, sidik_pdf, sidik_web
+from ekstraksi_pdf import kunci_ekstraksi
+from klien import KumpulanKlien
+from pekerjaan import PelaksanaPekerjaan
+from unggahan import BatasUnggahanTerlampaui, KuotaUnggahan
+from waktu_impor import impor, laporan as laporan_waktu_impor
+from pipeline import (
+    PembuatBrief,
+    Pengaturan,
+    atur_ketahanan,
+    buat_chart_dari_spesifikasi,
+    buat_cache_llm,
+    buat_cache_pencarian,
+    buat_model,
+    buat_rute_model,
+    buat_sumber_info_pdf,
+    convert_to_docx,
+)
 
 # ===================================================================
 # KONFIGURASI HALAMAN
@@ -20,232 +34,606 @@ st.set_page_config(
 # ===================================================================
 
 # --- KONFIGURASI AI ---
+# Klien Gemini dibuat sekali per proses, bukan di setiap rerun script
+@st.cache_resource
+def get_model(api_key, nama_model):
+    return buat_model(api_key, Pengaturan(nama_model=nama_model))
+
 try:
-    genai.configure(api_key=st.secrets["GOOGLE_API_KEY"])
-    model = genai.GenerativeModel('gemini-1.5-flash')
+    PENGATURAN = Pengaturan.dari_mapping(st.secrets)
+    atur_ketahanan(PENGATURAN)  # Batas laju per backend, dibagi semua sesi
+    model = get_model(st.secrets["GOOGLE_API_KEY"], PENGATURAN.nama_model)
 except (KeyError, AttributeError):
     st.error("🚨 Kunci API Google tidak ditemukan! Pastikan file .streamlit/secrets.toml sudah benar.")
     st.stop()
+except ValueError as e:
+    st.error(f"🚨 Pengaturan di .streamlit/secrets.toml tidak valid: {e}")
+    st.stop()
 
-# --- FUNGSI-FUNGSI UTAMA ---
-
-def convert_to_docx(markdown_text):
-    document = Document()
-    # Membersihkan judul dari format markdown '**'
-    title_raw = markdown_text.split('\n')[0]
-    title_text = title_raw.replace('**Judul:**', '').strip()
-    
-    document.add_heading(title_text, level=1)
-    
-    # Mengambil sisa konten
-    content_lines = markdown_text.split('\n')[1:]
-    
-    for line in content_lines:
-        stripped_line = line.strip()
-        if stripped_line.startswith('###'):
-            heading_text = stripped_line.replace('###', '').strip()
-            document.add_heading(heading_text, level=3)
-        elif stripped_line.startswith('- '):
-             # Menambahkan list bullet sederhana
-            document.add_paragraph(stripped_line.replace('- ','').strip(), style='List Bullet')
-        elif stripped_line:
-            # Mengabaikan garis pemisah tabel markdown agar tidak tercetak
-            if '|' in stripped_line and '---' in stripped_line:
-                continue
-            # Menambahkan paragraf biasa (termasuk baris tabel)
-            document.add_paragraph(stripped_line)
-            
-    bio = io.BytesIO()
-    document.save(bio)
-    return bio.getvalue()
-
-# ... (Semua fungsi lain seperti extract_text_from_pdf, cari_dengan_duckduckgo, generate_brief_dengan_ai, dll. tetap sama) ...
-def extract_text_from_pdf(pdf_file):
-    st.write("📄 Mengekstrak teks dari file PDF...")
+# --- KONFIGURASI CACHE ---
+# Cache pencarian web dan jawaban Gemini dibagi ke semua sesi; TTL dan batas entri
+# bisa diatur lewat secrets.toml (lihat pipeline.KUNCI_PENGATURAN)
+@st.cache_resource
+def get_cache_pencarian():
+    return buat_cache_pencarian(PENGATURAN)
+
+@st.cache_resource
+def get_cache_llm():
+    return buat_cache_llm(PENGATURAN)
+
+# Rute model per tugas (brief, grafik, ringkasan) dan statistiknya dibagi ke semua sesi
+@st.cache_resource
+def get_rute_model(_model):
+    return buat_rute_model(PENGATURAN, _model)
+
+# Klien jaringan bersama: dibuat dan dipanaskan di latar belakang oleh sesi pertama,
+# lalu dipakai ulang oleh semua sesi berikutnya
+@st.cache_resource
+def get_klien(_model):
+    return KumpulanKlien(_model).panaskan()
+
+# Endpoint /metrics (Prometheus) dijalankan sekali per proses jika METRICS_PORT diisi
+@st.cache_resource
+def get_server_metrik(port):
     try:
-        doc = fitz.open(stream=pdf_file.read(), filetype="pdf")
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        doc.close()
-        st.success("Ekstraksi teks dari PDF berhasil!")
-        return text
-    except Exception as e:
-        st.error(f"Gagal memproses file PDF: {e}")
+        return pelacakan.mulai_server_metrik(port)
+    except OSError as e:
+        st.sidebar.warning(f"Endpoint metrik di port {port} gagal dijalankan: {e}")
         return None
-def cari_dengan_duckduckgo(keyword):
-    st.write("🔎 Mencari dengan **DuckDuckGo**...")
-    keyword_lokal = f'"{keyword} jawa tengah"'
-    query = f'{keyword_lokal} (site:jatengprov.go.id OR site:rin.brin.go.id OR site:undip.ac.id OR site:uns.ac.id OR site:unnes.ac.id OR site:walisongo.ac.id OR site:sinta.kemdikbud.go.id)'
-    try:
-        with DDGS() as ddgs:
-            results = [r for r in ddgs.text(query, max_results=7)]
-        if not results: return None, None
-        snippets = [result['body'] for result in results]
-        konteks = "\n\n".join(snippets)
-        source_urls = [result['href'] for result in results]
-        return konteks, source_urls
-    except Exception as e:
-        st.error(f"Error DuckDuckGo: {e}")
-        return None, None
-def cari_dengan_google(keyword):
-    st.write("🔎 Mencari dengan **Google**...")
-    keyword_lokal = f'"{keyword} jawa tengah"'
-    query = f'{keyword_lokal} (site:jatengprov.go.id OR site:rin.brin.go.id OR site:undip.ac.id OR site:uns.ac.id OR site:unnes.ac.id OR site:walisongo.ac.id OR site:sinta.kemdikbud.go.id)'
+
+if PENGATURAN.port_metrik:
+    get_server_metrik(PENGATURAN.port_metrik)
+
+# Pekerjaan pembuatan brief berjalan di worker latar belakang dan disimpan per sesi,
+# sehingga rerun atau refresh browser tidak membatalkan proses yang sedang berjalan
+@st.cache_resource
+def get_pelaksana():
+    return PelaksanaPekerjaan(max_paralel=PENGATURAN.max_pekerjaan)
+
+# Unggahan PDF disalin ke file sementara di disk; pekerjaan hanya memegang path-nya
+@st.cache_resource
+def get_kuota_unggahan():
+    return KuotaUnggahan(PENGATURAN.batas_ukuran_pdf_mb, PENGATURAN.batas_unggahan_sesi_mb)
+
+# Arsip brief dibagi ke semua sesi dan tetap ada setelah server dimulai ulang
+@st.cache_resource
+def get_arsip():
+    return ArsipBrief(PENGATURAN.arsip_path)
+
+# Topik web di arsip diindeks sekali per proses agar topik yang mirip (bukan hanya sama persis)
+# bisa memakai brief yang sudah ada
+@st.cache_resource
+def get_cache_semantik():
+    cache = impor("cache_semantik").CacheSemantik()  # Memuat numpy, jadi tidak diimpor di awal
+    for sidik, kueri in get_arsip().daftar_sidik("web"):
+        cache.tambah(sidik, kueri)
+    return cache
+
+# ID sesi disimpan di URL agar pekerjaan masih bisa dibuka setelah halaman di-refresh
+if "sesi" not in st.query_params:
+    st.query_params["sesi"] = uuid.uuid4().hex[:16]
+ID_SESI = st.query_params["sesi"]
+
+# Objek bersama diambil di thread script, lalu dipakai oleh worker pekerjaan
+KOMPONEN_PEMBUAT = (model, get_cache_llm(), get_cache_pencarian(), PENGATURAN)
+KLIEN = get_klien(model)
+RUTE = get_rute_model(model)
+ARSIP = get_arsip()
+SEMANTIK = get_cache_semantik()
+
+def buat_pembuat(lapor):
+    return PembuatBrief(*KOMPONEN_PEMBUAT, lapor=lapor, klien=KLIEN, rute=RUTE)
+
+def arsipkan(lapor, **brief):
+    # Gagal menyimpan ke arsip tidak menggagalkan pekerjaan yang briefnya sudah jadi
     try:
-        search_results_urls = [url for url in search(query, num_results=10, sleep_interval=2)]
-        if not search_results_urls: return None, None
-        konteks = "Daftar sumber relevan:\n" + "\n".join(f"- {url}" for url in search_results_urls)
-        return konteks, search_results_urls
-    except Exception as e:
-        st.error(f"Error Google: {e}")
-        return None, None
-def generate_brief_dengan_ai(sumber_info, konteks):
-    st.write("🤖 AI menganalisis & menyusun draf teks...")
-    prompt = f"""
-    Anda adalah seorang analis kebijakan publik senior yang sangat teliti dan analitis.
-    Tugas Anda adalah melakukan SINTESIS komprehensif dari informasi dalam 'KONTEKS' untuk menyusun draf policy brief yang kaya data dan mendalam.
-    Sumber informasi untuk analisis ini adalah: {sumber_info}.
-    INSTRUKSI PENTING:
-    -   Gunakan HANYA informasi dari 'KONTEKS'.
-    -   Jika menemukan data perbandingan atau statistik, formatlah dalam Tabel Markdown.
-    -   Jangan membuat bagian referensi atau grafik, karena itu akan ditambahkan oleh sistem.
-    KONTEKS:
-    ---
-    {konteks}
-    ---
-    Setelah menganalisis, tuliskan draf policy brief dengan format berikut (HANYA 4 bagian ini):
-    **Judul:** [Judul yang tajam dan mencerminkan analisis]
-    ### 1. Ringkasan Eksekutif
-    [Ringkasan padat, sertakan 1-2 data kunci, dan sebutkan rekomendasi utama.]
-    ### 2. Pendahuluan
-    [Latar belakang masalah dengan data skala dan urgensi.]
-    ### 3. Temuan dan Pembahasan Mendalam
-    [Susun pembahasan berdasarkan TEMA UTAMA. Sajikan data, gunakan tabel jika cocok, bandingkan informasi, dan berikan analisis.]
-    ### 4. Rekomendasi Kebijakan Berbasis Bukti (Evidence-Based)
-    [Rekomendasi yang SPESIFIK, TERUKUR, dan dapat DILAKSANAKAN.]
-    """
+        ARSIP.simpan(**brief)
+    except sqlite3.Error as e:
+        lapor.warning(f"Brief tidak tersimpan ke arsip: {e}")
+        return
+    if brief["jenis"] == "web":
+        SEMANTIK.tambah(brief["sidik"], brief["kueri"])
+
+def pekerjaan_web(search_engine, keyword, pakai_cache):
+    def jalankan(lapor):
+        pembuat = buat_pembuat(lapor)
+        konteks, sumber_referensi = pembuat.cari_web(search_engine, keyword, pakai_cache=pakai_cache)
+        if not (konteks and sumber_referensi):
+            raise RuntimeError("Pencarian web tidak menemukan hasil.")
+        hasil_brief, kode_grafik = pembuat.generate_brief_dan_grafik(
+            f"Pencarian web: '{keyword}'", konteks, saat_stream=lapor.stream
+        )
+        if not hasil_brief:
+            raise RuntimeError("AI gagal menyusun draf brief.")
+        arsipkan(
+            lapor, jenis="web", kueri=keyword, hasil_brief=hasil_brief, kode_grafik=kode_grafik,
+            sumber_referensi=sumber_referensi, sidik=sidik_web(search_engine, keyword), sidik_sumber=sumber_referensi,
+        )
+        return {
+            "hasil_brief": hasil_brief,
+            "kode_grafik": kode_grafik,
+            "sumber_referensi": sumber_referensi,
+            "sumber_dokumen": None,
+            "keyword": keyword.replace(' ', '_'),
+            "hasil_per_file": None,
+            "jejak": pembuat.jejak,
+        }
+    return jalankan
+
+def pekerjaan_pdf(daftar_berkas, fokus_topik, mode_brief, batas_paralel, rentang):
+    def jalankan(lapor):
+        # File sementara dihapus dan kuota sesi dilepas apa pun hasil pekerjaannya
+        try:
+            return proses_pdf(lapor)
+        finally:
+            for berkas in daftar_berkas:
+                get_kuota_unggahan().lepas(berkas)
+
+    def proses_pdf(lapor):
+        pembuat = buat_pembuat(lapor)
+        dokumen = pembuat.extract_text_dari_banyak_pdf([(b.nama, b.path) for b in daftar_berkas], rentang)
+        if not dokumen:
+            raise RuntimeError("Teks PDF tidak dapat diekstrak.")
+        if mode_brief == "Satu brief per file":
+            hasil_per_file = pembuat.generate_brief_per_file(dokumen, fokus_topik, batas_paralel)
+            for (nama, kunci, _), hasil in zip(dokumen, hasil_per_file):
+                if hasil["hasil_brief"]:
+                    arsipkan(
+                        lapor, jenis="pdf", kueri=kueri_pdf([nama], fokus_topik), hasil_brief=hasil["hasil_brief"],
+                        kode_grafik=hasil["kode_grafik"], sumber_dokumen=[nama],
+                        sidik=sidik_pdf([kunci], fokus_topik), sidik_sumber=[kunci],
+                    )
+            return {
+                "hasil_brief": None,
+                "hasil_per_file": hasil_per_file,
+                "jejak": pembuat.jejak,
+            }
+        daftar_nama = [nama for nama, _, _ in dokumen]
+        if len(dokumen) == 1:
+            nama, kunci_dokumen, teks = dokumen[0]
+            konteks_pdf = pembuat.siapkan_konteks_pdf(teks, kunci_dokumen, fokus_topik)
+            keyword = nama.split('.')[0].replace(' ', '_')
+        else:
+            konteks_pdf = pembuat.gabungkan_konteks_pdf(dokumen, fokus_topik)
+            keyword = f"gabungan_{len(dokumen)}_dokumen"
+        hasil_brief, kode_grafik = pembuat.generate_brief_dan_grafik(
+            buat_sumber_info_pdf(daftar_nama, fokus_topik), konteks_pdf, saat_stream=lapor.stream
+        )
+        if not hasil_brief:
+            raise RuntimeError("AI gagal menyusun draf brief.")
+        daftar_kunci = [kunci for _, kunci, _ in dokumen]
+        arsipkan(
+            lapor, jenis="pdf", kueri=kueri_pdf(daftar_nama, fokus_topik), hasil_brief=hasil_brief,
+            kode_grafik=kode_grafik, sumber_dokumen=daftar_nama,
+            sidik=sidik_pdf(daftar_kunci, fokus_topik), sidik_sumber=daftar_kunci,
+        )
+        return {
+            "hasil_brief": hasil_brief,
+            "kode_grafik": kode_grafik,
+            "sumber_referensi": None,  # Tidak ada referensi URL untuk PDF
+            "sumber_dokumen": daftar_nama,
+            "keyword": keyword,
+            "hasil_per_file": None,
+            "jejak": pembuat.jejak,
+        }
+    return jalankan
+
+def kueri_pdf(daftar_nama, fokus_topik):
+    return ", ".join(daftar_nama) + (f" — {fokus_topik}" if fokus_topik else "")
+
+def kirim_pekerjaan(judul, fungsi):
+    pekerjaan = get_pelaksana().kirim(ID_SESI, judul, fungsi)
+    st.session_state.pekerjaan_terakhir = pekerjaan.id
+    st.toast(f"Pekerjaan '{judul}' dimulai di latar belakang.")
+
+def muat_hasil(pekerjaan):
+    st.session_state.update(pekerjaan.hasil)
+    st.session_state.pekerjaan_ditampilkan = pekerjaan.id
+    st.session_state.dari_arsip = None
+
+def muat_arsip(brief):
+    # Brief dari arsip ditampilkan langsung, tanpa pencarian maupun panggilan Gemini
+    st.session_state.update({
+        "hasil_brief": brief["hasil_brief"],
+        "kode_grafik": brief["kode_grafik"],
+        "sumber_referensi": brief["sumber_referensi"],
+        "sumber_dokumen": brief["sumber_dokumen"],
+        "keyword": kata_kunci_file(brief["kueri"]),
+        "hasil_per_file": None,
+        "jejak": None,
+        "pekerjaan_ditampilkan": None,
+        "dari_arsip": brief["dibuat"],
+    })
+
+# --- MEMOISASI HASIL ---
+# Dokumen Word dan grafik dibuat sekali per isi brief / kode grafik (di-hash oleh Streamlit),
+# bukan di setiap rerun atau setiap kali tombol diklik
+# _jejak (tidak ikut di-hash) menerima span durasi untuk panel debug
+@st.cache_data(max_entries=64, show_spinner=False)
+def buat_docx(hasil_brief, _jejak=None):
+    return convert_to_docx(hasil_brief, jejak=_jejak)
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def buat_grafik(kode_grafik, _jejak=None):
+    # Mengembalikan (chart, pesan_error) agar kode yang gagal juga tidak dijalankan ulang.
+    # Mode terstruktur menghasilkan dict spesifikasi yang digambar tanpa exec.
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        with pelacakan.span("grafik", jejak=_jejak, terstruktur=isinstance(kode_grafik, dict)):
+            if isinstance(kode_grafik, dict):
+                return buat_chart_dari_spesifikasi(kode_grafik), None
+            # pandas dan altair baru dimuat saat ada grafik yang perlu ditampilkan
+            ruang_nama = {"pd": impor("pandas"), "alt": impor("altair")}
+            exec(kode_grafik, ruang_nama)
+            return ruang_nama['chart'], None
     except Exception as e:
-        st.error(f"Error saat generate brief: {e}")
-        return None
-def generate_chart_code(konteks):
-    st.write("📊 AI merancang kode untuk visualisasi data (fokus pada bar chart)...")
-    prompt = f"""
-    Anda adalah seorang spesialis visualisasi data menggunakan Python dan Altair.
-    Tugas Anda adalah menganalisis teks 'KONTEKS' dan membuat satu buah kode Python sederhana untuk memvisualisasikan data yang paling penting dari teks tersebut.
-    KONTEKS:
-    ---
-    {konteks}
-    ---
-    INSTRUKSI KODE YANG SANGAT KETAT:
-    1.  Cari data numerik yang bisa dibandingkan. Prioritaskan data perbandingan antar kategori atau wilayah.
-    2.  **Fokus utama adalah membuat diagram batang (bar chart) sederhana menggunakan `alt.Chart(data).mark_bar()`.** Jangan gunakan jenis chart lain kecuali sangat terpaksa.
-    3.  Jika tidak ada data yang cocok untuk divisualisasikan, cukup kembalikan teks: #TIDAK_ADA_DATA
-    4.  Pastikan kode lengkap, termasuk pembuatan `pandas.DataFrame`. Data dalam DataFrame harus berupa list sederhana.
-    5.  Variabel final yang berisi chart **HARUS** bernama `chart`.
-    6.  Jangan menulis `st.altair_chart(chart)` atau `print()`. Hanya kode pembuatan objek chart-nya saja.
-    Contoh Sempurna:
-    ```python
-    import pandas as pd
-    import altair as alt
-    # Data sederhana dalam DataFrame
-    data_source = pd.DataFrame({{'Kategori': ['UMKM Go Digital', 'UMKM Tradisional'],'Jumlah': [1500, 4500]}})
-    # Pembuatan chart yang simpel dan pasti berhasil
-    chart = alt.Chart(data_source).mark_bar().encode(
-        x=alt.X('Kategori:N', title='Jenis UMKM', sort=None),
-        y=alt.Y('Jumlah:Q', title='Jumlah UMKM'),
-        tooltip=['Kategori', 'Jumlah']
-    ).properties(
-        title='Perbandingan Jumlah UMKM'
+        return None, str(e)
+
+def tampilkan_hasil(hasil_brief, kode_grafik, sumber_referensi, keyword, sumber_dokumen=None, kunci=None):
+    # Tombol Unduh ditempatkan di atas agar mudah diakses; mengunduh tidak memicu rerun.
+    # kunci membedakan tombol saat beberapa hasil tampil bersamaan (nama file bisa sama).
+    st.download_button(
+        label="📥 Unduh sebagai .docx",
+        data=buat_docx(hasil_brief, st.session_state.get('jejak')),
+        file_name=f"policy_brief_{keyword}.docx",
+        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        key=f"unduh_{kunci or keyword}",
+        on_click="ignore",
     )
-    ```
-    """
-    try:
-        response = model.generate_content(prompt)
-        clean_code = response.text.replace("```python", "").replace("```", "").strip()
-        return clean_code
-    except Exception as e:
-        st.error(f"Error saat generate chart code: {e}")
-        return None
+
+    st.markdown(hasil_brief)
+
+    if kode_grafik and (isinstance(kode_grafik, dict) or "#TIDAK_ADA_DATA" not in kode_grafik):
+        st.markdown("### Visualisasi Data Kunci")
+        chart, pesan_error = buat_grafik(kode_grafik, st.session_state.get('jejak'))
+        if chart is not None:
+            st.altair_chart(chart, use_container_width=True)
+        else:
+            st.warning(f"Gagal membuat grafik: {pesan_error}")
+            if isinstance(kode_grafik, dict):
+                st.json(kode_grafik)
+            else:
+                st.code(kode_grafik)
+
+    if sumber_referensi:
+        st.markdown("### Referensi")
+        for url in sumber_referensi:
+            st.markdown(f"- {url}")
+    else:
+        st.markdown("### Sumber Dokumen")
+        if sumber_dokumen:
+            for nama in sumber_dokumen:
+                st.markdown(f"- {nama}")
+        st.info(f"Analisis ini dibuat berdasarkan dokumen yang diunggah.")
 
 # --- TAMPILAN UTAMA APLIKASI ---
 st.title("📄 Policy Brief Generator Pro")
 st.write("Alat bantu AI untuk menyusun draf *policy brief* dari berbagai sumber.")
 
-tab1, tab2 = st.tabs(["Cari dari Web 🌐", "Unggah Dokumen PDF 📄"])
+tab1, tab2, tab3 = st.tabs(["Cari dari Web 🌐", "Unggah Dokumen PDF 📄", "Arsip Brief 🗄️"])
 
 # --- Logika untuk TAB 1: CARI DARI WEB ---
 with tab1:
     st.header("Analisis Berdasarkan Pencarian Web")
     with st.form("search_form"):
         keyword_input = st.text_input("Masukkan Topik:", placeholder="Contoh: digitalisasi umkm di solo")
-        search_engine = st.radio("Mesin Pencari:", ('DuckDuckGo', 'Google'), horizontal=True)
+        search_engine = st.radio("Mesin Pencari:", ('DuckDuckGo', 'Google', 'Keduanya'), horizontal=True)
+        abaikan_cache = st.checkbox("Abaikan cache dan arsip (paksa pencarian baru)")
         submitted_search = st.form_submit_button("🚀 Buat Draf dari Web")
 
     if submitted_search and keyword_input:
-        with st.spinner("Proses analisis komprehensif dari web..."):
-            konteks, sumber_referensi = (None, None)
-            if search_engine == 'DuckDuckGo':
-                konteks, sumber_referensi = cari_dengan_duckduckgo(keyword_input)
-            else:
-                konteks, sumber_referensi = cari_dengan_google(keyword_input)
+        st.session_state.tawaran_semantik = None
+        # Topik yang sama dengan mesin pencari yang sama langsung dibuka dari arsip
+        arsip_lama = None if abaikan_cache else ARSIP.ambil_sidik(sidik_web(search_engine, keyword_input))
+        mirip = []
+        if not arsip_lama and not abaikan_cache and PENGATURAN.ambang_semantik:
+            with pelacakan.span("cache_semantik", topik=len(SEMANTIK)) as atribut:
+                mirip = SEMANTIK.cari(keyword_input, PENGATURAN.ambang_semantik)
+                atribut["hit"] = bool(mirip)
+        if arsip_lama:
+            muat_arsip(arsip_lama)
+            st.toast("Brief untuk topik ini dibuka dari arsip.")
+        elif mirip:
+            # Topik yang hanya mirip ditawarkan dulu; pengguna memilih memakai atau membuat baru
+            sidik, kueri, skor = mirip[0]
+            st.session_state.tawaran_semantik = {
+                "sidik": sidik, "kueri": kueri, "skor": skor,
+                "search_engine": search_engine, "keyword": keyword_input,
+            }
+        else:
+            kirim_pekerjaan(
+                f"Web ({search_engine}): {keyword_input}",
+                pekerjaan_web(search_engine, keyword_input, pakai_cache=not abaikan_cache),
+            )
+
+    tawaran = st.session_state.get('tawaran_semantik')
+    if tawaran:
+        with st.container(border=True):
+            st.info(
+                f"Topik serupa sudah ada di arsip: **{tawaran['kueri']}** (kemiripan {tawaran['skor']:.0%}). "
+                "Brief itu bisa dipakai tanpa pencarian dan panggilan AI baru."
+            )
+            kolom_pakai, kolom_baru = st.columns(2)
+            if kolom_pakai.button("🗄️ Pakai brief yang ada"):
+                st.session_state.tawaran_semantik = None
+                brief = ARSIP.ambil_sidik(tawaran['sidik'])
+                if brief:
+                    muat_arsip(brief)
+                else:
+                    SEMANTIK.hapus(tawaran['sidik'])
+                    st.toast("Brief tersebut sudah dihapus dari arsip.")
+                st.rerun()
+            if kolom_baru.button("🚀 Tetap buat baru"):
+                st.session_state.tawaran_semantik = None
+                kirim_pekerjaan(
+                    f"Web ({tawaran['search_engine']}): {tawaran['keyword']}",
+                    pekerjaan_web(tawaran['search_engine'], tawaran['keyword'], pakai_cache=True),
+                )
+                st.rerun()
 
-            if konteks and sumber_referensi:
-                st.session_state.hasil_brief = generate_brief_dengan_ai(f"Pencarian web: '{keyword_input}'", konteks)
-                st.session_state.kode_grafik = generate_chart_code(konteks)
-                st.session_state.sumber_referensi = sumber_referensi
-                st.session_state.keyword = keyword_input.replace(' ', '_')
+    statistik_cache = get_cache_pencarian().statistik()
+    statistik_semantik = SEMANTIK.statistik()
+    st.caption(
+        f"Cache pencarian: {statistik_cache['hit']} hit, {statistik_cache['miss']} miss, "
+        f"{statistik_cache['entri']} entri tersimpan · Cache semantik: {statistik_semantik['topik']} topik, "
+        f"{statistik_semantik['hit']} hit"
+    )
 
 # --- Logika untuk TAB 2: UNGGAH DOKUMEN PDF ---
 with tab2:
     st.header("Analisis Berdasarkan Dokumen PDF")
-    uploaded_file = st.file_uploader("Pilih file PDF", type="pdf")
+    uploaded_files = st.file_uploader("Pilih file PDF", type="pdf", accept_multiple_files=True)
+    fokus_topik = st.text_input(
+        "Fokus topik (opsional):",
+        placeholder="Contoh: digitalisasi UMKM",
+        help="Jika diisi, hanya bagian dokumen yang relevan dengan topik ini yang dianalisis.",
+    )
+    mode_brief = "Satu brief gabungan"
+    batas_paralel = PENGATURAN.max_paralel_llm
+    if len(uploaded_files) > 1:
+        mode_brief = st.radio("Mode Brief:", ("Satu brief gabungan", "Satu brief per file"), horizontal=True)
+        if mode_brief == "Satu brief per file":
+            batas_paralel = st.slider("Batas panggilan AI bersamaan:", 1, 8, PENGATURAN.max_paralel_llm)
 
-    if uploaded_file:
-        if st.button("🚀 Buat Draf dari PDF"):
-            with st.spinner("Membaca & menganalisis PDF..."):
-                konteks_pdf = extract_text_from_pdf(uploaded_file)
-                if konteks_pdf:
-                    st.session_state.hasil_brief = generate_brief_dengan_ai(f"Dokumen PDF: '{uploaded_file.name}'", konteks_pdf)
-                    st.session_state.kode_grafik = generate_chart_code(konteks_pdf)
-                    st.session_state.sumber_referensi = None # Tidak ada referensi URL untuk PDF
-                    st.session_state.keyword = uploaded_file.name.split('.')[0].replace(' ', '_')
+    with st.expander("Rentang halaman"):
+        kolom_awal, kolom_akhir = st.columns(2)
+        halaman_awal = kolom_awal.number_input("Dari halaman", min_value=1, value=1, step=1)
+        halaman_akhir = kolom_akhir.number_input(
+            "Sampai halaman", min_value=0, value=0, step=1, help="0 berarti sampai halaman terakhir."
+        )
+    rentang = None
+    if halaman_awal > 1 or halaman_akhir:
+        rentang = (int(halaman_awal) - 1, int(halaman_akhir) or None)
+    abaikan_arsip = st.checkbox("Abaikan arsip (paksa pembuatan baru)")
 
+    if uploaded_files:
+        if halaman_akhir and halaman_akhir < halaman_awal:
+            st.warning("Halaman akhir harus sama dengan atau setelah halaman awal.")
+        elif st.button("🚀 Buat Draf dari PDF"):
+            # Unggahan disalin bertahap ke disk; jika kuota terlampaui, yang sudah tersalin dilepas lagi
+            kuota = get_kuota_unggahan()
+            daftar_berkas = []
+            try:
+                for f in uploaded_files:
+                    daftar_berkas.append(kuota.simpan(ID_SESI, f.name, f))
+            except BatasUnggahanTerlampaui as e:
+                for berkas in daftar_berkas:
+                    kuota.lepas(berkas)
+                st.error(str(e))
+            else:
+                # Dokumen (dan rentang halaman serta fokus) yang sama langsung dibuka dari arsip
+                arsip_lama = None
+                if mode_brief == "Satu brief gabungan" and not abaikan_arsip:
+                    arsip_lama = ARSIP.ambil_sidik(
+                        sidik_pdf([kunci_ekstraksi(b.path, rentang) for b in daftar_berkas], fokus_topik)
+                    )
+                if arsip_lama:
+                    for berkas in daftar_berkas:
+                        kuota.lepas(berkas)
+                    muat_arsip(arsip_lama)
+                    st.toast("Brief untuk dokumen ini dibuka dari arsip.")
+                else:
+                    kirim_pekerjaan(
+                        "PDF: " + ", ".join(f.name for f in uploaded_files),
+                        pekerjaan_pdf(daftar_berkas, fokus_topik, mode_brief, batas_paralel, rentang),
+                    )
 
-# --- BAGIAN TAMPILAN HASIL (DI LUAR TAB) ---
-if 'hasil_brief' in st.session_state and st.session_state.hasil_brief:
-    st.divider()
-    st.header("Hasil Draf Policy Brief")
+# --- Logika untuk TAB 3: ARSIP BRIEF ---
+LABEL_JENIS = {"web": "🌐 Web", "pdf": "📄 PDF"}
 
-    # Tombol Unduh ditempatkan di atas agar mudah diakses
-    docx_file = convert_to_docx(st.session_state.hasil_brief)
-    st.download_button(
-        label="📥 Unduh sebagai .docx",
-        data=docx_file,
-        file_name=f"policy_brief_{st.session_state.keyword}.docx",
-        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+def format_waktu(detik):
+    return time.strftime("%d-%m-%Y %H:%M", time.localtime(detik))
+
+with tab3:
+    st.header("Arsip Policy Brief")
+    teks_cari = st.text_input("Cari di arsip:", placeholder="Contoh: stunting kabupaten")
+    statistik_arsip = ARSIP.statistik()
+    st.caption(
+        f"{statistik_arsip['brief']} brief tersimpan · dibuka ulang {statistik_arsip['dibuka_ulang']} kali"
     )
+    daftar_arsip = ARSIP.cari(teks_cari, batas=20)
+    if not daftar_arsip:
+        st.info("Belum ada brief di arsip yang cocok.")
+    for brief in daftar_arsip:
+        with st.container(border=True):
+            kolom_info, kolom_aksi = st.columns([5, 1])
+            kolom_info.markdown(f"**{brief['judul']}**")
+            kolom_info.caption(
+                f"{LABEL_JENIS.get(brief['jenis'], brief['jenis'])} · {brief['kueri']} · "
+                f"{format_waktu(brief['dibuat'])} · dibuka {brief['dibuka']} kali"
+            )
+            kolom_info.markdown(brief['cuplikan'])
+            if kolom_aksi.button("Buka", key=f"buka_arsip_{brief['id']}"):
+                muat_arsip(ARSIP.ambil(brief['id']))
+                st.rerun()
+            if kolom_aksi.button("Sunting", key=f"sunting_arsip_{brief['id']}"):
+                st.session_state.sunting_arsip = brief['id']
+            if kolom_aksi.button("Hapus", key=f"hapus_arsip_{brief['id']}"):
+                sidik = ARSIP.hapus(brief['id'])
+                # Topik dikeluarkan dari cache semantik jika tidak ada lagi versi yang tersisa
+                if sidik and ARSIP.ambil_sidik(sidik, catat_dibuka=False) is None:
+                    SEMANTIK.hapus(sidik)
+                st.rerun()
 
-    st.markdown(st.session_state.hasil_brief)
+    # Brief lama sebagai titik awal: hasil suntingan disimpan sebagai versi baru dengan sidik
+    # yang sama, sehingga pembukaan berikutnya dari arsip memakai versi terbaru ini
+    induk = None
+    if st.session_state.get('sunting_arsip'):
+        induk = ARSIP.ambil(st.session_state.sunting_arsip, catat_dibuka=False)
+    if induk:
+        st.subheader(f"Sunting: {induk['judul']}")
+        with st.form("form_sunting_arsip"):
+            teks_baru = st.text_area("Isi brief (Markdown):", value=induk['hasil_brief'], height=400)
+            simpan_suntingan = st.form_submit_button("💾 Simpan sebagai versi baru")
+        if simpan_suntingan:
+            id_baru = ARSIP.simpan(
+                induk['jenis'], induk['kueri'], teks_baru, induk['kode_grafik'], induk['sumber_referensi'],
+                induk['sumber_dokumen'], sidik=induk['sidik'], sidik_sumber=induk['sidik_sumber'], induk=induk['id'],
+            )
+            st.session_state.sunting_arsip = None
+            muat_arsip(ARSIP.ambil(id_baru))
+            st.rerun()
+        if st.button("Batal menyunting"):
+            st.session_state.sunting_arsip = None
+            st.rerun()
 
-    if st.session_state.kode_grafik and "#TIDAK_ADA_DATA" not in st.session_state.kode_grafik:
-        st.markdown("### Visualisasi Data Kunci")
-        try:
-            exec(st.session_state.kode_grafik, globals(), locals())
-            st.altair_chart(locals()['chart'], use_container_width=True)
-        except Exception as e:
-            st.warning(f"Gagal membuat grafik: {e}")
-            st.code(st.session_state.kode_grafik)
+# --- DAFTAR PEKERJAAN (DI LUAR TAB) ---
+IKON_STATUS = {"antre": "⏳", "berjalan": "⚙️", "selesai": "✅", "gagal": "❌"}
 
-    if st.session_state.sumber_referensi:
-        st.markdown("### Referensi")
-        for url in st.session_state.sumber_referensi:
-            st.markdown(f"- {url}")
+def panel_pekerjaan():
+    pelaksana = get_pelaksana()
+    daftar = pelaksana.daftar(ID_SESI)
+    if not daftar:
+        return
+    st.divider()
+    st.subheader("Pekerjaan di Sesi Ini")
+    for pekerjaan in daftar:
+        with st.container(border=True):
+            kolom_info, kolom_aksi = st.columns([5, 1])
+            ditampilkan = " · sedang ditampilkan" if st.session_state.get('pekerjaan_ditampilkan') == pekerjaan.id else ""
+            kolom_info.markdown(
+                f"{IKON_STATUS[pekerjaan.status]} **{pekerjaan.judul}** · {pekerjaan.status} · "
+                f"{pekerjaan.durasi():.0f} dtk{ditampilkan}"
+            )
+            if pekerjaan.aktif:
+                if pekerjaan.progress:
+                    kolom_info.progress(pekerjaan.progress[0], text=pekerjaan.progress[1])
+                if pekerjaan.pesan:
+                    kolom_info.caption(pekerjaan.pesan[-1][1])
+                if pekerjaan.teks_stream:
+                    # Draf ditampilkan terbuka agar teks pertama dari AI langsung terlihat
+                    kolom_info.caption("✍️ Draf sementara, diperbarui selama AI menulis")
+                    kolom_info.container(border=True).markdown(pekerjaan.teks_stream + "▌")
+                continue
+            if pekerjaan.status == "gagal":
+                kolom_info.error(pekerjaan.error)
+            for jenis, pesan in pekerjaan.pesan:
+                if jenis in ("peringatan", "error"):
+                    kolom_info.warning(pesan)
+            if pekerjaan.status == "selesai" and kolom_aksi.button("Tampilkan", key=f"lihat_{pekerjaan.id}"):
+                muat_hasil(pekerjaan)
+                st.rerun()
+            if kolom_aksi.button("Hapus", key=f"hapus_{pekerjaan.id}"):
+                pelaksana.hapus(pekerjaan.id)
+                st.rerun()
+    # Pekerjaan yang terakhir dikirim langsung ditampilkan sekali begitu selesai
+    terakhir = pelaksana.ambil(st.session_state.get('pekerjaan_terakhir'))
+    if terakhir and terakhir.status == "selesai":
+        st.session_state.pekerjaan_terakhir = None
+        muat_hasil(terakhir)
+        st.rerun()
+    # Interval fragment hanya bisa diubah lewat rerun halaman, misal saat draf mulai di-stream
+    if interval_panel_pekerjaan() != st.session_state.get('interval_panel'):
+        st.rerun()
+
+def interval_panel_pekerjaan():
+    # Lebih sering selama ada draf yang di-stream; tidak diperbarui jika tidak ada pekerjaan aktif
+    aktif = [p for p in get_pelaksana().daftar(ID_SESI) if p.aktif]
+    if not aktif:
+        return None
+    return 0.5 if any(p.teks_stream for p in aktif) else 1.5
+
+# Selama ada pekerjaan aktif, panel diperbarui berkala tanpa menjalankan ulang seluruh halaman
+st.session_state.interval_panel = interval_panel_pekerjaan()
+st.fragment(run_every=st.session_state.interval_panel)(panel_pekerjaan)()
+
+
+# --- BAGIAN TAMPILAN HASIL (DI LUAR TAB) ---
+# Dijalankan sebagai fragment: interaksi di dalamnya hanya menjalankan ulang bagian ini,
+# bukan seluruh halaman
+@st.fragment
+def tampilkan_bagian_hasil():
+    if st.session_state.get('hasil_brief'):
+        st.divider()
+        st.header("Hasil Draf Policy Brief")
+        if st.session_state.get('dari_arsip'):
+            st.caption(
+                f"🗄️ Dibuka dari arsip (dibuat {format_waktu(st.session_state.dari_arsip)}). "
+                "Centang opsi abaikan arsip untuk membuat ulang."
+            )
+        tampilkan_hasil(
+            st.session_state.hasil_brief,
+            st.session_state.kode_grafik,
+            st.session_state.sumber_referensi,
+            st.session_state.keyword,
+            st.session_state.get('sumber_dokumen'),
+        )
+    elif st.session_state.get('hasil_per_file'):
+        st.divider()
+        st.header("Hasil Draf Policy Brief per Dokumen")
+        for indeks, hasil in enumerate(st.session_state.hasil_per_file):
+            with st.expander(f"📄 {hasil['nama']}"):
+                if hasil['hasil_brief']:
+                    keyword_file = hasil['nama'].split('.')[0].replace(' ', '_')
+                    tampilkan_hasil(
+                        hasil['hasil_brief'], hasil['kode_grafik'], None, keyword_file, [hasil['nama']],
+                        kunci=f"file_{indeks}",
+                    )
+                else:
+                    st.warning("Brief untuk dokumen ini gagal dibuat.")
+
+tampilkan_bagian_hasil()
+
+# --- STATUS KLIEN BERSAMA (SIDEBAR) ---
+with st.sidebar.expander("🔌 Status klien"):
+    st.json(get_klien(model).kesehatan())
+
+# --- PEKERJAAN LATAR BELAKANG (SIDEBAR) ---
+with st.sidebar.expander("🧵 Pekerjaan latar belakang"):
+    st.json(get_pelaksana().statistik())
+    st.caption(
+        f"Unggahan sesi ini di disk: {get_kuota_unggahan().pemakaian(ID_SESI) / 2**20:.1f} MB "
+        f"dari {PENGATURAN.batas_unggahan_sesi_mb} MB"
+    )
+
+# --- PEMBATAS LAJU DAN COBA ULANG (SIDEBAR) ---
+with st.sidebar.expander("🛡️ Ketahanan backend"):
+    statistik_ketahanan = ketahanan.statistik()
+    if statistik_ketahanan:
+        st.json(statistik_ketahanan)
     else:
-        st.markdown("### Sumber Dokumen")
+        st.caption("Belum ada panggilan ke layanan luar di proses ini.")
 
-        st.info(f"Analisis ini dibuat berdasarkan dokumen yang diunggah.")
+# --- RUTE MODEL PER TUGAS (SIDEBAR) ---
+with st.sidebar.expander("🤖 Rute model"):
+    for tugas, per_model in RUTE.statistik().items():
+        st.caption(f"{tugas}: {' → '.join(RUTE.urutan(tugas))}")
+        st.dataframe([{"model": nama, **angka} for nama, angka in per_model.items()], hide_index=True)
 
+# --- PANEL DEBUG LATENSI (SIDEBAR) ---
+if st.sidebar.toggle("🐞 Panel debug latensi"):
+    with st.sidebar:
+        st.caption("Durasi per tahap pada pekerjaan yang sedang ditampilkan")
+        jejak = st.session_state.get('jejak')
+        st.dataframe(jejak.daftar() if jejak else [], hide_index=True)
+        st.caption("Ringkasan per tahap sejak server dimulai")
+        st.json(pelacakan.ringkasan())
+
+# --- LAPORAN WAKTU IMPOR (SIDEBAR) ---
+with st.sidebar.expander("⏱️ Waktu impor modul"):
+    waktu_impor = laporan_waktu_impor()
+    if waktu_impor:
+        for nama_modul, detik in waktu_impor.items():
+            st.write(f"`{nama_modul}`: {detik * 1000:.0f} ms")
+    else:
+        st.caption("Belum ada modul berat yang dimuat di proses ini.")
+    st.caption("Ukur cold start per modul dengan `python waktu_impor.py`.")
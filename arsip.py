@@ -0,0 +1,171 @@
+# Arsip policy brief di SQLite dengan indeks teks penuh FTS5. Setiap brief yang selesai dibuat
+# disimpan bersama kode grafik, referensi dan sidik sumbernya, sehingga topik atau dokumen yang
+# sama bisa langsung dibuka kembali tanpa pencarian web dan panggilan Gemini ulang.
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+POLA_KATA = re.compile(r"\w+")
+POLA_JUDUL = re.compile(r"\*\*Judul:\*\*\s*(.+)")
+POLA_HEADING = re.compile(r"#+\s*")
+
+
+def _hash(nilai):
+    return hashlib.sha256(json.dumps(nilai, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def sidik_web(mesin, keyword):
+    # Sama seperti kunci cache pencarian: keyword dinormalisasi agar spasi/huruf besar tidak berpengaruh
+    return _hash(["web", mesin, " ".join(keyword.lower().split())])
+
+
+def sidik_pdf(daftar_kunci, fokus_topik=""):
+    # daftar_kunci dari ekstraksi_pdf.kunci_ekstraksi (hash isi file + rentang halaman)
+    return _hash(["pdf", sorted(daftar_kunci), " ".join(fokus_topik.lower().split())])
+
+
+def judul_brief(hasil_brief):
+    cocok = POLA_JUDUL.search(hasil_brief)
+    if cocok:
+        return cocok.group(1).strip()
+    for baris in hasil_brief.splitlines():
+        if baris.strip():
+            return baris.strip("#* ").strip()[:200]
+    return "(tanpa judul)"
+
+
+def kata_kunci_file(kueri):
+    # Dipakai untuk nama file unduhan, sama seperti keyword hasil pekerjaan
+    return "_".join(POLA_KATA.findall(kueri))[:80] or "arsip"
+
+
+def kueri_fts(teks):
+    # Masukan pengguna diubah menjadi frasa berawalan ("kata"*) agar karakter khusus FTS5 aman
+    return " ".join('"' + kata.replace('"', '""') + '"*' for kata in POLA_KATA.findall(teks))
+
+
+class ArsipBrief:
+
+    def __init__(self, path):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS brief ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, sidik TEXT, jenis TEXT NOT NULL, judul TEXT NOT NULL, "
+                "kueri TEXT NOT NULL, hasil_brief TEXT NOT NULL, kode_grafik TEXT, sumber_referensi TEXT, "
+                "sumber_dokumen TEXT, sidik_sumber TEXT, induk INTEGER, dibuat REAL NOT NULL, "
+                "dibuka INTEGER NOT NULL DEFAULT 0)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_brief_sidik ON brief (sidik, dibuat)")
+            # rowid tabel FTS sama dengan id brief
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS brief_fts USING fts5"
+                "(judul, kueri, isi, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+
+    def simpan(self, jenis, kueri, hasil_brief, kode_grafik=None, sumber_referensi=None,
+               sumber_dokumen=None, sidik=None, sidik_sumber=None, induk=None):
+        # Brief yang isinya sama persis dengan versi terakhir untuk sidik yang sama tidak disimpan dua kali
+        judul = judul_brief(hasil_brief)
+        with self._lock, self._conn:
+            if sidik:
+                baris = self._conn.execute(
+                    "SELECT id, hasil_brief FROM brief WHERE sidik = ? ORDER BY dibuat DESC LIMIT 1", (sidik,)
+                ).fetchone()
+                if baris is not None and baris["hasil_brief"] == hasil_brief:
+                    return baris["id"]
+            id_brief = self._conn.execute(
+                "INSERT INTO brief (sidik, jenis, judul, kueri, hasil_brief, kode_grafik, sumber_referensi, "
+                "sumber_dokumen, sidik_sumber, induk, dibuat) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    sidik, jenis, judul, kueri, hasil_brief, json.dumps(kode_grafik),
+                    json.dumps(sumber_referensi), json.dumps(sumber_dokumen), json.dumps(sidik_sumber),
+                    induk, time.time(),
+                ),
+            ).lastrowid
+            self._conn.execute(
+                "INSERT INTO brief_fts (rowid, judul, kueri, isi) VALUES (?, ?, ?, ?)",
+                (id_brief, judul, kueri, hasil_brief),
+            )
+        return id_brief
+
+    def cari(self, teks="", batas=20):
+        # Tanpa kata kunci: brief terbaru. Dengan kata kunci: diurutkan dengan BM25 FTS5,
+        # judul dan kueri diberi bobot lebih besar daripada isi.
+        kueri = kueri_fts(teks)
+        with self._lock:
+            if not kueri:
+                baris = self._conn.execute(
+                    "SELECT id, jenis, judul, kueri, dibuat, dibuka, substr(hasil_brief, 1, 200) AS cuplikan "
+                    "FROM brief ORDER BY dibuat DESC LIMIT ?",
+                    (batas,),
+                ).fetchall()
+            else:
+                baris = self._conn.execute(
+                    "SELECT b.id, b.jenis, b.judul, b.kueri, b.dibuat, b.dibuka, "
+                    "snippet(brief_fts, 2, '**', '**', '…', 24) AS cuplikan "
+                    "FROM brief_fts JOIN brief b ON b.id = brief_fts.rowid "
+                    "WHERE brief_fts MATCH ? ORDER BY bm25(brief_fts, 10.0, 5.0, 1.0) LIMIT ?",
+                    (kueri, batas),
+                ).fetchall()
+        hasil = [dict(b) for b in baris]
+        for brief in hasil:
+            # Cuplikan ditampilkan satu baris: judul Markdown dan pindah baris dibuang
+            brief["cuplikan"] = POLA_HEADING.sub("", " ".join(brief["cuplikan"].split()))
+        return hasil
+
+    def _baris_ke_brief(self, baris):
+        brief = dict(baris)
+        for kolom in ("kode_grafik", "sumber_referensi", "sumber_dokumen", "sidik_sumber"):
+            brief[kolom] = json.loads(brief[kolom]) if brief[kolom] else None
+        return brief
+
+    def ambil(self, id_brief, catat_dibuka=True):
+        with self._lock, self._conn:
+            baris = self._conn.execute("SELECT * FROM brief WHERE id = ?", (id_brief,)).fetchone()
+            if baris is None:
+                return None
+            if catat_dibuka:
+                self._conn.execute("UPDATE brief SET dibuka = dibuka + 1 WHERE id = ?", (id_brief,))
+        return self._baris_ke_brief(baris)
+
+    def ambil_sidik(self, sidik, catat_dibuka=True):
+        # Versi terbaru untuk sumber yang sama (topik web atau kumpulan dokumen PDF)
+        with self._lock:
+            baris = self._conn.execute(
+                "SELECT id FROM brief WHERE sidik = ? ORDER BY dibuat DESC LIMIT 1", (sidik,)
+            ).fetchone()
+        return self.ambil(baris["id"], catat_dibuka) if baris is not None else None
+
+    def daftar_sidik(self, jenis):
+        # (sidik, kueri) versi terbaru per sidik, untuk membangun cache semantik
+        with self._lock:
+            return [
+                (baris["sidik"], baris["kueri"])
+                for baris in self._conn.execute(
+                    "SELECT sidik, kueri, MAX(dibuat) FROM brief WHERE jenis = ? AND sidik IS NOT NULL GROUP BY sidik",
+                    (jenis,),
+                )
+            ]
+
+    def hapus(self, id_brief):
+        # Mengembalikan sidik brief yang dihapus (None jika tidak ada)
+        with self._lock, self._conn:
+            baris = self._conn.execute("SELECT sidik FROM brief WHERE id = ?", (id_brief,)).fetchone()
+            self._conn.execute("DELETE FROM brief WHERE id = ?", (id_brief,))
+            self._conn.execute("DELETE FROM brief_fts WHERE rowid = ?", (id_brief,))
+        return baris["sidik"] if baris is not None else None
+
+    def statistik(self):
+        with self._lock:
+            jumlah, dibuka = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(dibuka), 0) FROM brief").fetchone()
+        return {"brief": jumlah, "dibuka_ulang": dibuka}
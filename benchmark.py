@@ -0,0 +1,346 @@
+# Benchmark pipeline tanpa jaringan: Gemini, DDGS dan googlesearch diganti tiruan lokal yang
+# deterministik (latensi dan ukuran jawaban bisa diatur), halaman hasil Google disajikan oleh
+# server HTTP lokal, dan PDF dibuat sintetis dengan PyMuPDF dalam beberapa ukuran.
+#
+# Contoh:
+#   python benchmark.py --halaman 10,100,500 --latensi-llm 0.5 --output hasil_benchmark.json
+#
+# Hasil berupa JSON (dengan commit git saat ini) agar bisa dibandingkan antar commit.
+import argparse
+import itertools
+import json
+import logging
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from waktu_impor import impor
+
+PARAGRAF = (
+    "Pada tahun {tahun} jumlah UMKM di Kabupaten {wilayah} tercatat {angka} unit, "
+    "dengan {persen} persen di antaranya telah memanfaatkan platform digital untuk pemasaran. "
+    "Pemerintah provinsi menargetkan peningkatan akses pembiayaan dan pelatihan literasi digital."
+)
+BIDANG = (
+    "digitalisasi UMKM", "penurunan stunting", "inflasi pangan", "kemiskinan ekstrem", "pendidikan vokasi",
+    "air bersih dan sanitasi", "pengelolaan sampah plastik", "energi terbarukan", "pariwisata desa",
+)
+
+
+def teks_sintetis(jumlah_karakter, benih=0):
+    acak = random.Random(benih)
+    bagian = []
+    total = 0
+    while total < jumlah_karakter:
+        paragraf = PARAGRAF.format(
+            tahun=acak.randint(2015, 2024),
+            wilayah=acak.randint(1, 35),
+            angka=acak.randint(100, 90000),
+            persen=acak.randint(5, 95),
+        )
+        bagian.append(paragraf)
+        total += len(paragraf) + 2
+    return "\n\n".join(bagian)[:jumlah_karakter]
+
+
+def brief_sintetis(jumlah_karakter):
+    judul = ["1. Ringkasan Eksekutif", "2. Pendahuluan", "3. Temuan dan Pembahasan Mendalam",
+             "4. Rekomendasi Kebijakan Berbasis Bukti (Evidence-Based)"]
+    isi = teks_sintetis(jumlah_karakter, benih=jumlah_karakter)
+    per_bagian = len(isi) // len(judul) + 1
+    bagian = [
+        f"### {nama}\n" + isi[i * per_bagian:(i + 1) * per_bagian] + "\n- Butir rekomendasi\n| Wilayah | Jumlah |\n|---|---|\n| A | 1 |"
+        for i, nama in enumerate(judul)
+    ]
+    return "**Judul:** Brief Sintetis\n" + "\n".join(bagian)
+
+
+# --- Tiruan backend ---
+
+class _Jawaban:
+
+    def __init__(self, text):
+        self.text = text
+
+
+class ModelTiruan:
+    # Meniru genai.GenerativeModel: jawaban tetap untuk prompt yang sama, latensi konstan
+
+    KODE_GRAFIK = (
+        "```python\nimport pandas as pd\nimport altair as alt\n"
+        "data_source = pd.DataFrame({'Kategori': ['A', 'B', 'C'], 'Jumlah': [1500, 4500, 3000]})\n"
+        "chart = alt.Chart(data_source).mark_bar().encode(x='Kategori:N', y='Jumlah:Q')\n```"
+    )
+
+    def __init__(self, model_name="model-tiruan", latensi=0.5, ukuran_jawaban=6000):
+        self.model_name = model_name
+        self.latensi = latensi
+        self.ukuran_jawaban = ukuran_jawaban
+
+    def _teks(self, prompt, generation_config):
+        if generation_config and generation_config.get("response_mime_type") == "application/json":
+            isi = teks_sintetis(self.ukuran_jawaban // 4)
+            return json.dumps({
+                "judul": "Brief Sintetis",
+                "ringkasan_eksekutif": isi,
+                "pendahuluan": isi,
+                "temuan_dan_pembahasan": isi,
+                "rekomendasi_kebijakan": isi,
+                "grafik": {"ada_data": True, "judul": "Jumlah", "label_kategori": "Kategori",
+                           "label_nilai": "Jumlah", "kategori": ["A", "B", "C"], "nilai": [1500, 4500, 3000]},
+            })
+        if "visualisasi data menggunakan Python" in prompt:
+            return self.KODE_GRAFIK
+        return brief_sintetis(self.ukuran_jawaban)
+
+    def generate_content(self, prompt, stream=False, generation_config=None, request_options=None):
+        teks = self._teks(prompt, generation_config)
+        if not stream:
+            time.sleep(self.latensi)
+            return _Jawaban(teks)
+        return self._stream(teks)
+
+    def _stream(self, teks, jumlah_potongan=10):
+        ukuran = len(teks) // jumlah_potongan + 1
+        for i in range(0, len(teks), ukuran):
+            time.sleep(self.latensi / jumlah_potongan)
+            yield _Jawaban(teks[i:i + ukuran])
+
+    def count_tokens(self, isi):
+        return types.SimpleNamespace(total_tokens=len(str(isi)) // 4)
+
+
+def pasang_mesin_pencari_tiruan(latensi, ukuran_cuplikan, url_dasar):
+    # Modul tiruan dimasukkan ke sys.modules sehingga impor() di pipeline/klien memakainya
+
+    class DDGSTiruan:
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            pass
+
+        def text(self, query, max_results=7):
+            time.sleep(latensi)
+            return [
+                {"href": f"https://contoh-{i}.go.id/artikel", "title": f"Hasil {i}",
+                 "body": teks_sintetis(ukuran_cuplikan, benih=i)}
+                for i in range(max_results)
+            ]
+
+    def search(query, num_results=10, sleep_interval=0):
+        time.sleep(latensi)
+        return [f"{url_dasar}/halaman/{i}" for i in range(num_results)]
+
+    sys.modules["duckduckgo_search"] = types.SimpleNamespace(DDGS=DDGSTiruan)
+    sys.modules["googlesearch"] = types.SimpleNamespace(search=search)
+
+
+def mulai_server_halaman(latensi, ukuran_halaman):
+    # Halaman HTML sintetis untuk hasil Google, disajikan dengan latensi tetap
+    html = (
+        "<html><body><nav>Menu Beranda Berita</nav><article>"
+        + "".join(f"<p>{p}</p>" for p in teks_sintetis(ukuran_halaman).split("\n\n"))
+        + "</article><footer>Hak cipta</footer></body></html>"
+    ).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            time.sleep(latensi)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(html)))
+            self.end_headers()
+            self.wfile.write(html)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def buat_pdf_sintetis(jumlah_halaman):
+    doc = impor("fitz").open()
+    for i in range(jumlah_halaman):
+        halaman = doc.new_page()
+        halaman.insert_textbox(halaman.rect + (50, 50, -50, -50), teks_sintetis(2500, benih=i), fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+# --- Pengukuran ---
+
+def ukur(fungsi, ulang):
+    durasi = []
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        fungsi()
+        durasi.append(time.perf_counter() - mulai)
+    return {
+        "median_detik": round(statistics.median(durasi), 6),
+        "min_detik": round(min(durasi), 6),
+        "max_detik": round(max(durasi), 6),
+        "ulang": ulang,
+    }
+
+
+def commit_git():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline policy brief dengan backend tiruan.")
+    parser.add_argument("--halaman", default="10,50,200", help="Ukuran PDF sintetis (jumlah halaman), dipisah koma")
+    parser.add_argument("--ulang", type=int, default=3, help="Jumlah pengulangan per pengukuran")
+    parser.add_argument("--latensi-llm", type=float, default=0.5, help="Latensi tiruan Gemini (detik)")
+    parser.add_argument("--ukuran-jawaban", type=int, default=6000, help="Panjang jawaban tiruan Gemini (karakter)")
+    parser.add_argument("--latensi-cari", type=float, default=0.2, help="Latensi tiruan mesin pencari dan halaman (detik)")
+    parser.add_argument("--ukuran-halaman", type=int, default=20000, help="Panjang teks halaman/cuplikan tiruan (karakter)")
+    parser.add_argument("--output", help="Simpan JSON ke file ini (default: stdout)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    server = mulai_server_halaman(args.latensi_cari, args.ukuran_halaman)
+    pasang_mesin_pencari_tiruan(args.latensi_cari, args.ukuran_halaman // 10, f"http://127.0.0.1:{server.server_port}")
+
+    import ekstraksi_pdf
+    from cache_semantik import CacheSemantik
+    from klien import KumpulanKlien
+    from pipeline import (
+        LaporLog,
+        PembuatBrief,
+        Pengaturan,
+        atur_ketahanan,
+        buat_cache_llm,
+        buat_cache_pencarian,
+        buat_prompt_brief,
+        buat_prompt_grafik,
+        buat_prompt_terstruktur,
+        convert_to_docx,
+    )
+
+    folder_cache = tempfile.mkdtemp(prefix="pbg-benchmark-")
+    # Batas laju dinaikkan agar yang terukur adalah pipeline, bukan pembatas laju
+    pengaturan = Pengaturan(
+        search_cache_path=f"{folder_cache}/pencarian.sqlite",
+        llm_cache_path=f"{folder_cache}/llm.sqlite",
+        laju_gemini_per_menit=1e6,
+        laju_duckduckgo_per_menit=1e6,
+        laju_google_per_menit=1e6,
+    )
+    atur_ketahanan(pengaturan)
+    model = ModelTiruan(latensi=args.latensi_llm, ukuran_jawaban=args.ukuran_jawaban)
+    klien = KumpulanKlien(model)
+    cache_pencarian = buat_cache_pencarian(pengaturan)
+    lapor = LaporLog(logging.getLogger("pbg.benchmark"))
+
+    nomor_cache = itertools.count()
+
+    def pembuat_baru():
+        # Cache jawaban AI baru setiap kali agar panggilan model benar-benar terukur
+        pengaturan_baru = replace(pengaturan, llm_cache_path=f"{folder_cache}/llm-{next(nomor_cache)}.sqlite")
+        return PembuatBrief(model, buat_cache_llm(pengaturan_baru), cache_pencarian, pengaturan, lapor=lapor, klien=klien)
+
+    hasil = {}
+
+    # Ekstraksi PDF: cache dokumen dikosongkan sebelum setiap pengulangan
+    hasil["ekstraksi_pdf"] = {}
+    pembuat = pembuat_baru()
+    for jumlah_halaman in [int(n) for n in args.halaman.split(",") if n.strip()]:
+        data = buat_pdf_sintetis(jumlah_halaman)
+
+        def ekstrak():
+            ekstraksi_pdf._cache.clear()
+            pembuat.extract_text_from_pdf(data)
+
+        pengukuran = ukur(ekstrak, args.ulang)
+        pengukuran["ukuran_mb"] = round(len(data) / 2**20, 2)
+        pengukuran["halaman_per_detik"] = round(jumlah_halaman / pengukuran["median_detik"], 1)
+        hasil["ekstraksi_pdf"][str(jumlah_halaman)] = pengukuran
+
+    # Penyusunan prompt untuk konteks 100 KB dan 1 MB
+    hasil["prompt"] = {}
+    for ukuran in (100_000, 1_000_000):
+        konteks = teks_sintetis(ukuran)
+        hasil["prompt"][str(ukuran)] = ukur(
+            lambda: (buat_prompt_brief("Benchmark", konteks), buat_prompt_grafik(konteks),
+                     buat_prompt_terstruktur("Benchmark", konteks)),
+            args.ulang * 10,
+        )
+
+    # Ekspor Word untuk brief panjang
+    hasil["convert_to_docx"] = {}
+    for ukuran in (10_000, 100_000, 500_000):
+        brief = brief_sintetis(ukuran)
+        hasil["convert_to_docx"][str(ukuran)] = ukur(lambda: convert_to_docx(brief), args.ulang)
+
+    # Cache semantik: satu pencarian topik serupa di antara ribuan topik arsip
+    hasil["cache_semantik"] = {}
+    acak = random.Random(0)
+    for jumlah_topik in (1000, 5000):
+        cache = CacheSemantik()
+        for i in range(jumlah_topik):
+            cache.tambah(i, f"{acak.choice(BIDANG)} di Kabupaten {acak.randint(1, 35)} tahun {acak.randint(2015, 2024)}")
+        cache.cari("pemanasan", 0.0)  # Bobot TF-IDF dihitung sekali sebelum diukur
+        hasil["cache_semantik"][str(jumlah_topik)] = ukur(
+            lambda: cache.cari("digitalisasi UMKM Surakarta", 0.75), args.ulang * 100
+        )
+
+    # End-to-end: pencarian (tanpa cache) + brief dan grafik + ekspor Word
+    hasil["end_to_end"] = {}
+    for mesin in ("DuckDuckGo", "Google", "Keduanya"):
+        def alur_web():
+            pembuat = pembuat_baru()
+            konteks, _ = pembuat.cari_web(mesin, "digitalisasi umkm", pakai_cache=False)
+            hasil_brief, _ = pembuat.generate_brief_dan_grafik("Benchmark", konteks)
+            convert_to_docx(hasil_brief)
+
+        hasil["end_to_end"][mesin] = ukur(alur_web, args.ulang)
+
+    data_pdf = buat_pdf_sintetis(50)
+
+    def alur_pdf():
+        ekstraksi_pdf._cache.clear()
+        pembuat = pembuat_baru()
+        dokumen = pembuat.extract_text_dari_banyak_pdf([("sintetis.pdf", data_pdf)])
+        _, kunci_dokumen, teks = dokumen[0]
+        konteks = pembuat.siapkan_konteks_pdf(teks, kunci_dokumen, "UMKM digital")
+        hasil_brief, _ = pembuat.generate_brief_dan_grafik("Benchmark", konteks)
+        convert_to_docx(hasil_brief)
+
+    hasil["end_to_end"]["PDF 50 halaman"] = ukur(alur_pdf, args.ulang)
+
+    laporan = {
+        "commit": commit_git(),
+        "python": sys.version.split()[0],
+        "waktu": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "konfigurasi": vars(args),
+        "hasil": hasil,
+    }
+    teks_laporan = json.dumps(laporan, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(teks_laporan + "\n")
+    else:
+        print(teks_laporan)
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# Cache persisten berbasis SQLite yang dipakai bersama oleh semua sesi Streamlit.
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheSqlite:
+    # Penyimpanan kunci-nilai (nilai disimpan sebagai JSON) dengan TTL dan batas jumlah entri.
+    # Entri yang paling lama tidak diakses dibuang lebih dulu saat batas terlampaui.
+
+    def __init__(self, path, tabel, ttl_detik=None, max_entri=1000):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.tabel = tabel
+        self.ttl_detik = ttl_detik
+        self.max_entri = max_entri
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {tabel} "
+                "(kunci TEXT PRIMARY KEY, nilai TEXT NOT NULL, dibuat REAL NOT NULL, diakses REAL NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{tabel}_diakses ON {tabel} (diakses)")
+
+    def _kedaluwarsa(self, dibuat, sekarang):
+        return self.ttl_detik is not None and sekarang - dibuat > self.ttl_detik
+
+    def ambil(self, kunci):
+        sekarang = time.time()
+        with self._lock, self._conn:
+            baris = self._conn.execute(
+                f"SELECT nilai, dibuat FROM {self.tabel} WHERE kunci = ?", (kunci,)
+            ).fetchone()
+            if baris is None or self._kedaluwarsa(baris[1], sekarang):
+                self.misses += 1
+                return None
+            self._conn.execute(f"UPDATE {self.tabel} SET diakses = ? WHERE kunci = ?", (sekarang, kunci))
+            self.hits += 1
+            return json.loads(baris[0])
+
+    def simpan(self, kunci, nilai):
+        sekarang = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.tabel} (kunci, nilai, dibuat, diakses) VALUES (?, ?, ?, ?)",
+                (kunci, json.dumps(nilai), sekarang, sekarang),
+            )
+            self._buang_entri(sekarang)
+
+    def _buang_entri(self, sekarang):
+        if self.ttl_detik is not None:
+            self._conn.execute(f"DELETE FROM {self.tabel} WHERE dibuat < ?", (sekarang - self.ttl_detik,))
+        self._conn.execute(
+            f"DELETE FROM {self.tabel} WHERE kunci IN "
+            f"(SELECT kunci FROM {self.tabel} ORDER BY diakses DESC LIMIT -1 OFFSET ?)",
+            (self.max_entri,),
+        )
+
+    def jumlah_entri(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.tabel}").fetchone()[0]
+
+    def statistik(self):
+        return {"hit": self.hits, "miss": self.misses, "entri": self.jumlah_entri()}
+
+
+class CachePencarian(CacheSqlite):
+    # Cache hasil pencarian web, dikunci dengan mesin pencari, keyword yang dinormalisasi
+    # dan string filter situs (agar perubahan daftar situs tidak memakai hasil lama).
+
+    def __init__(self, path, ttl_detik=24 * 3600, max_entri=1000):
+        super().__init__(path, "pencarian", ttl_detik=ttl_detik, max_entri=max_entri)
+
+    @staticmethod
+    def buat_kunci(engine, keyword, filter_situs):
+        keyword_normal = " ".join(keyword.lower().split())
+        mentah = json.dumps([engine, keyword_normal, filter_situs])
+        return hashlib.sha256(mentah.encode("utf-8")).hexdigest()
+
+    def ambil_hasil(self, engine, keyword, filter_situs):
+        nilai = self.ambil(self.buat_kunci(engine, keyword, filter_situs))
+        return tuple(nilai) if nilai else None
+
+    def simpan_hasil(self, engine, keyword, filter_situs, konteks, sumber_referensi):
+        self.simpan(self.buat_kunci(engine, keyword, filter_situs), [konteks, sumber_referensi])
+
+
+class CacheLLM:
+    # Cache jawaban Gemini dengan dua tingkat: LRU di memori untuk akses tercepat,
+    # lalu SQLite di disk agar tetap ada setelah server dimulai ulang.
+    # Kuncinya hash dari nama model, prompt dan konfigurasi generasi (content-addressed).
+
+    def __init__(self, path, max_entri_memori=256, max_entri_disk=5000):
+        self.max_entri_memori = max_entri_memori
+        self._memori = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = CacheSqlite(path, "jawaban_llm", ttl_detik=None, max_entri=max_entri_disk)
+        self.hits_memori = 0
+
+    @staticmethod
+    def buat_kunci(nama_model, prompt, konfigurasi):
+        mentah = json.dumps([nama_model, prompt, konfigurasi], sort_keys=True, default=str)
+        return hashlib.sha256(mentah.encode("utf-8")).hexdigest()
+
+    def _simpan_memori(self, kunci, teks):
+        with self._lock:
+            self._memori[kunci] = teks
+            self._memori.move_to_end(kunci)
+            while len(self._memori) > self.max_entri_memori:
+                self._memori.popitem(last=False)
+
+    def ambil(self, nama_model, prompt, konfigurasi=None):
+        kunci = self.buat_kunci(nama_model, prompt, konfigurasi)
+        with self._lock:
+            if kunci in self._memori:
+                self._memori.move_to_end(kunci)
+                self.hits_memori += 1
+                return self._memori[kunci]
+        teks = self._disk.ambil(kunci)
+        if teks is not None:
+            self._simpan_memori(kunci, teks)
+        return teks
+
+    def simpan(self, nama_model, prompt, konfigurasi, teks):
+        kunci = self.buat_kunci(nama_model, prompt, konfigurasi)
+        self._simpan_memori(kunci, teks)
+        self._disk.simpan(kunci, teks)
+
+    def statistik(self):
+        return {
+            "hit_memori": self.hits_memori,
+            "hit_disk": self._disk.hits,
+            "miss": self._disk.misses,
+            "entri_memori": len(self._memori),
+            "entri_disk": self._disk.jumlah_entri(),
+        }
@@ -0,0 +1,169 @@
+# Cache semantik untuk topik pencarian web: topik baru dibandingkan dengan topik yang briefnya
+# sudah ada di arsip, sehingga "digitalisasi umkm di solo" dan "digitalisasi UMKM Surakarta"
+# dianggap permintaan yang sama. Kemiripan dihitung offline dengan cosine vektor TF-IDF dari
+# n-gram karakter dan kata utuh yang di-hash ke dimensi tetap. Angka (tahun) dan jenjang wilayah
+# (kota/kabupaten/provinsi) harus sama persis agar brief untuk tahun atau daerah lain tidak ditawarkan. Matriks disimpan column-major
+# sehingga satu pencarian hanya membaca kolom milik fitur kueri (puluhan kolom), bukan seluruh
+# matriks; ribuan topik tetap di bawah satu milidetik.
+import hashlib
+import re
+import threading
+import unicodedata
+import zlib
+
+import numpy as np
+
+DIMENSI = 1024
+UKURAN_NGRAM = 3
+KAPASITAS_AWAL = 256
+POLA_KATA = re.compile(r"\w+")
+# Kata umum tidak membedakan topik
+KATA_UMUM = {
+    "di", "ke", "dari", "dan", "atau", "yang", "untuk", "pada", "dalam", "dengan", "terhadap",
+    "the", "of", "in", "and",
+}
+# Kota Semarang dan Kabupaten Semarang adalah daerah yang berbeda
+KATA_WILAYAH = {"kota", "kabupaten", "provinsi"}
+
+# Nama lain wilayah dan singkatan yang sering dipakai bergantian dalam topik
+SINONIM = {
+    "solo": "surakarta",
+    "jateng": "jawa tengah",
+    "jogja": "yogyakarta",
+    "jogjakarta": "yogyakarta",
+    "yogya": "yogyakarta",
+    "ukm": "umkm",
+    "kab": "kabupaten",
+    "prov": "provinsi",
+}
+
+
+def normalisasi(teks):
+    teks = unicodedata.normalize("NFKD", teks.lower())
+    teks = "".join(c for c in teks if not unicodedata.combining(c))
+    return " ".join(SINONIM.get(kata, kata) for kata in POLA_KATA.findall(teks))
+
+
+def fitur(teks, dimensi=DIMENSI):
+    # Indeks fitur (boleh berulang) untuk n-gram karakter per kata (dengan batas kata) dan kata utuh
+    indeks = []
+    for kata in POLA_KATA.findall(normalisasi(teks)):
+        if kata in KATA_UMUM:
+            continue
+        indeks.append(zlib.crc32(f"k:{kata}".encode("utf-8")) % dimensi)
+        berbatas = f" {kata} "
+        indeks.extend(
+            zlib.crc32(berbatas[i:i + UKURAN_NGRAM].encode("utf-8")) % dimensi
+            for i in range(len(berbatas) - UKURAN_NGRAM + 1)
+        )
+    return indeks
+
+
+def sidik_eksak(teks):
+    # Sidik 64-bit dari angka dan penanda wilayah dalam topik; kandidat harus bersidik sama
+    kata = sorted({k for k in POLA_KATA.findall(normalisasi(teks)) if k.isdigit() or k in KATA_WILAYAH})
+    return int.from_bytes(hashlib.blake2b(" ".join(kata).encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+
+class CacheSemantik:
+
+    def __init__(self, dimensi=DIMENSI):
+        self.dimensi = dimensi
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._kunci = []
+        self._teks = []
+        self._posisi = {}
+        # Frekuensi mentah per baris; bobot TF-IDF yang sudah dinormalisasi dihitung ulang
+        # (sekali) setelah ada perubahan, karena IDF bergantung pada seluruh koleksi
+        self._tf = np.zeros((KAPASITAS_AWAL, dimensi), dtype=np.float32, order="F")
+        self._eksak = np.zeros(KAPASITAS_AWAL, dtype=np.int64)
+        self._df = np.zeros(dimensi, dtype=np.float32)
+        self._bobot = None
+        self._idf = None
+
+    def __len__(self):
+        return len(self._kunci)
+
+    def _vektor(self, teks):
+        vektor = np.zeros(self.dimensi, dtype=np.float32)
+        np.add.at(vektor, fitur(teks, self.dimensi), 1.0)
+        return vektor
+
+    def tambah(self, kunci, teks):
+        vektor = self._vektor(teks)
+        if not vektor.any():
+            return
+        with self._lock:
+            if kunci in self._posisi:
+                self._hapus(kunci)
+            n = len(self._kunci)
+            if n == self._tf.shape[0]:
+                tf = np.zeros((n * 2, self.dimensi), dtype=np.float32, order="F")
+                tf[:n] = self._tf
+                self._tf = tf
+                self._eksak = np.concatenate([self._eksak, np.zeros(n, dtype=np.int64)])
+            self._tf[n] = vektor
+            self._eksak[n] = sidik_eksak(teks)
+            self._df += vektor > 0
+            self._posisi[kunci] = n
+            self._kunci.append(kunci)
+            self._teks.append(teks)
+            self._bobot = None
+
+    def _hapus(self, kunci):
+        # Baris terakhir dipindah ke posisi yang dihapus agar matriks tetap rapat
+        i = self._posisi.pop(kunci)
+        terakhir = len(self._kunci) - 1
+        self._df -= self._tf[i] > 0
+        if i != terakhir:
+            self._tf[i] = self._tf[terakhir]
+            self._eksak[i] = self._eksak[terakhir]
+            self._kunci[i] = self._kunci[terakhir]
+            self._teks[i] = self._teks[terakhir]
+            self._posisi[self._kunci[i]] = i
+        self._tf[terakhir] = 0
+        self._kunci.pop()
+        self._teks.pop()
+        self._bobot = None
+
+    def hapus(self, kunci):
+        with self._lock:
+            if kunci in self._posisi:
+                self._hapus(kunci)
+
+    def _siapkan_bobot(self):
+        # IDF halus seperti scikit-learn: log((1 + n) / (1 + df)) + 1
+        n = len(self._kunci)
+        self._idf = (np.log((1 + n) / (1 + self._df)) + 1).astype(np.float32)
+        bobot = self._tf[:n] * self._idf
+        norma = np.linalg.norm(bobot, axis=1, keepdims=True)
+        self._bobot = np.asfortranarray(bobot / np.maximum(norma, 1e-12))
+
+    def cari(self, teks, ambang, jumlah=1):
+        # Mengembalikan [(kunci, teks, skor)] dengan skor >= ambang, terbaik lebih dulu
+        indeks, frekuensi = np.unique(np.array(fitur(teks, self.dimensi), dtype=np.int64), return_counts=True)
+        eksak = sidik_eksak(teks)
+        with self._lock:
+            if not len(self._kunci) or not len(indeks):
+                self.misses += 1
+                return []
+            if self._bobot is None:
+                self._siapkan_bobot()
+            kueri = frekuensi.astype(np.float32) * self._idf[indeks]
+            kueri /= max(float(np.linalg.norm(kueri)), 1e-12)
+            skor = self._bobot[:, indeks] @ kueri
+            skor[self._eksak[:len(skor)] != eksak] = -1.0
+            calon = np.argpartition(-skor, jumlah)[:jumlah] if jumlah < len(skor) else np.arange(len(skor))
+            urutan = calon[np.argsort(-skor[calon])]
+            hasil = [(self._kunci[i], self._teks[i], float(skor[i])) for i in urutan if skor[i] >= ambang]
+            if hasil:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return hasil
+
+    def statistik(self):
+        with self._lock:
+            return {"topik": len(self._kunci), "hit": self.hits, "miss": self.misses}
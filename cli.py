@@ -0,0 +1,267 @@
+# Pembuatan policy brief tanpa UI untuk daftar topik atau file PDF dalam jumlah besar.
+#
+# Contoh:
+#   python cli.py topik.csv --output hasil_brief --workers 4
+#
+# File masukan berformat CSV (dengan header) atau JSONL. Kolom yang dikenali:
+#   id     : nama file keluaran (opsional, default nomor baris + topik)
+#   topik  : topik untuk pencarian web
+#   pdf    : path file PDF; beberapa file dipisah dengan ";" menjadi satu brief gabungan
+#   fokus  : fokus topik untuk dokumen PDF (opsional)
+#   halaman: rentang halaman PDF, mis. "5-40" atau "10-" (opsional, default semua halaman)
+#   mesin  : DuckDuckGo, Google atau Keduanya (opsional, default --engine)
+#
+# Setiap baris menghasilkan <id>.docx dan <id>.json di folder keluaran. Baris yang sudah
+# berhasil (JSON berstatus "ok") dilewati, sehingga run yang terputus bisa dilanjutkan.
+# Brief yang berhasil juga disimpan ke arsip (ARCHIVE_PATH) yang dipakai bersama dengan app.
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import time
+import tomllib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import ketahanan
+import pelacakan
+from arsip import ArsipBrief, sidik_pdf, sidik_web
+from klien import KumpulanKlien
+from pipeline import (
+    KUNCI_PENGATURAN,
+    LaporLog,
+    PembuatBrief,
+    Pengaturan,
+    atur_ketahanan,
+    buat_cache_llm,
+    buat_cache_pencarian,
+    buat_model,
+    buat_rute_model,
+    buat_sumber_info_pdf,
+    convert_to_docx,
+)
+
+PATH_SECRETS = os.path.join(".streamlit", "secrets.toml")
+MESIN_VALID = ("DuckDuckGo", "Google", "Keduanya")
+
+logger = logging.getLogger("pbg.cli")
+
+
+def baca_secrets(path=PATH_SECRETS):
+    # Memakai secrets.toml yang sama dengan app Streamlit jika ada
+    if not os.path.exists(path):
+        return {}
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def baca_sumber_pengaturan(environ=os.environ, path=PATH_SECRETS):
+    # Pengaturan dari secrets.toml; environment variable hanya menimpa kunci pengaturan yang
+    # dikenal dan GOOGLE_API_KEY, bukan seluruh environment proses
+    sumber = baca_secrets(path)
+    dikenal = {*KUNCI_PENGATURAN.values(), "GOOGLE_API_KEY"}
+    sumber.update({kunci: nilai for kunci, nilai in environ.items() if kunci in dikenal})
+    return sumber
+
+
+def baca_masukan(path):
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith(".jsonl"):
+            baris = [json.loads(line) for line in f if line.strip()]
+        else:
+            baris = list(csv.DictReader(f))
+    # Nilai JSONL bisa berupa angka, list atau null; semuanya dibaca sebagai teks ("" untuk null)
+    return [{str(k).strip().lower(): "" if v is None else str(v).strip() for k, v in b.items()} for b in baris]
+
+
+def buat_id(nomor, baris):
+    if baris.get("id"):
+        return re.sub(r"[^\w.-]+", "_", str(baris["id"]))
+    dasar = str(baris.get("topik") or os.path.basename(str(baris.get("pdf", "")).split(";")[0]))
+    slug = re.sub(r"[^a-z0-9]+", "_", dasar.lower()).strip("_")[:60]
+    return f"{nomor:04d}_{slug}"
+
+
+def sudah_selesai(path_json):
+    try:
+        with open(path_json, encoding="utf-8") as f:
+            return json.load(f).get("status") == "ok"
+    except (OSError, ValueError):
+        return False
+
+
+def tulis_atomik(path, data):
+    # Ditulis ke file sementara lalu di-rename agar file setengah jadi tidak dianggap selesai
+    sementara = path + ".tmp"
+    with open(sementara, "wb") as f:
+        f.write(data)
+    os.replace(sementara, path)
+
+
+def baca_rentang(teks):
+    # "5-40" -> (4, 40), "10-" -> (9, None), "7" -> (6, 7); nomor halaman dimulai dari 1
+    if not teks:
+        return None
+    awal, pisah, akhir = str(teks).partition("-")
+    awal = int(awal or 1)
+    akhir = (int(akhir) if akhir.strip() else None) if pisah else awal
+    if awal < 1 or (akhir is not None and akhir < awal):
+        raise ValueError(f"Rentang halaman tidak valid: {teks}")
+    return awal - 1, akhir
+
+
+def proses_baris(pembuat, baris, mesin_default):
+    if baris.get("pdf"):
+        # PDF dibuka langsung dari path, tidak dibaca utuh ke memori
+        daftar_file = []
+        for path in str(baris["pdf"]).split(";"):
+            if not os.path.isfile(path.strip()):
+                raise FileNotFoundError(f"File PDF tidak ditemukan: {path.strip()}")
+            daftar_file.append((os.path.basename(path.strip()), path.strip()))
+        fokus_topik = baris.get("fokus") or ""
+        dokumen = pembuat.extract_text_dari_banyak_pdf(daftar_file, baca_rentang(baris.get("halaman")))
+        if not dokumen:
+            raise RuntimeError("Teks PDF tidak dapat diekstrak")
+        if len(dokumen) == 1:
+            _, kunci_dokumen, teks = dokumen[0]
+            konteks = pembuat.siapkan_konteks_pdf(teks, kunci_dokumen, fokus_topik)
+        else:
+            konteks = pembuat.gabungkan_konteks_pdf(dokumen, fokus_topik)
+        daftar_nama = [nama for nama, _, _ in dokumen]
+        sumber_info = buat_sumber_info_pdf(daftar_nama, fokus_topik)
+        sumber_referensi = None
+        arsip = {
+            "jenis": "pdf",
+            "kueri": ", ".join(daftar_nama) + (f" — {fokus_topik}" if fokus_topik else ""),
+            "sumber_dokumen": daftar_nama,
+            "sidik": sidik_pdf([kunci for _, kunci, _ in dokumen], fokus_topik),
+            "sidik_sumber": [kunci for _, kunci, _ in dokumen],
+        }
+    elif baris.get("topik"):
+        mesin = baris.get("mesin") or mesin_default
+        if mesin not in MESIN_VALID:
+            raise ValueError(f"Mesin pencari tidak dikenal: {mesin}")
+        konteks, sumber_referensi = pembuat.cari_web(mesin, baris["topik"])
+        if not konteks:
+            raise RuntimeError("Pencarian web tidak menemukan hasil")
+        sumber_info = f"Pencarian web: '{baris['topik']}'"
+        arsip = {
+            "jenis": "web",
+            "kueri": baris["topik"],
+            "sumber_dokumen": None,
+            "sidik": sidik_web(mesin, baris["topik"]),
+            "sidik_sumber": sumber_referensi,
+        }
+    else:
+        raise ValueError("Baris harus memiliki kolom 'topik' atau 'pdf'")
+
+    hasil_brief, kode_grafik = pembuat.generate_brief_dan_grafik(sumber_info, konteks)
+    if not hasil_brief:
+        raise RuntimeError("AI gagal menyusun brief")
+    return {"hasil_brief": hasil_brief, "kode_grafik": kode_grafik, "sumber_referensi": sumber_referensi, "arsip": arsip}
+
+
+def jalankan_satu(nomor, baris, folder, model, cache_llm, cache_pencarian, pengaturan, mesin_default, klien, arsip, rute):
+    id_brief = buat_id(nomor, baris)
+    pembuat = PembuatBrief(
+        model,
+        cache_llm,
+        cache_pencarian,
+        pengaturan,
+        lapor=LaporLog(logging.getLogger(f"pbg.{id_brief}")),
+        klien=klien,
+        rute=rute,
+    )
+    mulai = time.perf_counter()
+    catatan = {"id": id_brief, "masukan": baris}
+    try:
+        catatan.update(proses_baris(pembuat, baris, mesin_default))
+        tulis_atomik(
+            os.path.join(folder, f"{id_brief}.docx"),
+            convert_to_docx(catatan["hasil_brief"], jejak=pembuat.jejak),
+        )
+        catatan["arsip"]["id"] = arsip.simpan(
+            hasil_brief=catatan["hasil_brief"],
+            kode_grafik=catatan["kode_grafik"],
+            sumber_referensi=catatan["sumber_referensi"],
+            **catatan["arsip"],
+        )
+        catatan["status"] = "ok"
+    except Exception as e:
+        logger.error("%s gagal: %s", id_brief, e)
+        catatan.update(status="gagal", pesan=str(e))
+    catatan["waktu_detik"] = round(time.perf_counter() - mulai, 2)
+    catatan["jejak"] = pembuat.jejak.daftar()
+    tulis_atomik(
+        os.path.join(folder, f"{id_brief}.json"),
+        json.dumps(catatan, ensure_ascii=False, indent=2).encode("utf-8"),
+    )
+    return id_brief, catatan["status"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Buat policy brief dari daftar topik atau PDF tanpa UI.")
+    parser.add_argument("masukan", help="File CSV atau JSONL berisi daftar topik/PDF")
+    parser.add_argument("--output", default="hasil_brief", help="Folder keluaran .docx dan .json")
+    parser.add_argument("--workers", type=int, default=4, help="Jumlah baris yang diproses bersamaan")
+    parser.add_argument("--engine", default="DuckDuckGo", choices=MESIN_VALID, help="Mesin pencari default")
+    parser.add_argument("--ulang", action="store_true", help="Proses ulang baris yang sudah selesai")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    secrets = baca_sumber_pengaturan()
+    if not secrets.get("GOOGLE_API_KEY"):
+        parser.error(f"GOOGLE_API_KEY tidak ditemukan di environment maupun {PATH_SECRETS}")
+    try:
+        pengaturan = Pengaturan.dari_mapping(secrets)
+        atur_ketahanan(pengaturan)
+    except ValueError as e:
+        parser.error(f"Pengaturan tidak valid: {e}")
+    model = buat_model(secrets["GOOGLE_API_KEY"], pengaturan)
+    rute = buat_rute_model(pengaturan, model)
+    cache_llm = buat_cache_llm(pengaturan)
+    cache_pencarian = buat_cache_pencarian(pengaturan)
+    klien = KumpulanKlien(model).panaskan()
+    arsip = ArsipBrief(pengaturan.arsip_path)
+    if pengaturan.port_metrik:
+        pelacakan.mulai_server_metrik(pengaturan.port_metrik)
+        logger.info("Metrik Prometheus di http://localhost:%d/metrics", pengaturan.port_metrik)
+
+    os.makedirs(args.output, exist_ok=True)
+    # Baris tanpa topik maupun PDF (misal baris kosong di CSV) dilewati; nomor baris tetap
+    masukan = list(enumerate(baca_masukan(args.masukan), start=1))
+    semua_baris = [(nomor, baris) for nomor, baris in masukan if baris.get("topik") or baris.get("pdf")]
+    if len(semua_baris) < len(masukan):
+        logger.warning("%d baris tanpa topik maupun pdf dilewati", len(masukan) - len(semua_baris))
+    antrean = [
+        (nomor, baris) for nomor, baris in semua_baris
+        if args.ulang or not sudah_selesai(os.path.join(args.output, f"{buat_id(nomor, baris)}.json"))
+    ]
+    logger.info("%d baris, %d sudah selesai, %d diproses", len(semua_baris), len(semua_baris) - len(antrean), len(antrean))
+
+    gagal = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(
+                jalankan_satu,
+                nomor, baris, args.output, model, cache_llm, cache_pencarian, pengaturan, args.engine, klien, arsip, rute,
+            )
+            for nomor, baris in antrean
+        ]
+        for selesai, future in enumerate(as_completed(futures), start=1):
+            id_brief, status = future.result()
+            gagal += status != "ok"
+            logger.info("[%d/%d] %s: %s", selesai, len(futures), id_brief, status)
+
+    logger.info("Selesai: %d berhasil, %d gagal", len(antrean) - gagal, gagal)
+    logger.info("Statistik klien: %s", json.dumps(klien.kesehatan()["statistik"]))
+    logger.info("Statistik ketahanan: %s", json.dumps(ketahanan.statistik()))
+    logger.info("Statistik rute model: %s", json.dumps(rute.statistik()))
+    logger.info("Statistik tahap: %s", json.dumps(pelacakan.ringkasan()))
+    return 1 if gagal else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
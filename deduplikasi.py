@@ -0,0 +1,141 @@
+# Deduplikasi konteks sebelum dikirim ke model:
+# 1. Furnitur halaman PDF (header, footer, nomor halaman) yang berulang di banyak halaman dibuang.
+# 2. Passage yang hampir sama (cuplikan mesin pencari, halaman mirror, sumber PDF berbeda dengan
+#    isi sama) dideteksi dengan MinHash + LSH; kemunculan pertama yang dipertahankan.
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from anggaran_token import pecah_passage
+from ringkasan import perkiraan_token
+
+POLA_KATA = re.compile(r"\w+")
+POLA_KATA_HURUF = re.compile(r"[^\W\d_]+")
+POLA_ANGKA = re.compile(r"\d+")
+# Penanda nomor halaman di akhir baris ("Halaman 3 dari 120", "Laporan 2023 | Hal. 7"): hanya
+# di baris seperti ini angkanya diabaikan saat membandingkan antarhalaman
+POLA_NOMOR_HALAMAN = re.compile(r"\b(?:halaman|hal|hlm|page)\b\.?\s*\d+(?:\s*(?:dari|of|/)\s*\d+)?$")
+BARIS_TEPI = 3  # Header/footer hanya dicari di beberapa baris pertama dan terakhir tiap halaman
+MIN_KATA_FURNITUR = 3  # Baris pendek tanpa penanda halaman (label tabel) tidak pernah dibuang
+MAX_KARAKTER_FURNITUR = 200
+
+UKURAN_SHINGLE = 3
+JUMLAH_PERMUTASI = 64
+JUMLAH_BAND = 8  # 8 band x 8 baris: pasangan dengan kemiripan Jaccard di atas ~0,77 hampir pasti bertemu
+# Passage besar tanpa baris kosong (teks PDF) dibandingkan per potongan seukuran paragraf
+MAX_TOKEN_PASSAGE = 120
+PRIMA = (1 << 61) - 1
+MASK_32_BIT = np.uint64((1 << 32) - 1)
+
+# Permutasi universal (a * h + b) mod p; perkalian uint64 boleh overflow (seperti datasketch)
+_acak = np.random.default_rng(20240601)
+_A = _acak.integers(1, PRIMA, JUMLAH_PERMUTASI, dtype=np.uint64)
+_B = _acak.integers(0, PRIMA, JUMLAH_PERMUTASI, dtype=np.uint64)
+
+
+# --- Furnitur halaman PDF ---
+
+def _kunci_furnitur(baris):
+    # None jika baris tidak boleh dianggap furnitur: baris angka saja (sel tabel) dan baris
+    # dengan kurang dari MIN_KATA_FURNITUR kata tanpa penanda halaman ("Semarang", "Jumlah")
+    baris = " ".join(baris.lower().split())
+    if not POLA_KATA_HURUF.search(baris) or len(baris) > MAX_KARAKTER_FURNITUR:
+        return None
+    if POLA_NOMOR_HALAMAN.search(baris):
+        return POLA_ANGKA.sub("#", baris)
+    if len(POLA_KATA_HURUF.findall(baris)) < MIN_KATA_FURNITUR:
+        return None
+    return baris
+
+
+def _indeks_tepi(baris):
+    # Posisi BARIS_TEPI baris tidak kosong pertama dan terakhir di satu halaman
+    terisi = [i for i, b in enumerate(baris) if b.strip()]
+    return set(terisi[:BARIS_TEPI] + terisi[-BARIS_TEPI:])
+
+
+def buang_furnitur_halaman(halaman, min_halaman=3, ambang=0.5):
+    # Baris di tepi atas/bawah halaman yang muncul di tepi setidaknya `ambang` bagian halaman
+    # (minimal min_halaman halaman) dianggap header/footer. Isi halaman (termasuk tabel) tidak
+    # pernah disentuh. Mengembalikan (halaman_bersih, info).
+    info = {"baris_dibuang": 0, "token_dihemat": 0}
+    if len(halaman) < min_halaman:
+        return list(halaman), info
+    per_halaman = [teks.splitlines() for teks in halaman]
+    kemunculan = Counter()
+    for baris in per_halaman:
+        kunci = {_kunci_furnitur(baris[i]) for i in _indeks_tepi(baris)}
+        kemunculan.update(kunci - {None})
+    batas = max(min_halaman, ambang * len(halaman))
+    furnitur = {kunci for kunci, n in kemunculan.items() if n >= batas}
+    if not furnitur:
+        return list(halaman), info
+
+    bersih = []
+    for baris in per_halaman:
+        tepi = _indeks_tepi(baris)
+        disimpan = [b for i, b in enumerate(baris) if i not in tepi or _kunci_furnitur(b) not in furnitur]
+        info["baris_dibuang"] += len(baris) - len(disimpan)
+        bersih.append("\n".join(disimpan) + "\n")
+    info["token_dihemat"] = max(0, perkiraan_token("".join(halaman)) - perkiraan_token("".join(bersih)))
+    return bersih, info
+
+
+# --- Passage hampir sama (MinHash + LSH) ---
+
+def shingle(teks, k=UKURAN_SHINGLE):
+    kata = POLA_KATA.findall(teks.lower())
+    if len(kata) <= k:
+        return {" ".join(kata)} if kata else set()
+    return {" ".join(kata[i:i + k]) for i in range(len(kata) - k + 1)}
+
+
+def signature_minhash(daftar_teks):
+    # Satu baris signature per teks; semua permutasi dihitung sekaligus per teks dengan NumPy.
+    # Teks tanpa kata mendapat signature kosong (None).
+    signature = []
+    for teks in daftar_teks:
+        himpunan = shingle(teks)
+        if not himpunan:
+            signature.append(None)
+            continue
+        nilai_hash = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in himpunan), dtype=np.uint64, count=len(himpunan))
+        with np.errstate(over="ignore"):
+            permutasi = ((np.outer(nilai_hash, _A) + _B) % np.uint64(PRIMA)) & MASK_32_BIT
+        signature.append(permutasi.min(axis=0))
+    return signature
+
+
+def cari_duplikat(daftar_teks, ambang=0.8):
+    # Indeks teks yang hampir sama (perkiraan Jaccard >= ambang) dengan teks sebelumnya
+    signature = signature_minhash(daftar_teks)
+    baris_per_band = JUMLAH_PERMUTASI // JUMLAH_BAND
+    bucket = {}
+    duplikat = set()
+    for i, sig in enumerate(signature):
+        if sig is None:
+            continue
+        kunci_band = [(b, sig[b * baris_per_band:(b + 1) * baris_per_band].tobytes()) for b in range(JUMLAH_BAND)]
+        kandidat = {j for kunci in kunci_band for j in bucket.get(kunci, ())}
+        if any(np.mean(sig == signature[j]) >= ambang for j in kandidat):
+            duplikat.add(i)
+            continue
+        for kunci in kunci_band:
+            bucket.setdefault(kunci, []).append(i)
+    return duplikat
+
+
+def hapus_duplikat_passage(konteks, ambang=0.8):
+    # Passage dipisah seperti di anggaran_token: baris kosong, lalu kelompok baris untuk passage besar
+    passage = pecah_passage(konteks, MAX_TOKEN_PASSAGE)
+    info = {"passage_awal": len(passage), "passage_dibuang": 0, "token_dihemat": 0}
+    if len(passage) < 2:
+        return konteks, info
+    duplikat = cari_duplikat(passage, ambang)
+    if not duplikat:
+        return konteks, info
+    hasil = "\n\n".join(p for i, p in enumerate(passage) if i not in duplikat)
+    info.update(passage_dibuang=len(duplikat), token_dihemat=max(0, perkiraan_token(konteks) - perkiraan_token(hasil)))
+    return hasil, info
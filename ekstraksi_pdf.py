@@ -0,0 +1,165 @@
+# Ekstraksi teks PDF paralel: halaman dibagi per rentang lalu diproses di process pool.
+# Sumber berupa path file (dibuka langsung dari disk, tanpa menyalin isinya ke memori) atau
+# bytes. Teks per halaman disimpan di cache memori berdasarkan SHA-256 isi file dan rentang
+# halaman; dokumen dengan teks sangat besar tidak di-cache.
+import hashlib
+import mmap
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from waktu_impor import impor
+
+HALAMAN_PER_TUGAS = 20
+MIN_HALAMAN_PARALEL = 40  # Dokumen kecil lebih cepat diproses langsung tanpa process pool
+MAX_DOKUMEN_CACHE = 16
+MAX_KARAKTER_CACHE = 2_000_000  # Per dokumen; teks yang lebih besar hanya dialirkan, tidak disimpan
+
+_pool = None
+_pool_lock = threading.Lock()
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _pekerja_bisa_dimuat():
+    # Proses forkserver mencari modul preload di direktori kerja dan PYTHONPATH saja (Python 3.11
+    # tidak meneruskan sys.path induk). Tanpa pekerja_pdf, worker akan menjalankan ulang app.py.
+    folder = os.path.dirname(os.path.abspath(__file__))
+    jalur = [os.getcwd(), *os.environ.get("PYTHONPATH", "").split(os.pathsep)]
+    return any(os.path.isdir(p) and os.path.samefile(p, folder) for p in jalur if p)
+
+
+def _get_pool():
+    # Satu process pool dipakai bersama oleh semua sesi. Worker dibuat lewat "forkserver"
+    # (proses server satu thread yang sudah memuat PyMuPDF), bukan fork dari server Streamlit
+    # yang multi-thread. pekerja_pdf mencegah worker menjalankan ulang __main__ (app.py); jika
+    # modul itu tidak bisa dimuat, None dikembalikan dan halaman diekstrak tanpa pool.
+    global _pool
+    with _pool_lock:
+        if _pool is None and _pekerja_bisa_dimuat():
+            konteks = multiprocessing.get_context("forkserver")
+            konteks.set_forkserver_preload(["pekerja_pdf", __name__, "fitz"])
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 2, mp_context=konteks)
+        return _pool
+
+
+def _ekstrak_rentang(path, awal, akhir):
+    # Dijalankan di proses worker: setiap worker membuka file sendiri dari disk
+    with impor("fitz").open(path) as doc:
+        return awal, [doc[i].get_text() for i in range(awal, akhir)]
+
+
+def _adalah_path(sumber):
+    return isinstance(sumber, (str, os.PathLike))
+
+
+def ukuran_sumber(sumber):
+    return os.path.getsize(sumber) if _adalah_path(sumber) else len(sumber)
+
+
+def hash_dokumen(sumber):
+    if not _adalah_path(sumber):
+        return hashlib.sha256(sumber).hexdigest()
+    # File di-mmap sehingga hash dihitung tanpa membaca seluruh isi ke memori Python
+    with open(sumber, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256(b"").hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as peta:
+            return hashlib.sha256(peta).hexdigest()
+
+
+def kunci_ekstraksi(sumber, rentang=None):
+    # Rentang halaman ikut menjadi bagian kunci karena teksnya berbeda
+    kunci = hash_dokumen(sumber)
+    return f"{kunci}:{rentang[0]}-{rentang[1]}" if rentang else kunci
+
+
+def _buka(sumber):
+    if _adalah_path(sumber):
+        return impor("fitz").open(sumber)
+    return impor("fitz").open(stream=sumber, filetype="pdf")
+
+
+def _ambil_cache(kunci):
+    with _cache_lock:
+        if kunci in _cache:
+            _cache.move_to_end(kunci)
+            return _cache[kunci]
+    return None
+
+
+def _simpan_cache(kunci, halaman):
+    with _cache_lock:
+        _cache[kunci] = halaman
+        _cache.move_to_end(kunci)
+        while len(_cache) > MAX_DOKUMEN_CACHE:
+            _cache.popitem(last=False)
+
+
+def _iter_halaman(sumber, rentang, progress):
+    with _buka(sumber) as doc:
+        awal, akhir = rentang or (0, doc.page_count)
+        awal, akhir = max(0, awal), min(doc.page_count if akhir is None else akhir, doc.page_count)
+        jumlah_halaman = max(0, akhir - awal)
+        pool = _get_pool() if jumlah_halaman >= MIN_HALAMAN_PARALEL else None
+        if pool is None:
+            for nomor, i in enumerate(range(awal, akhir), start=1):
+                yield doc[i].get_text()
+                if progress:
+                    progress(nomor, jumlah_halaman)
+            return
+
+    # Path dibuka langsung oleh worker; bytes ditulis sekali ke disk agar worker tidak perlu
+    # menerima salinan bytes per tugas
+    path = sumber
+    if not _adalah_path(sumber):
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp.write(sumber)
+            path = tmp.name
+    futures = [
+        pool.submit(_ekstrak_rentang, path, mulai, min(mulai + HALAMAN_PER_TUGAS, akhir))
+        for mulai in range(awal, akhir, HALAMAN_PER_TUGAS)
+    ]
+    try:
+        # Rentang dikerjakan paralel tetapi halamannya dialirkan sesuai urutan dokumen
+        selesai = 0
+        for future in futures:
+            _, teks_rentang = future.result()
+            for teks in teks_rentang:
+                yield teks
+            selesai += len(teks_rentang)
+            if progress:
+                progress(selesai, jumlah_halaman)
+    finally:
+        # Konsumen yang berhenti lebih awal membatalkan rentang yang belum dikerjakan
+        for future in futures:
+            future.cancel()
+        if path is not sumber:
+            os.remove(path)
+
+
+def iter_halaman_pdf(sumber, progress=None, rentang=None, kunci=None):
+    # Generator teks per halaman. rentang (awal, akhir) berbasis 0 dengan akhir eksklusif;
+    # akhir None berarti sampai halaman terakhir. progress(selesai, total) dipanggil setiap
+    # ada halaman yang selesai diekstrak. kunci bisa diisi kunci_ekstraksi() yang sudah dihitung.
+    kunci = kunci or kunci_ekstraksi(sumber, rentang)
+    halaman = _ambil_cache(kunci)
+    if halaman is not None:
+        if progress:
+            progress(1, 1)
+        yield from halaman
+        return
+    terkumpul, karakter = [], 0
+    for teks in _iter_halaman(sumber, rentang, progress):
+        if terkumpul is not None:
+            karakter += len(teks)
+            terkumpul.append(teks)
+            if karakter > MAX_KARAKTER_CACHE:
+                terkumpul = None
+        yield teks
+    if terkumpul is not None:
+        _simpan_cache(kunci, tuple(terkumpul))
+
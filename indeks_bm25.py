@@ -0,0 +1,114 @@
+# Indeks BM25 lokal (offline) untuk memilih bagian dokumen yang relevan dengan fokus topik.
+# Posting list disimpan sebagai array NumPy sehingga skor semua passage dihitung sekaligus.
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from ringkasan import perkiraan_token
+
+POLA_TOKEN = re.compile(r"\w+")
+MAX_INDEKS_CACHE = 16
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def tokenisasi(teks):
+    return POLA_TOKEN.findall(teks.lower())
+
+
+def pecah_passage(teks, max_karakter=1000):
+    # Teks PDF jarang memiliki baris kosong antar paragraf, jadi baris-baris digabung
+    # menjadi passage sampai max_karakter; baris kosong dipakai sebagai titik potong yang disukai.
+    daftar_passage, sekarang, panjang = [], [], 0
+    for baris in teks.splitlines():
+        baris = baris.strip()
+        if not baris:
+            if panjang >= max_karakter // 2:
+                daftar_passage.append(" ".join(sekarang))
+                sekarang, panjang = [], 0
+            continue
+        if panjang + len(baris) > max_karakter and sekarang:
+            daftar_passage.append(" ".join(sekarang))
+            sekarang, panjang = [], 0
+        sekarang.append(baris)
+        panjang += len(baris) + 1
+    if sekarang:
+        daftar_passage.append(" ".join(sekarang))
+    return daftar_passage
+
+
+class IndeksBM25:
+
+    def __init__(self, daftar_passage, k1=1.5, b=0.75):
+        self.passage = daftar_passage
+        self.kosakata = {}
+        id_term, panjang_dok = [], []
+        for passage in daftar_passage:
+            token = tokenisasi(passage)
+            id_term.extend(self.kosakata.setdefault(t, len(self.kosakata)) for t in token)
+            panjang_dok.append(len(token))
+
+        n_dok = len(daftar_passage)
+        panjang_dok = np.asarray(panjang_dok, dtype=np.float32)
+        id_term = np.asarray(id_term, dtype=np.int64)
+        id_dok = np.repeat(np.arange(n_dok, dtype=np.int64), panjang_dok.astype(np.int64))
+
+        # Pasangan (term, dokumen) unik diurutkan per term -> posting list bergaya CSC
+        kode, tf = np.unique(id_term * n_dok + id_dok, return_counts=True)
+        posting_term = kode // max(n_dok, 1)
+        self._posting_dok = kode % max(n_dok, 1)
+        self._indptr = np.searchsorted(posting_term, np.arange(len(self.kosakata) + 1))
+
+        df = np.diff(self._indptr)
+        idf = np.log1p((n_dok - df + 0.5) / (df + 0.5)).astype(np.float32)
+        rata_panjang = panjang_dok.mean() if n_dok else 1.0
+        norm = k1 * (1 - b + b * panjang_dok[self._posting_dok] / max(rata_panjang, 1.0))
+        # Bobot BM25 per posting dihitung sekali saat indeks dibangun
+        self._bobot = idf[posting_term] * tf * (k1 + 1) / (tf + norm)
+
+    def skor(self, query):
+        id_query = {self.kosakata[t] for t in tokenisasi(query) if t in self.kosakata}
+        skor = np.zeros(len(self.passage), dtype=np.float32)
+        if not id_query:
+            return skor
+        potongan = [slice(self._indptr[t], self._indptr[t + 1]) for t in id_query]
+        dok = np.concatenate([self._posting_dok[s] for s in potongan])
+        bobot = np.concatenate([self._bobot[s] for s in potongan])
+        return np.bincount(dok, weights=bobot, minlength=len(self.passage)).astype(np.float32)
+
+    def cari(self, query, k=10):
+        skor = self.skor(query)
+        k = min(k, int(np.count_nonzero(skor)))
+        if k == 0:
+            return []
+        teratas = np.argpartition(-skor, k - 1)[:k]
+        return sorted(teratas.tolist(), key=lambda i: -skor[i])
+
+    def pilih_konteks(self, query, batas_token, k=200):
+        # Passage teratas diambil sampai anggaran token habis, lalu disusun ulang
+        # sesuai urutan aslinya di dokumen agar alurnya tetap runtut.
+        terpilih, total = [], 0
+        for i in self.cari(query, k):
+            token = perkiraan_token(self.passage[i])
+            if total + token > batas_token:
+                break
+            terpilih.append(i)
+            total += token
+        return "\n\n".join(self.passage[i] for i in sorted(terpilih))
+
+
+def indeks_untuk_dokumen(kunci, teks):
+    # Indeks dibangun sekali per dokumen (dikunci dengan hash file) dan dipakai ulang
+    with _cache_lock:
+        if kunci in _cache:
+            _cache.move_to_end(kunci)
+            return _cache[kunci]
+    indeks = IndeksBM25(pecah_passage(teks))
+    with _cache_lock:
+        _cache[kunci] = indeks
+        while len(_cache) > MAX_INDEKS_CACHE:
+            _cache.popitem(last=False)
+    return indeks
@@ -0,0 +1,221 @@
+# Ketahanan panggilan ke layanan luar (Gemini, DuckDuckGo, Google): pembatas laju token
+# bucket per backend yang dibagi semua sesi dalam proses, coba ulang dengan exponential
+# backoff + jitter untuk galat sementara (429/5xx, timeout), dan pemutus sirkuit untuk
+# backend yang terus gagal. Saat beban tinggi permintaan diperlambat, bukan langsung gagal.
+import random
+import threading
+import time
+
+# Nama kelas galat sementara dari library pihak ketiga, dicek lewat nama agar modul ini
+# tidak perlu mengimpor library tersebut
+GALAT_SEMENTARA = {
+    "RatelimitException",  # duckduckgo_search
+    "TimeoutException",
+    "ConnectionError",  # requests (googlesearch) dan bawaan Python
+    "ConnectTimeout",
+    "ReadTimeout",
+    "Timeout",
+    "TimeoutError",
+}
+
+# Laju default (permintaan per menit) dan kapasitas ledakan per backend
+BATAS_DEFAULT = {
+    "gemini": {"laju_per_menit": 60.0, "kapasitas": 10},
+    "duckduckgo": {"laju_per_menit": 20.0, "kapasitas": 3},
+    "google": {"laju_per_menit": 10.0, "kapasitas": 2},
+}
+
+
+class SirkuitTerbuka(Exception):
+    pass
+
+
+def kode_status(e):
+    # google.api_core memakai .code, requests/httpx menyimpan status di .response
+    for atribut in ("code", "status_code"):
+        nilai = getattr(e, atribut, None)
+        if isinstance(nilai, int):
+            return nilai
+    return getattr(getattr(e, "response", None), "status_code", None)
+
+
+def boleh_dicoba_ulang(e):
+    kode = kode_status(e)
+    if kode is not None:
+        return kode == 429 or 500 <= kode < 600
+    return any(kelas.__name__ in GALAT_SEMENTARA for kelas in type(e).__mro__)
+
+
+class TokenBucket:
+
+    def __init__(self, laju_per_menit, kapasitas):
+        self.laju = laju_per_menit / 60
+        self.kapasitas = kapasitas
+        self._token = float(kapasitas)
+        self._terakhir = time.monotonic()
+        self._lock = threading.Lock()
+
+    def atur(self, laju_per_menit, kapasitas):
+        with self._lock:
+            self.laju = laju_per_menit / 60
+            self.kapasitas = kapasitas
+
+    def ambil(self):
+        # Token dipesan lebih dulu (saldo boleh negatif) sehingga pemanggil bersamaan antre
+        # secara adil; mengembalikan lama menunggu dalam detik
+        with self._lock:
+            sekarang = time.monotonic()
+            self._token = min(self.kapasitas, self._token + (sekarang - self._terakhir) * self.laju)
+            self._terakhir = sekarang
+            self._token -= 1
+            tunggu = -self._token / self.laju if self._token < 0 else 0.0
+        if tunggu:
+            time.sleep(tunggu)
+        return tunggu
+
+
+class PemutusSirkuit:
+    # tertutup -> terbuka setelah ambang_gagal galat sementara berturut-turut; setelah
+    # jeda_pulih detik satu panggilan percobaan diizinkan (setengah terbuka)
+
+    def __init__(self, ambang_gagal=5, jeda_pulih=30.0):
+        self.ambang_gagal = ambang_gagal
+        self.jeda_pulih = jeda_pulih
+        self.status = "tertutup"
+        self._gagal_beruntun = 0
+        self._dibuka_pada = 0.0
+        self._lock = threading.Lock()
+
+    def izinkan(self):
+        with self._lock:
+            if self.status == "tertutup":
+                return True
+            if self.status == "terbuka" and time.monotonic() - self._dibuka_pada >= self.jeda_pulih:
+                self.status = "setengah_terbuka"
+                return True
+            return False
+
+    def sisa_jeda(self):
+        return max(0.0, self.jeda_pulih - (time.monotonic() - self._dibuka_pada))
+
+    def catat_berhasil(self):
+        with self._lock:
+            self.status = "tertutup"
+            self._gagal_beruntun = 0
+
+    def catat_gagal(self):
+        with self._lock:
+            self._gagal_beruntun += 1
+            if self.status == "setengah_terbuka" or self._gagal_beruntun >= self.ambang_gagal:
+                self.status = "terbuka"
+                self._dibuka_pada = time.monotonic()
+
+
+class Backend:
+
+    def __init__(self, nama, laju_per_menit, kapasitas, max_percobaan=4, jeda_dasar=1.0, jeda_maks=30.0,
+                 ambang_gagal=5, jeda_pulih=30.0):
+        self.nama = nama
+        self.bucket = TokenBucket(laju_per_menit, kapasitas)
+        self.sirkuit = PemutusSirkuit(ambang_gagal, jeda_pulih)
+        self.max_percobaan = max_percobaan
+        self.jeda_dasar = jeda_dasar
+        self.jeda_maks = jeda_maks
+        self._metrik = {"panggilan": 0, "dibatasi": 0, "detik_menunggu": 0.0, "dicoba_ulang": 0, "gagal": 0, "ditolak_sirkuit": 0}
+        self._lock = threading.Lock()
+
+    def _catat(self, **tambahan):
+        with self._lock:
+            for kunci, nilai in tambahan.items():
+                self._metrik[kunci] += nilai
+
+    def jalankan(self, fungsi, *args, **kwargs):
+        return self.jalankan_terbatas(self.max_percobaan, fungsi, *args, **kwargs)
+
+    def jalankan_terbatas(self, max_percobaan, fungsi, *args, **kwargs):
+        # Percobaan lebih sedikit dipakai jika pemanggil punya cadangan (misal model lain)
+        # yang lebih baik langsung dicoba daripada menunggu backoff
+        self._catat(panggilan=1)
+        for percobaan in range(1, max_percobaan + 1):
+            if not self.sirkuit.izinkan():
+                self._catat(ditolak_sirkuit=1)
+                raise SirkuitTerbuka(
+                    f"{self.nama} sedang gagal berulang kali; coba lagi dalam {self.sirkuit.sisa_jeda():.0f} detik"
+                )
+            tunggu = self.bucket.ambil()
+            if tunggu:
+                self._catat(dibatasi=1, detik_menunggu=tunggu)
+            try:
+                hasil = fungsi(*args, **kwargs)
+            except Exception as e:
+                if not boleh_dicoba_ulang(e):
+                    # Backend menjawab (misal permintaan ditolak atau jawaban diblokir), jadi sirkuit
+                    # ditutup; tanpa ini panggilan percobaan setengah terbuka tidak pernah dilepas
+                    self.sirkuit.catat_berhasil()
+                    raise
+                self.sirkuit.catat_gagal()
+                if percobaan == max_percobaan:
+                    self._catat(gagal=1)
+                    raise
+                self._catat(dicoba_ulang=1)
+                # Full jitter: jeda acak antara 0 dan batas eksponensial
+                time.sleep(random.uniform(0, min(self.jeda_maks, self.jeda_dasar * 2 ** (percobaan - 1))))
+                continue
+            self.sirkuit.catat_berhasil()
+            return hasil
+
+    def statistik(self):
+        with self._lock:
+            metrik = dict(self._metrik)
+        metrik["detik_menunggu"] = round(metrik["detik_menunggu"], 2)
+        metrik["sirkuit"] = self.sirkuit.status
+        return metrik
+
+
+_backend = {}
+_backend_lock = threading.Lock()
+
+
+def get_backend(nama):
+    # Satu Backend per nama untuk seluruh proses, dibagi semua sesi dan thread. Backend turunan
+    # ("gemini/<model>") punya sirkuit sendiri, tetapi mengambil token dari bucket induknya
+    # karena semua model memakai kuota API key yang sama.
+    with _backend_lock:
+        return _get_backend(nama)
+
+
+def _get_backend(nama):
+    # Dipanggil dengan _backend_lock dipegang
+    if nama not in _backend:
+        dasar = nama.split("/")[0]
+        backend = Backend(nama, **BATAS_DEFAULT.get(dasar, {"laju_per_menit": 60.0, "kapasitas": 5}))
+        if dasar != nama:
+            backend.bucket = _get_backend(dasar).bucket
+        _backend[nama] = backend
+    return _backend[nama]
+
+
+def atur(nama, laju_per_menit, kapasitas=None):
+    # Murah dipanggil berulang (misal setiap rerun); saldo token yang ada tidak direset.
+    # Backend turunan memakai bucket yang sama sehingga ikut diatur. Laju 0 atau negatif ditolak
+    # di sini karena token bucket membagi dengan laju; backend tidak bisa dimatikan lewat laju.
+    if laju_per_menit <= 0:
+        raise ValueError(f"Laju {nama} harus lebih dari 0 permintaan per menit, bukan {laju_per_menit}")
+    bucket = get_backend(nama).bucket
+    bucket.atur(laju_per_menit, kapasitas or bucket.kapasitas)
+
+
+def jalankan(nama, fungsi, *args, **kwargs):
+    return get_backend(nama).jalankan(fungsi, *args, **kwargs)
+
+
+def jalankan_terbatas(nama, max_percobaan, fungsi, *args, **kwargs):
+    # max_percobaan None berarti batas bawaan backend
+    backend = get_backend(nama)
+    return backend.jalankan_terbatas(max_percobaan or backend.max_percobaan, fungsi, *args, **kwargs)
+
+
+def statistik():
+    with _backend_lock:
+        daftar = list(_backend.values())
+    return {backend.nama: backend.statistik() for backend in daftar}
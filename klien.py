@@ -0,0 +1,133 @@
+# Klien jaringan bersama (DuckDuckGo, HTTP untuk unduh halaman, Gemini) yang hidup selama
+# proses berjalan, sehingga koneksi dan TLS handshake dipakai ulang lintas permintaan dan sesi.
+# Klien dipanaskan di thread latar belakang dan mencatat statistik pemakaian sederhana.
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+
+import ketahanan
+from waktu_impor import impor
+
+
+class _Statistik:
+
+    def __init__(self):
+        self.pemakaian = 0
+        self.gagal = 0
+        self.total_detik = 0.0
+        self.terakhir_dipakai = None
+
+    def sebagai_dict(self):
+        return {
+            "pemakaian": self.pemakaian,
+            "gagal": self.gagal,
+            "rata_rata_ms": round(self.total_detik / self.pemakaian * 1000, 1) if self.pemakaian else None,
+            "terakhir_dipakai": self.terakhir_dipakai,
+        }
+
+
+class KumpulanKlien:
+
+    def __init__(self, model=None, max_koneksi_http=20, timeout_http=10.0):
+        self.model = model
+        self.max_koneksi_http = max_koneksi_http
+        self.timeout_http = timeout_http
+        self.status_pemanasan = "belum"
+        self._ddgs = None
+        # Reentrant: cari_duckduckgo memegang lock ini saat memanggil _get_ddgs
+        self._ddgs_lock = threading.RLock()
+        self._loop = None
+        self._http = None
+        self._http_lock = threading.Lock()
+        self._statistik = {"duckduckgo": _Statistik(), "http": _Statistik(), "gemini": _Statistik()}
+        self._statistik_lock = threading.Lock()
+
+    @contextmanager
+    def pakai(self, nama):
+        # Mencatat durasi dan keberhasilan setiap pemakaian backend
+        mulai = time.perf_counter()
+        berhasil = False
+        try:
+            yield
+            berhasil = True
+        finally:
+            with self._statistik_lock:
+                statistik = self._statistik[nama]
+                statistik.pemakaian += 1
+                statistik.gagal += not berhasil
+                statistik.total_detik += time.perf_counter() - mulai
+                statistik.terakhir_dipakai = time.strftime("%H:%M:%S")
+
+    # --- DuckDuckGo ---
+
+    def _get_ddgs(self):
+        # Dikunci agar pemanasan dan pencarian yang bersamaan tidak membuat dua instance DDGS
+        with self._ddgs_lock:
+            if self._ddgs is None:
+                self._ddgs = impor("duckduckgo_search").DDGS()
+            return self._ddgs
+
+    def cari_duckduckgo(self, query, **kwargs):
+        # Satu instance DDGS (dengan sesi HTTP-nya) dipakai bergantian oleh semua sesi
+        with self._ddgs_lock, self.pakai("duckduckgo"):
+            return list(self._get_ddgs().text(query, **kwargs))
+
+    # --- HTTP async untuk unduh halaman ---
+
+    def _get_http(self):
+        # Event loop khusus di thread latar belakang agar satu AsyncClient (dan pool
+        # koneksinya) bisa dipakai dari thread mana pun
+        with self._http_lock:
+            if self._loop is None:
+                httpx = impor("httpx")
+                pengambil_halaman = impor("pengambil_halaman")
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="klien-http", daemon=True).start()
+                self._http = httpx.AsyncClient(
+                    headers=pengambil_halaman.HEADER_DEFAULT,
+                    timeout=httpx.Timeout(self.timeout_http),
+                    follow_redirects=True,
+                    limits=httpx.Limits(
+                        max_connections=self.max_koneksi_http,
+                        max_keepalive_connections=self.max_koneksi_http // 2,
+                    ),
+                )
+            return self._loop, self._http
+
+    def jalankan_http(self, buat_coroutine):
+        # buat_coroutine(client) dijalankan di loop bersama; pemanggil menunggu hasilnya
+        loop, client = self._get_http()
+        with self.pakai("http"):
+            return asyncio.run_coroutine_threadsafe(buat_coroutine(client), loop).result()
+
+    # --- Pemanasan dan kesehatan ---
+
+    def panaskan(self):
+        threading.Thread(target=self._panaskan, name="klien-pemanasan", daemon=True).start()
+        return self
+
+    def _panaskan(self):
+        self.status_pemanasan = "berjalan"
+        mulai = time.perf_counter()
+        try:
+            self._get_ddgs()
+            self._get_http()
+            if self.model is not None:
+                # Panggilan ringan untuk membuka kanal dan TLS ke API Gemini lebih awal; tetap
+                # melewati batas laju dan pemutus sirkuit, tanpa coba ulang
+                with self.pakai("gemini"):
+                    ketahanan.jalankan_terbatas("gemini", 1, self.model.count_tokens, "ping")
+            self.status_pemanasan = f"siap ({time.perf_counter() - mulai:.1f} dtk)"
+        except Exception as e:
+            self.status_pemanasan = f"gagal: {e}"
+
+    def kesehatan(self):
+        with self._statistik_lock:
+            statistik = {nama: s.sebagai_dict() for nama, s in self._statistik.items()}
+        return {
+            "pemanasan": self.status_pemanasan,
+            "duckduckgo_siap": self._ddgs is not None,
+            "http_siap": self._loop is not None and self._loop.is_running(),
+            "statistik": statistik,
+        }
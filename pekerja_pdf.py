@@ -0,0 +1,14 @@
+# Dimuat hanya di proses forkserver yang meluncurkan worker ekstraksi PDF (lihat
+# set_forkserver_preload di ekstraksi_pdf.py); jangan diimpor dari proses utama.
+# Worker baru biasanya menjalankan ulang modul __main__ induknya, padahal di Streamlit __main__
+# adalah app.py. Fungsi worker ada di ekstraksi_pdf sehingga worker tidak memerlukan __main__,
+# jadi langkah itu dilewati di sini tanpa mengubah apa pun di proses server Streamlit.
+from multiprocessing import spawn
+
+
+def _lewati_main(_):
+    pass
+
+
+spawn._fixup_main_from_path = _lewati_main
+spawn._fixup_main_from_name = _lewati_main
@@ -0,0 +1,144 @@
+# Eksekusi pekerjaan pembuatan brief di latar belakang. Script Streamlit hanya mengirim
+# pekerjaan dan membaca statusnya, sehingga rerun, interaksi widget atau refresh browser
+# tidak membatalkan proses yang sedang berjalan. Pekerjaan disimpan per pemilik (ID sesi)
+# di memori proses dan dibersihkan setelah batas jumlah atau umur tercapai.
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_PESAN = 50  # Pesan progres terakhir yang disimpan per pekerjaan
+
+
+class Pekerjaan:
+
+    def __init__(self, pemilik, judul):
+        self.id = uuid.uuid4().hex[:12]
+        self.pemilik = pemilik
+        self.judul = judul
+        self.status = "antre"
+        self.dibuat = time.time()
+        self.mulai = None
+        self.selesai = None
+        self.pesan = []
+        self.progress = None  # (nilai 0..1, teks) dari progress bar terakhir
+        self.teks_stream = ""
+        self.hasil = None
+        self.error = None
+
+    @property
+    def aktif(self):
+        return self.status in ("antre", "berjalan")
+
+    def durasi(self):
+        if self.mulai is None:
+            return 0.0
+        return (self.selesai or time.time()) - self.mulai
+
+
+class _ProgressPekerjaan:
+
+    def __init__(self, pekerjaan):
+        self.pekerjaan = pekerjaan
+
+    def progress(self, nilai, text=None):
+        self.pekerjaan.progress = (nilai, text)
+
+    def empty(self):
+        self.pekerjaan.progress = None
+
+
+class LaporPekerjaan:
+    # Pengganti modul st untuk PembuatBrief yang berjalan di worker: pesan disimpan ke pekerjaan
+
+    def __init__(self, pekerjaan):
+        self.pekerjaan = pekerjaan
+
+    def _catat(self, jenis, pesan):
+        self.pekerjaan.pesan.append((jenis, str(pesan)))
+        del self.pekerjaan.pesan[:-MAX_PESAN]
+
+    def write(self, pesan):
+        self._catat("info", pesan)
+
+    def success(self, pesan):
+        self._catat("sukses", pesan)
+
+    def warning(self, pesan):
+        self._catat("peringatan", pesan)
+
+    def error(self, pesan):
+        self._catat("error", pesan)
+
+    def progress(self, nilai, text=None):
+        progress_bar = _ProgressPekerjaan(self.pekerjaan)
+        progress_bar.progress(nilai, text)
+        return progress_bar
+
+    def stream(self, teks):
+        self.pekerjaan.teks_stream = teks
+
+
+class PelaksanaPekerjaan:
+
+    def __init__(self, max_paralel=4, max_per_pemilik=20, umur_maks_detik=24 * 3600):
+        self.max_per_pemilik = max_per_pemilik
+        self.umur_maks_detik = umur_maks_detik
+        self._executor = ThreadPoolExecutor(max_workers=max_paralel, thread_name_prefix="pekerjaan")
+        self._pekerjaan = {}
+        self._lock = threading.Lock()
+
+    def kirim(self, pemilik, judul, fungsi):
+        # fungsi(lapor) dijalankan di worker dan mengembalikan hasil pekerjaan;
+        # lapor adalah LaporPekerjaan yang bisa diberikan ke PembuatBrief
+        pekerjaan = Pekerjaan(pemilik, judul)
+        with self._lock:
+            self._bersihkan(pemilik)
+            self._pekerjaan[pekerjaan.id] = pekerjaan
+        self._executor.submit(self._jalankan, pekerjaan, fungsi)
+        return pekerjaan
+
+    def _jalankan(self, pekerjaan, fungsi):
+        pekerjaan.status = "berjalan"
+        pekerjaan.mulai = time.time()
+        try:
+            pekerjaan.hasil = fungsi(LaporPekerjaan(pekerjaan))
+            pekerjaan.status = "selesai"
+        except Exception as e:
+            pekerjaan.error = str(e) or traceback.format_exc(limit=1)
+            pekerjaan.status = "gagal"
+        finally:
+            pekerjaan.selesai = time.time()
+            pekerjaan.progress = None
+
+    def _bersihkan(self, pemilik):
+        # Dipanggil dengan lock: pekerjaan kedaluwarsa dan yang melebihi batas per pemilik
+        # dibuang, dimulai dari yang paling lama; pekerjaan aktif tidak pernah dibuang
+        batas_umur = time.time() - self.umur_maks_detik
+        for id_pekerjaan in [i for i, p in self._pekerjaan.items() if not p.aktif and p.dibuat < batas_umur]:
+            del self._pekerjaan[id_pekerjaan]
+        milik = sorted((p for p in self._pekerjaan.values() if p.pemilik == pemilik), key=lambda p: p.dibuat)
+        lebih = len(milik) - self.max_per_pemilik + 1
+        for pekerjaan in [p for p in milik if not p.aktif][:max(0, lebih)]:
+            del self._pekerjaan[pekerjaan.id]
+
+    def ambil(self, id_pekerjaan):
+        with self._lock:
+            return self._pekerjaan.get(id_pekerjaan)
+
+    def daftar(self, pemilik):
+        # Terbaru lebih dulu
+        with self._lock:
+            return sorted((p for p in self._pekerjaan.values() if p.pemilik == pemilik), key=lambda p: -p.dibuat)
+
+    def hapus(self, id_pekerjaan):
+        with self._lock:
+            pekerjaan = self._pekerjaan.get(id_pekerjaan)
+            if pekerjaan is not None and not pekerjaan.aktif:
+                del self._pekerjaan[id_pekerjaan]
+
+    def statistik(self):
+        with self._lock:
+            semua = list(self._pekerjaan.values())
+        return {status: sum(p.status == status for p in semua) for status in ("antre", "berjalan", "selesai", "gagal")}
@@ -0,0 +1,148 @@
+# Pelacakan latensi per tahap (pencarian, ekstraksi PDF, Gemini, ekspor Word, grafik).
+# Setiap span dicatat ke tiga tempat: Jejak milik satu permintaan (untuk panel debug),
+# log JSON di logger "pbg.jejak", dan histogram per tahap yang bisa di-scrape Prometheus
+# lewat server HTTP kecil (mulai_server_metrik).
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Batas atas bucket histogram (detik)
+BATAS_BUCKET = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+logger = logging.getLogger("pbg.jejak")
+
+
+class _Histogram:
+
+    def __init__(self):
+        self.bucket = [0] * len(BATAS_BUCKET)
+        self.jumlah = 0.0
+        self.banyak = 0
+        self.gagal = 0
+
+    def catat(self, detik, berhasil):
+        for i, batas in enumerate(BATAS_BUCKET):
+            if detik <= batas:
+                self.bucket[i] += 1
+        self.jumlah += detik
+        self.banyak += 1
+        self.gagal += not berhasil
+
+
+_histogram = {}
+_histogram_lock = threading.Lock()
+
+
+class Jejak:
+    # Kumpulan span untuk satu permintaan (satu rerun app atau satu baris CLI)
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:12]
+        self.mulai = time.perf_counter()
+        self._span = []
+        self._lock = threading.Lock()
+
+    def span(self, tahap, **atribut):
+        return span(tahap, jejak=self, **atribut)
+
+    def catat(self, data):
+        with self._lock:
+            self._span.append(data)
+
+    def daftar(self):
+        with self._lock:
+            return sorted(self._span, key=lambda data: data["mulai_detik"])
+
+
+@contextmanager
+def span(tahap, jejak=None, **atribut):
+    # atribut bisa ditambah di dalam blok: `with span("x") as atribut: atribut["cache"] = "hit"`
+    mulai = time.perf_counter()
+    berhasil = False
+    try:
+        yield atribut
+        berhasil = True
+    finally:
+        detik = time.perf_counter() - mulai
+        with _histogram_lock:
+            _histogram.setdefault(tahap, _Histogram()).catat(detik, berhasil)
+        data = {
+            "tahap": tahap,
+            "durasi_ms": round(detik * 1000, 1),
+            "status": "ok" if berhasil else "gagal",
+            "thread": threading.current_thread().name,
+            **atribut,
+        }
+        if jejak is not None:
+            data["jejak"] = jejak.id
+            data["mulai_detik"] = round(mulai - jejak.mulai, 3)
+            jejak.catat(data)
+        logger.info(json.dumps(data, ensure_ascii=False, default=str))
+
+
+def ringkasan():
+    # Jumlah, rata-rata dan kegagalan per tahap sejak proses dimulai
+    with _histogram_lock:
+        return {
+            tahap: {
+                "jumlah": h.banyak,
+                "rata_rata_ms": round(h.jumlah / h.banyak * 1000, 1) if h.banyak else None,
+                "gagal": h.gagal,
+            }
+            for tahap, h in sorted(_histogram.items())
+        }
+
+
+def eksposisi_prometheus():
+    baris = [
+        "# HELP pbg_tahap_durasi_detik Durasi tiap tahap pembuatan policy brief.",
+        "# TYPE pbg_tahap_durasi_detik histogram",
+    ]
+    gagal = []
+    with _histogram_lock:
+        for tahap, h in sorted(_histogram.items()):
+            label = f'tahap="{tahap}"'
+            for batas, jumlah in zip(BATAS_BUCKET, h.bucket):
+                baris.append(f'pbg_tahap_durasi_detik_bucket{{{label},le="{batas}"}} {jumlah}')
+            baris.append(f'pbg_tahap_durasi_detik_bucket{{{label},le="+Inf"}} {h.banyak}')
+            baris.append(f"pbg_tahap_durasi_detik_sum{{{label}}} {h.jumlah:.6f}")
+            baris.append(f"pbg_tahap_durasi_detik_count{{{label}}} {h.banyak}")
+            gagal.append(f"pbg_tahap_gagal_total{{{label}}} {h.gagal}")
+    baris += ["# HELP pbg_tahap_gagal_total Jumlah span yang berakhir dengan exception.",
+              "# TYPE pbg_tahap_gagal_total counter", *gagal]
+    return "\n".join(baris) + "\n"
+
+
+class _HandlerMetrik(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        isi = eksposisi_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(isi)))
+        self.end_headers()
+        self.wfile.write(isi)
+
+    def log_message(self, format, *args):
+        pass  # Scrape berkala tidak perlu memenuhi log
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def mulai_server_metrik(port, host="0.0.0.0"):
+    # Endpoint /metrics di thread latar belakang; cukup dijalankan sekali per proses
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _HandlerMetrik)
+            threading.Thread(target=_server.serve_forever, name="server-metrik", daemon=True).start()
+        return _server
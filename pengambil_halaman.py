@@ -0,0 +1,124 @@
+# Pengambilan isi halaman hasil pencarian secara konkuren dengan klien HTTP async yang di-pool.
+# Jumlah koneksi per host dibatasi agar tidak membebani satu situs, dan setiap permintaan
+# memiliki timeout. Isi HTML dan PDF diekstrak menjadi teks lalu dideduplikasi.
+import asyncio
+import hashlib
+from urllib.parse import urlsplit
+
+import httpx
+from bs4 import BeautifulSoup
+
+HEADER_DEFAULT = {"User-Agent": "Mozilla/5.0 (compatible; PolicyBriefGenerator/1.0)"}
+TAG_NON_KONTEN = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg"]
+MIN_KARAKTER_BARIS = 30  # Baris lebih pendek biasanya menu, tombol atau label
+MAX_BYTES_RESPON = 20 * 1024 * 1024
+MAX_HALAMAN_PDF = 30
+
+
+def ekstrak_teks_html(html):
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(TAG_NON_KONTEN):
+        tag.decompose()
+    # Utamakan elemen konten utama jika halaman memilikinya
+    utama = soup.find("article") or soup.find("main") or soup.body or soup
+    baris = (b.strip() for b in utama.get_text("\n").splitlines())
+    return "\n".join(b for b in baris if len(b) >= MIN_KARAKTER_BARIS)
+
+
+def ekstrak_teks_pdf_bytes(data):
+    import fitz  # PyMuPDF
+
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return "".join(doc[i].get_text() for i in range(min(doc.page_count, MAX_HALAMAN_PDF)))
+
+
+def _adalah_pdf(url, respon):
+    return "pdf" in respon.headers.get("content-type", "").lower() or url.lower().endswith(".pdf")
+
+
+async def _unduh(client, url):
+    # Isi dibaca per potongan dan dihentikan begitu melewati MAX_BYTES_RESPON, sehingga file
+    # besar (misal PDF yang ditautkan) tidak pernah utuh di memori. Mengembalikan (respon, isi)
+    # atau (None, None) jika terlalu besar.
+    async with client.stream("GET", url) as respon:
+        respon.raise_for_status()
+        panjang = respon.headers.get("content-length", "")
+        if panjang.isdigit() and int(panjang) > MAX_BYTES_RESPON:
+            return None, None
+        potongan, ukuran = [], 0
+        async for data in respon.aiter_bytes():
+            ukuran += len(data)
+            if ukuran > MAX_BYTES_RESPON:
+                return None, None
+            potongan.append(data)
+    return respon, b"".join(potongan)
+
+
+async def _ambil_satu(client, url, semaphore_host):
+    async with semaphore_host[urlsplit(url).netloc]:
+        try:
+            respon, isi = await _unduh(client, url)
+        except httpx.HTTPError:
+            return url, None
+    if respon is None:
+        return url, None
+    try:
+        if _adalah_pdf(url, respon):
+            teks = await asyncio.to_thread(ekstrak_teks_pdf_bytes, isi)
+        else:
+            html = isi.decode(respon.charset_encoding or "utf-8", errors="replace")
+            teks = await asyncio.to_thread(ekstrak_teks_html, html)
+    except Exception:
+        return url, None
+    return url, teks
+
+
+async def ambil_semua(urls, client=None, batas_per_host=2, timeout=10.0):
+    # client bisa diisi dari luar (misal klien bersama atau klien untuk pengujian lokal)
+    semaphore_host = {urlsplit(url).netloc: asyncio.Semaphore(batas_per_host) for url in urls}
+    milik_sendiri = client is None
+    if milik_sendiri:
+        client = httpx.AsyncClient(
+            headers=HEADER_DEFAULT,
+            timeout=httpx.Timeout(timeout),
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    try:
+        return await asyncio.gather(*(_ambil_satu(client, url, semaphore_host) for url in urls))
+    finally:
+        if milik_sendiri:
+            await client.aclose()
+
+
+def deduplikasi(hasil):
+    # Membuang paragraf yang sudah muncul di halaman lain (misal menu atau boilerplate situs)
+    terlihat = set()
+    bersih = []
+    for url, teks in hasil:
+        if not teks:
+            continue
+        baris_unik = []
+        for baris in teks.splitlines():
+            sidik = hashlib.sha1(" ".join(baris.lower().split()).encode("utf-8")).digest()
+            if sidik not in terlihat:
+                terlihat.add(sidik)
+                baris_unik.append(baris)
+        if baris_unik:
+            bersih.append((url, "\n".join(baris_unik)))
+    return bersih
+
+
+def susun_konteks(dokumen, max_karakter_per_halaman=8000):
+    return "\n\n".join(f"Sumber: {url}\n{teks[:max_karakter_per_halaman]}" for url, teks in dokumen if teks)
+
+
+def ambil_dokumen(urls, klien=None, **kwargs):
+    # Pembungkus sinkron untuk dipanggil dari script Streamlit atau CLI.
+    # Mengembalikan pasangan (url, teks) yang sudah dideduplikasi. Jika klien (KumpulanKlien)
+    # diberikan, pool koneksi HTTP bersamanya yang dipakai.
+    if klien is not None:
+        hasil = klien.jalankan_http(lambda client: ambil_semua(urls, client=client, **kwargs))
+    else:
+        hasil = asyncio.run(ambil_semua(urls, **kwargs))
+    return deduplikasi(hasil)
@@ -0,0 +1,963 @@
+# Logika inti pembuatan policy brief (pencarian, ekstraksi PDF, AI, ekspor Word) tanpa
+# ketergantungan pada Streamlit, sehingga bisa dipakai oleh app.py maupun cli.py.
+# Pesan progres dikirim ke objek `lapor` yang meniru API st.write/st.error/st.progress;
+# app.py cukup memberikan modul `st`, sedangkan mode tanpa UI memakai LaporLog.
+# Library berat (Gemini, mesin pencari, python-docx, NumPy, httpx) baru dimuat lewat
+# impor() saat tahap yang membutuhkannya pertama kali dijalankan.
+import io
+import json
+import logging
+import time
+from collections.abc import Mapping
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, fields
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import ketahanan
+import pelacakan
+from anggaran_token import pemakaian_token, sesuaikan_anggaran
+from cache import CacheLLM, CachePencarian
+from ekstraksi_pdf import iter_halaman_pdf, kunci_ekstraksi, ukuran_sumber
+from ringkasan import perkiraan_token, ringkas_map_reduce
+from rute_model import RuteModel
+from waktu_impor import impor
+
+FILTER_SITUS = '(site:jatengprov.go.id OR site:rin.brin.go.id OR site:undip.ac.id OR site:uns.ac.id OR site:unnes.ac.id OR site:walisongo.ac.id OR site:sinta.kemdikbud.go.id)'
+
+# Nama kunci di .streamlit/secrets.toml (atau environment variable untuk CLI) per pengaturan
+KUNCI_PENGATURAN = {
+    "nama_model": "MODEL_NAME",
+    "model_brief": "BRIEF_MODEL",
+    "model_grafik": "CHART_MODEL",
+    "model_ringkasan": "SUMMARY_MODEL",
+    "model_cadangan": "FALLBACK_MODELS",
+    "konfigurasi_brief": "BRIEF_GENERATION_CONFIG",
+    "konfigurasi_grafik": "CHART_GENERATION_CONFIG",
+    "konfigurasi_ringkasan": "SUMMARY_GENERATION_CONFIG",
+    "batas_waktu_brief": "BRIEF_TIMEOUT",
+    "batas_waktu_grafik": "CHART_TIMEOUT",
+    "batas_waktu_ringkasan": "SUMMARY_TIMEOUT",
+    "search_cache_path": "SEARCH_CACHE_PATH",
+    "search_cache_ttl": "SEARCH_CACHE_TTL",
+    "search_cache_max_entri": "SEARCH_CACHE_MAX_ENTRIES",
+    "llm_cache_path": "LLM_CACHE_PATH",
+    "arsip_path": "ARCHIVE_PATH",
+    "ambang_semantik": "SEMANTIC_CACHE_THRESHOLD",
+    "llm_cache_entri_memori": "LLM_CACHE_MEMORY_ENTRIES",
+    "llm_cache_entri_disk": "LLM_CACHE_DISK_ENTRIES",
+    "ambang_token_map_reduce": "MAP_REDUCE_THRESHOLD_TOKENS",
+    "batas_token_potongan": "MAP_REDUCE_CHUNK_TOKENS",
+    "max_paralel_ringkasan": "MAP_REDUCE_CONCURRENCY",
+    "max_paralel_ekstraksi": "BATCH_EXTRACT_CONCURRENCY",
+    "max_paralel_llm": "BATCH_LLM_CONCURRENCY",
+    "batas_token_retrieval": "RETRIEVAL_BUDGET_TOKENS",
+    "tenggat_per_mesin": "SEARCH_ENGINE_DEADLINE",
+    "mode_terstruktur": "STRUCTURED_OUTPUT",
+    "laju_gemini_per_menit": "GEMINI_RATE_PER_MINUTE",
+    "laju_duckduckgo_per_menit": "DUCKDUCKGO_RATE_PER_MINUTE",
+    "laju_google_per_menit": "GOOGLE_RATE_PER_MINUTE",
+    "port_metrik": "METRICS_PORT",
+    "batas_token_brief": "BRIEF_CONTEXT_TOKENS",
+    "batas_token_grafik": "CHART_CONTEXT_TOKENS",
+    "hitung_token_api": "COUNT_TOKENS_API",
+    "max_pekerjaan": "MAX_CONCURRENT_JOBS",
+    "ambang_duplikat": "NEAR_DUPLICATE_THRESHOLD",
+    "batas_ukuran_pdf_mb": "MAX_PDF_SIZE_MB",
+    "batas_unggahan_sesi_mb": "MAX_SESSION_UPLOAD_MB",
+    "batas_karakter_pdf": "MAX_PDF_TEXT_CHARS",
+}
+
+
+@dataclass
+class Pengaturan:
+    nama_model: str = "gemini-1.5-flash"
+    # Rute model per tugas (lihat rute_model.py): nama model kosong berarti nama_model,
+    # model_cadangan dipisah koma dan dicoba berurutan jika model tugas gagal atau melewati
+    # batas waktu (detik, 0 = bawaan library). Konfigurasi generasi berupa objek JSON.
+    model_brief: str = ""
+    model_grafik: str = ""
+    model_ringkasan: str = ""
+    model_cadangan: str = ""
+    konfigurasi_brief: str = ""
+    konfigurasi_grafik: str = ""
+    konfigurasi_ringkasan: str = ""
+    batas_waktu_brief: float = 180.0
+    batas_waktu_grafik: float = 45.0
+    batas_waktu_ringkasan: float = 90.0
+    # Cache pencarian web dan jawaban AI, dibagi ke semua sesi
+    search_cache_path: str = ".cache/pencarian.sqlite"
+    search_cache_ttl: int = 24 * 3600
+    search_cache_max_entri: int = 1000
+    llm_cache_path: str = ".cache/llm.sqlite"
+    arsip_path: str = ".cache/arsip.sqlite"
+    # Kemiripan minimum (cosine TF-IDF n-gram) agar brief topik serupa di arsip ditawarkan (0 = nonaktif)
+    ambang_semantik: float = 0.75
+    llm_cache_entri_memori: int = 256
+    llm_cache_entri_disk: int = 5000
+    # Dokumen di atas ambang ini diringkas bertingkat (map-reduce) sebelum disusun menjadi brief
+    ambang_token_map_reduce: int = 100_000
+    batas_token_potongan: int = 20_000
+    max_paralel_ringkasan: int = 4
+    # Banyak PDF: jumlah file yang diekstrak dan panggilan AI yang berjalan bersamaan
+    max_paralel_ekstraksi: int = 4
+    max_paralel_llm: int = 4
+    # Anggaran token untuk passage yang dipilih indeks BM25 saat fokus topik diisi
+    batas_token_retrieval: int = 30_000
+    # Batas waktu mode "Keduanya": mesin yang belum selesai dilewati
+    tenggat_per_mesin: float = 30.0
+    # Brief dan data grafik diminta dalam satu panggilan AI berformat JSON (lihat SKEMA_BRIEF)
+    mode_terstruktur: bool = False
+    # Batas laju per backend untuk semua sesi dalam satu proses (lihat ketahanan.py)
+    laju_gemini_per_menit: float = 60.0
+    laju_duckduckgo_per_menit: float = 20.0
+    laju_google_per_menit: float = 10.0
+    # Port endpoint /metrics format Prometheus (0 = tidak dijalankan)
+    port_metrik: int = 0
+    # Anggaran token konteks per panggilan; konteks yang lebih besar dipangkas berdasarkan prioritas.
+    # Jika hitung_token_api aktif, jumlah token dihitung dengan count_tokens (satu panggilan API).
+    batas_token_brief: int = 120_000
+    batas_token_grafik: int = 30_000
+    hitung_token_api: bool = False
+    # Jumlah pekerjaan pembuatan brief latar belakang (app) yang berjalan bersamaan
+    max_pekerjaan: int = 4
+    # Passage dengan perkiraan kemiripan Jaccard di atas ambang ini dibuang (0 = nonaktif)
+    ambang_duplikat: float = 0.8
+    # Unggahan PDF: ukuran per file, total unggahan yang dipegang pekerjaan satu sesi, dan
+    # teks yang diekstrak per pekerjaan (dibagi rata antar file); halaman berikutnya dilewati
+    batas_ukuran_pdf_mb: int = 200
+    batas_unggahan_sesi_mb: int = 500
+    batas_karakter_pdf: int = 5_000_000
+
+    @classmethod
+    def dari_mapping(cls, sumber):
+        # sumber bisa st.secrets atau os.environ; nilai dikonversi ke tipe nilai default
+        nilai = {}
+        for field in fields(cls):
+            kunci = KUNCI_PENGATURAN[field.name]
+            if kunci in sumber:
+                if isinstance(field.default, bool) and isinstance(sumber[kunci], str):
+                    # bool("false") bernilai True, jadi teks dari environment dibaca manual
+                    nilai[field.name] = sumber[kunci].strip().lower() in ("1", "true", "ya", "yes")
+                elif isinstance(field.default, str) and isinstance(sumber[kunci], Mapping):
+                    # Tabel TOML di secrets.toml (misal konfigurasi generasi) disimpan sebagai JSON
+                    nilai[field.name] = json.dumps(dict(sumber[kunci]))
+                else:
+                    nilai[field.name] = type(field.default)(sumber[kunci])
+        return cls(**nilai)
+
+
+KONFIGURASI_GENERASI = {}  # Ikut menjadi bagian kunci cache jawaban AI
+
+
+def buat_model(api_key, pengaturan):
+    genai = impor("google.generativeai")
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(pengaturan.nama_model, generation_config=KONFIGURASI_GENERASI)
+
+
+def buat_rute_model(pengaturan, model):
+    # Model tugas lain dibuat saat pertama dipakai, dengan api_key yang sudah diatur buat_model
+    genai = impor("google.generativeai")
+    return RuteModel(
+        pengaturan,
+        buat=lambda nama: genai.GenerativeModel(nama, generation_config=KONFIGURASI_GENERASI),
+        model_utama=model,
+    )
+
+
+def atur_ketahanan(pengaturan):
+    ketahanan.atur("gemini", pengaturan.laju_gemini_per_menit)
+    ketahanan.atur("duckduckgo", pengaturan.laju_duckduckgo_per_menit)
+    ketahanan.atur("google", pengaturan.laju_google_per_menit)
+
+
+def buat_cache_pencarian(pengaturan):
+    return CachePencarian(
+        pengaturan.search_cache_path,
+        ttl_detik=pengaturan.search_cache_ttl,
+        max_entri=pengaturan.search_cache_max_entri,
+    )
+
+
+def buat_cache_llm(pengaturan):
+    return CacheLLM(
+        pengaturan.llm_cache_path,
+        max_entri_memori=pengaturan.llm_cache_entri_memori,
+        max_entri_disk=pengaturan.llm_cache_entri_disk,
+    )
+
+
+class _ProgressLog:
+
+    def __init__(self, logger):
+        self.logger = logger
+
+    def progress(self, nilai, text=None):
+        if text:
+            self.logger.debug(text)
+
+    def empty(self):
+        pass
+
+
+class LaporLog:
+    # Pengganti modul streamlit untuk mode tanpa UI: pesan diteruskan ke logging
+
+    def __init__(self, logger=None):
+        self.logger = logger or logging.getLogger("pbg")
+
+    def write(self, pesan):
+        self.logger.info(pesan)
+
+    def success(self, pesan):
+        self.logger.info(pesan)
+
+    def warning(self, pesan):
+        self.logger.warning(pesan)
+
+    def error(self, pesan):
+        self.logger.error(pesan)
+
+    def progress(self, nilai, text=None):
+        return _ProgressLog(self.logger)
+
+
+# --- PENCARIAN WEB ---
+
+def buat_query(keyword):
+    keyword_lokal = f'"{keyword} jawa tengah"'
+    return f'{keyword_lokal} {FILTER_SITUS}'
+
+
+# Fungsi hasil_* tidak melapor progres agar aman dijalankan di thread fan-out.
+# Jika klien (KumpulanKlien) diberikan, sesi HTTP bersamanya yang dipakai.
+# Panggilan ke mesin pencari lewat ketahanan.jalankan: dibatasi lajunya dan dicoba ulang.
+def hasil_duckduckgo(keyword, klien=None):
+    if klien is not None:
+        return ketahanan.jalankan("duckduckgo", klien.cari_duckduckgo, buat_query(keyword), max_results=7)
+
+    def cari():
+        with impor("duckduckgo_search").DDGS() as ddgs:
+            return [r for r in ddgs.text(buat_query(keyword), max_results=7)]
+
+    return ketahanan.jalankan("duckduckgo", cari)
+
+
+def hasil_google(keyword, klien=None):
+    search = impor("googlesearch").search
+    search_results_urls = ketahanan.jalankan(
+        "google", lambda: [url for url in search(buat_query(keyword), num_results=10, sleep_interval=2)]
+    )
+    # Google hanya memberi URL, jadi isi halamannya diunduh bersamaan untuk dijadikan konteks
+    teks_per_url = dict(impor("pengambil_halaman").ambil_dokumen(search_results_urls, klien=klien))
+    return [{'href': url, 'body': teks_per_url.get(url, '')} for url in search_results_urls]
+
+
+MESIN_PENCARI = {'DuckDuckGo': hasil_duckduckgo, 'Google': hasil_google}
+
+
+def konteks_dari_hasil(results):
+    konteks = impor("pengambil_halaman").susun_konteks((result['href'], result['body']) for result in results)
+    if not konteks:
+        konteks = "Daftar sumber relevan:\n" + "\n".join(f"- {result['href']}" for result in results)
+    return konteks
+
+
+def normalisasi_url(url):
+    # http/https, "www.", garis miring di akhir, fragmen dan parameter utm_* tidak membedakan halaman
+    bagian = urlsplit(url.strip())
+    host = bagian.netloc.lower().removeprefix("www.")
+    path = bagian.path.rstrip("/")
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(bagian.query) if not k.lower().startswith("utm_")))
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+def gabungkan_hasil(daftar_hasil):
+    # Hasil dengan URL yang sama digabung; isi terpanjang yang dipertahankan, urutan kemunculan pertama dijaga
+    gabungan = {}
+    for results in daftar_hasil:
+        for result in results:
+            kunci = normalisasi_url(result['href'])
+            if kunci not in gabungan or len(result['body'] or '') > len(gabungan[kunci]['body'] or ''):
+                gabungan[kunci] = result
+    return list(gabungan.values())
+
+
+# --- DOKUMEN ---
+
+def convert_to_docx(markdown_text, jejak=None):
+    with pelacakan.span("convert_to_docx", jejak=jejak):
+        return _convert_to_docx(markdown_text)
+
+
+def _convert_to_docx(markdown_text):
+    document = impor("docx").Document()
+    # Membersihkan judul dari format markdown '**'
+    title_raw = markdown_text.split('\n')[0]
+    title_text = title_raw.replace('**Judul:**', '').strip()
+
+    document.add_heading(title_text, level=1)
+
+    # Mengambil sisa konten
+    content_lines = markdown_text.split('\n')[1:]
+
+    for line in content_lines:
+        stripped_line = line.strip()
+        if stripped_line.startswith('###'):
+            heading_text = stripped_line.replace('###', '').strip()
+            document.add_heading(heading_text, level=3)
+        elif stripped_line.startswith('- '):
+             # Menambahkan list bullet sederhana
+            document.add_paragraph(stripped_line.replace('- ','').strip(), style='List Bullet')
+        elif stripped_line:
+            # Mengabaikan garis pemisah tabel markdown agar tidak tercetak
+            if '|' in stripped_line and '---' in stripped_line:
+                continue
+            # Menambahkan paragraf biasa (termasuk baris tabel)
+            document.add_paragraph(stripped_line)
+
+    bio = io.BytesIO()
+    document.save(bio)
+    return bio.getvalue()
+
+
+def tandai_sumber(nama_file, konteks):
+    # Setiap passage diberi nama file asalnya agar AI dapat menyebut sumber datanya
+    return "\n\n".join(f"[Sumber: {nama_file}] {passage}" for passage in konteks.split("\n\n") if passage.strip())
+
+
+def buat_sumber_info_pdf(daftar_nama, fokus_topik):
+    sumber_info = "Dokumen PDF: " + ", ".join(f"'{nama}'" for nama in daftar_nama)
+    if fokus_topik.strip():
+        sumber_info += f", dengan fokus topik '{fokus_topik.strip()}'"
+    return sumber_info
+
+
+# --- PROMPT ---
+
+def buat_prompt_brief(sumber_info, konteks):
+    return f"""
+    Anda adalah seorang analis kebijakan publik senior yang sangat teliti dan analitis.
+    Tugas Anda adalah melakukan SINTESIS komprehensif dari informasi dalam 'KONTEKS' untuk menyusun draf policy brief yang kaya data dan mendalam.
+    Sumber informasi untuk analisis ini adalah: {sumber_info}.
+    INSTRUKSI PENTING:
+    -   Gunakan HANYA informasi dari 'KONTEKS'.
+    -   Jika menemukan data perbandingan atau statistik, formatlah dalam Tabel Markdown.
+    -   Jangan membuat bagian referensi atau grafik, karena itu akan ditambahkan oleh sistem.
+    KONTEKS:
+    ---
+    {konteks}
+    ---
+    Setelah menganalisis, tuliskan draf policy brief dengan format berikut (HANYA 4 bagian ini):
+    **Judul:** [Judul yang tajam dan mencerminkan analisis]
+    ### 1. Ringkasan Eksekutif
+    [Ringkasan padat, sertakan 1-2 data kunci, dan sebutkan rekomendasi utama.]
+    ### 2. Pendahuluan
+    [Latar belakang masalah dengan data skala dan urgensi.]
+    ### 3. Temuan dan Pembahasan Mendalam
+    [Susun pembahasan berdasarkan TEMA UTAMA. Sajikan data, gunakan tabel jika cocok, bandingkan informasi, dan berikan analisis.]
+    ### 4. Rekomendasi Kebijakan Berbasis Bukti (Evidence-Based)
+    [Rekomendasi yang SPESIFIK, TERUKUR, dan dapat DILAKSANAKAN.]
+    """
+
+
+def buat_prompt_grafik(konteks):
+    return f"""
+    Anda adalah seorang spesialis visualisasi data menggunakan Python dan Altair.
+    Tugas Anda adalah menganalisis teks 'KONTEKS' dan membuat satu buah kode Python sederhana untuk memvisualisasikan data yang paling penting dari teks tersebut.
+    KONTEKS:
+    ---
+    {konteks}
+    ---
+    INSTRUKSI KODE YANG SANGAT KETAT:
+    1.  Cari data numerik yang bisa dibandingkan. Prioritaskan data perbandingan antar kategori atau wilayah.
+    2.  **Fokus utama adalah membuat diagram batang (bar chart) sederhana menggunakan `alt.Chart(data).mark_bar()`.** Jangan gunakan jenis chart lain kecuali sangat terpaksa.
+    3.  Jika tidak ada data yang cocok untuk divisualisasikan, cukup kembalikan teks: #TIDAK_ADA_DATA
+    4.  Pastikan kode lengkap, termasuk pembuatan `pandas.DataFrame`. Data dalam DataFrame harus berupa list sederhana.
+    5.  Variabel final yang berisi chart **HARUS** bernama `chart`.
+    6.  Jangan menulis `st.altair_chart(chart)` atau `print()`. Hanya kode pembuatan objek chart-nya saja.
+    Contoh Sempurna:
+    ```python
+    import pandas as pd
+    import altair as alt
+    # Data sederhana dalam DataFrame
+    data_source = pd.DataFrame({{'Kategori': ['UMKM Go Digital', 'UMKM Tradisional'],'Jumlah': [1500, 4500]}})
+    # Pembuatan chart yang simpel dan pasti berhasil
+    chart = alt.Chart(data_source).mark_bar().encode(
+        x=alt.X('Kategori:N', title='Jenis UMKM', sort=None),
+        y=alt.Y('Jumlah:Q', title='Jumlah UMKM'),
+        tooltip=['Kategori', 'Jumlah']
+    ).properties(
+        title='Perbandingan Jumlah UMKM'
+    )
+    ```
+    """
+
+
+# Skema jawaban mode terstruktur: empat bagian brief plus data grafik deklaratif
+SKEMA_BRIEF = {
+    "type": "object",
+    "properties": {
+        "judul": {"type": "string"},
+        "ringkasan_eksekutif": {"type": "string"},
+        "pendahuluan": {"type": "string"},
+        "temuan_dan_pembahasan": {"type": "string"},
+        "rekomendasi_kebijakan": {"type": "string"},
+        "grafik": {
+            "type": "object",
+            "properties": {
+                "ada_data": {"type": "boolean"},
+                "judul": {"type": "string"},
+                "label_kategori": {"type": "string"},
+                "label_nilai": {"type": "string"},
+                "kategori": {"type": "array", "items": {"type": "string"}},
+                "nilai": {"type": "array", "items": {"type": "number"}},
+            },
+            "required": ["ada_data", "kategori", "nilai"],
+        },
+    },
+    "required": ["judul", "ringkasan_eksekutif", "pendahuluan", "temuan_dan_pembahasan", "rekomendasi_kebijakan", "grafik"],
+}
+
+KONFIGURASI_TERSTRUKTUR = {"response_mime_type": "application/json", "response_schema": SKEMA_BRIEF}
+
+
+def buat_prompt_terstruktur(sumber_info, konteks):
+    return f"""
+    Anda adalah seorang analis kebijakan publik senior yang sangat teliti dan analitis.
+    Tugas Anda adalah melakukan SINTESIS komprehensif dari informasi dalam 'KONTEKS' untuk menyusun draf policy brief yang kaya data dan mendalam, sekaligus memilih satu data numerik terpenting untuk divisualisasikan.
+    Sumber informasi untuk analisis ini adalah: {sumber_info}.
+    INSTRUKSI PENTING:
+    -   Gunakan HANYA informasi dari 'KONTEKS'.
+    -   Isi setiap bagian dengan teks Markdown. Jika menemukan data perbandingan atau statistik, formatlah dalam Tabel Markdown.
+    -   Jangan membuat bagian referensi.
+    KONTEKS:
+    ---
+    {konteks}
+    ---
+    Jawab dalam JSON sesuai skema dengan isi berikut:
+    -   judul: Judul yang tajam dan mencerminkan analisis.
+    -   ringkasan_eksekutif: Ringkasan padat, sertakan 1-2 data kunci, dan sebutkan rekomendasi utama.
+    -   pendahuluan: Latar belakang masalah dengan data skala dan urgensi.
+    -   temuan_dan_pembahasan: Pembahasan berdasarkan TEMA UTAMA. Sajikan data, gunakan tabel jika cocok, bandingkan informasi, dan berikan analisis.
+    -   rekomendasi_kebijakan: Rekomendasi yang SPESIFIK, TERUKUR, dan dapat DILAKSANAKAN.
+    -   grafik: data untuk satu diagram batang. Prioritaskan perbandingan antar kategori atau wilayah. `kategori` dan `nilai` harus sama panjang dan nilainya diambil apa adanya dari KONTEKS. Jika tidak ada data yang cocok, isi ada_data dengan false dan biarkan kategori serta nilai kosong.
+    """
+
+
+def susun_brief_markdown(data):
+    # Bagian-bagian JSON disusun ulang ke format Markdown yang sama dengan mode dua panggilan
+    return (
+        f"**Judul:** {data['judul'].strip()}\n"
+        f"### 1. Ringkasan Eksekutif\n{data['ringkasan_eksekutif'].strip()}\n"
+        f"### 2. Pendahuluan\n{data['pendahuluan'].strip()}\n"
+        f"### 3. Temuan dan Pembahasan Mendalam\n{data['temuan_dan_pembahasan'].strip()}\n"
+        f"### 4. Rekomendasi Kebijakan Berbasis Bukti (Evidence-Based)\n{data['rekomendasi_kebijakan'].strip()}"
+    )
+
+
+def bersihkan_spesifikasi_grafik(grafik):
+    # Mengembalikan None jika tidak ada data yang layak digambar
+    if not grafik or not grafik.get("ada_data"):
+        return None
+    pasangan = [
+        (str(kategori), float(nilai))
+        for kategori, nilai in zip(grafik.get("kategori") or [], grafik.get("nilai") or [])
+        if isinstance(nilai, (int, float))
+    ]
+    if not pasangan:
+        return None
+    return {
+        "judul": grafik.get("judul") or "",
+        "label_kategori": grafik.get("label_kategori") or "Kategori",
+        "label_nilai": grafik.get("label_nilai") or "Nilai",
+        "kategori": [kategori for kategori, _ in pasangan],
+        "nilai": [nilai for _, nilai in pasangan],
+    }
+
+
+def buat_chart_dari_spesifikasi(spesifikasi):
+    # Diagram batang dibangun langsung dari data, tanpa menjalankan kode buatan AI
+    pd, alt = impor("pandas"), impor("altair")
+    data_source = pd.DataFrame({"Kategori": spesifikasi["kategori"], "Nilai": spesifikasi["nilai"]})
+    return alt.Chart(data_source).mark_bar().encode(
+        x=alt.X("Kategori:N", title=spesifikasi["label_kategori"], sort=None),
+        y=alt.Y("Nilai:Q", title=spesifikasi["label_nilai"]),
+        tooltip=["Kategori", "Nilai"],
+    ).properties(
+        title=spesifikasi["judul"]
+    )
+
+
+def buat_prompt_ringkasan(potongan):
+    return f"""
+    Anda adalah analis kebijakan publik. Ringkas BAGIAN DOKUMEN berikut untuk bahan policy brief.
+    Pertahankan semua angka, statistik, nama wilayah, tahun, target dan temuan penting apa adanya.
+    Jika ada tabel data, pertahankan dalam bentuk Tabel Markdown. Jangan menambah informasi dari luar teks.
+    BAGIAN DOKUMEN:
+    ---
+    {potongan}
+    ---
+    """
+
+
+class PembuatBrief:
+    # Menjalankan seluruh tahap pembuatan brief. Model dan cache dibagi lintas sesi,
+    # sedangkan objek ini murah dibuat ulang (di app.py dibuat sekali per pekerjaan latar belakang).
+    # initializer dipasang ke setiap thread pool, misalnya untuk meneruskan konteks Streamlit.
+    # klien (KumpulanKlien, opsional) menyediakan sesi jaringan bersama yang sudah dipanaskan.
+    # rute (RuteModel, opsional) memilih model per tugas; tanpa rute semua tugas memakai model.
+    # Durasi setiap tahap dicatat ke self.jejak (lihat pelacakan.py).
+
+    def __init__(self, model, cache_llm, cache_pencarian, pengaturan, lapor=None, initializer=None, klien=None,
+                 rute=None):
+        self.model = model
+        self.rute = rute or RuteModel(pengaturan, model_utama=model)
+        self.cache_llm = cache_llm
+        self.cache_pencarian = cache_pencarian
+        self.pengaturan = pengaturan
+        self.lapor = lapor or LaporLog()
+        self.initializer = initializer
+        self.klien = klien
+        self.jejak = pelacakan.Jejak()
+
+    def _pakai(self, nama):
+        return self.klien.pakai(nama) if self.klien is not None else nullcontext()
+
+    # --- Ekstraksi PDF ---
+
+    def kumpulkan_halaman(self, nama, sumber, kunci, rentang=None, batas_karakter=None, progress=None):
+        # Halaman dialirkan dari generator; ekstraksi berhenti begitu batas karakter terlampaui
+        batas_karakter = batas_karakter or self.pengaturan.batas_karakter_pdf
+        halaman, karakter = [], 0
+        generator = iter_halaman_pdf(sumber, progress, rentang, kunci)
+        try:
+            for teks in generator:
+                if karakter + len(teks) > batas_karakter:
+                    self.lapor.warning(
+                        f"Teks '{nama}' melebihi batas {batas_karakter:,} karakter; "
+                        f"hanya {len(halaman)} halaman pertama yang dianalisis."
+                    )
+                    break
+                halaman.append(teks)
+                karakter += len(teks)
+        finally:
+            generator.close()
+        return halaman
+
+    def extract_text_from_pdf(self, sumber, nama="dokumen", rentang=None, kunci=None):
+        # sumber berupa path file PDF atau bytes; rentang (awal, akhir) berbasis 0
+        self.lapor.write("📄 Mengekstrak teks dari file PDF...")
+        try:
+            progress_bar = self.lapor.progress(0.0)
+
+            def lapor_progress(selesai, total):
+                progress_bar.progress(selesai / total, text=f"Halaman {selesai} dari {total}")
+
+            with self.jejak.span("ekstraksi_pdf", ukuran_kb=ukuran_sumber(sumber) // 1024) as atribut:
+                kunci = kunci or kunci_ekstraksi(sumber, rentang)
+                halaman = self.kumpulkan_halaman(nama, sumber, kunci, rentang, progress=lapor_progress)
+                atribut["halaman"] = len(halaman)
+            progress_bar.empty()
+            text, info = self.buang_furnitur(halaman)
+            self.lapor.success("Ekstraksi teks dari PDF berhasil!")
+            if info["baris_dibuang"]:
+                self.lapor.write(
+                    f"🧹 {info['baris_dibuang']:,} baris header/footer berulang dibuang "
+                    f"(hemat ~{info['token_dihemat']:,} token)."
+                )
+            return text
+        except Exception as e:
+            self.lapor.error(f"Gagal memproses file PDF: {e}")
+            return None
+
+    def extract_text_dari_banyak_pdf(self, daftar_file, rentang=None):
+        # daftar_file berisi pasangan (nama, path atau bytes). Semua file diekstrak bersamaan;
+        # kegagalan satu file tidak menghentikan file lain. Mengembalikan (nama, kunci, teks)
+        # sesuai urutan; kunci memuat hash isi file dan rentang halaman.
+        if len(daftar_file) == 1:
+            nama, sumber = daftar_file[0]
+            try:
+                kunci = kunci_ekstraksi(sumber, rentang)
+            except OSError as e:
+                self.lapor.error(f"Gagal memproses file PDF '{nama}': {e}")
+                return []
+            teks = self.extract_text_from_pdf(sumber, nama, rentang, kunci)
+            return [(nama, kunci, teks)] if teks else []
+        self.lapor.write(f"📄 Mengekstrak teks dari {len(daftar_file)} file PDF secara paralel...")
+        progress_bar = self.lapor.progress(0.0)
+        hasil = [None] * len(daftar_file)
+        batas_karakter = self.pengaturan.batas_karakter_pdf // len(daftar_file)
+
+        def ekstrak(nama, sumber):
+            kunci = kunci_ekstraksi(sumber, rentang)
+            return kunci, self.kumpulkan_halaman(nama, sumber, kunci, rentang, batas_karakter)
+
+        max_workers = min(len(daftar_file), self.pengaturan.max_paralel_ekstraksi)
+        with self.jejak.span("ekstraksi_pdf", file=len(daftar_file)), ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(ekstrak, nama, sumber): i for i, (nama, sumber) in enumerate(daftar_file)}
+            for selesai, future in enumerate(as_completed(futures), start=1):
+                i = futures[future]
+                try:
+                    hasil[i] = future.result()
+                except Exception as e:
+                    self.lapor.error(f"Gagal memproses file PDF '{daftar_file[i][0]}': {e}")
+                progress_bar.progress(selesai / len(futures), text=f"File {selesai} dari {len(futures)}")
+        progress_bar.empty()
+        dokumen = []
+        token_dihemat = 0
+        for (nama, _), hasil_file in zip(daftar_file, hasil):
+            if not hasil_file or not hasil_file[1]:
+                continue
+            kunci, halaman = hasil_file
+            teks, info = self.buang_furnitur(halaman)
+            token_dihemat += info["token_dihemat"]
+            if teks:
+                dokumen.append((nama, kunci, teks))
+        if dokumen:
+            self.lapor.success(f"Ekstraksi teks dari {len(dokumen)} file PDF berhasil!")
+        if token_dihemat:
+            self.lapor.write(f"🧹 Header/footer berulang dibuang (hemat ~{token_dihemat:,} token).")
+        return dokumen
+
+    # --- Pencarian web ---
+
+    def cari_dengan_duckduckgo(self, keyword):
+        self.lapor.write("🔎 Mencari dengan **DuckDuckGo**...")
+        try:
+            with self.jejak.span("cari_duckduckgo"):
+                results = hasil_duckduckgo(keyword, self.klien)
+            if not results: return None, None
+            snippets = [result['body'] for result in results]
+            konteks = "\n\n".join(snippets)
+            source_urls = [result['href'] for result in results]
+            return konteks, source_urls
+        except Exception as e:
+            self.lapor.error(f"Error DuckDuckGo: {e}")
+            return None, None
+
+    def cari_dengan_google(self, keyword):
+        self.lapor.write("🔎 Mencari dengan **Google** dan mengunduh isi halaman hasilnya...")
+        try:
+            with self.jejak.span("cari_google"):
+                results = hasil_google(keyword, self.klien)
+            if not results: return None, None
+            return konteks_dari_hasil(results), [result['href'] for result in results]
+        except Exception as e:
+            self.lapor.error(f"Error Google: {e}")
+            return None, None
+
+    def cari_gabungan(self, keyword):
+        self.lapor.write("🔎 Mencari dengan **semua mesin pencari** sekaligus...")
+        tenggat = self.pengaturan.tenggat_per_mesin
+        with self.jejak.span("cari_gabungan") as atribut:
+            executor = ThreadPoolExecutor(max_workers=len(MESIN_PENCARI))
+            futures = {executor.submit(fungsi, keyword, self.klien): nama for nama, fungsi in MESIN_PENCARI.items()}
+            _, belum_selesai = wait(futures, timeout=tenggat)
+            # Mesin yang lambat dibiarkan selesai di latar belakang; hasilnya tidak ditunggu
+            executor.shutdown(wait=False, cancel_futures=True)
+            atribut["melewati_tenggat"] = len(belum_selesai)
+        daftar_hasil = []
+        for future, nama in futures.items():
+            if future in belum_selesai:
+                self.lapor.warning(f"{nama} melewati tenggat {tenggat:.0f} detik dan dilewati.")
+            elif future.exception() is not None:
+                self.lapor.warning(f"{nama} gagal: {future.exception()}")
+            else:
+                daftar_hasil.append(future.result())
+        results = gabungkan_hasil(daftar_hasil)
+        if not results: return None, None
+        return konteks_dari_hasil(results), [result['href'] for result in results]
+
+    def cari_web(self, search_engine, keyword, pakai_cache=True):
+        # Hasil pencarian yang sama diambil dari cache agar tidak memanggil jaringan lagi.
+        # Jika cache diabaikan, hasil baru tetap disimpan untuk menyegarkan entri lama.
+        cache = self.cache_pencarian
+        if pakai_cache:
+            with self.jejak.span("cache_pencarian", mesin=search_engine) as atribut:
+                tersimpan = cache.ambil_hasil(search_engine, keyword, FILTER_SITUS)
+                atribut["hit"] = bool(tersimpan)
+            if tersimpan:
+                self.lapor.write(f"⚡ Memakai hasil pencarian **{search_engine}** dari cache...")
+                return tersimpan
+        if search_engine == 'DuckDuckGo':
+            konteks, sumber_referensi = self.cari_dengan_duckduckgo(keyword)
+        elif search_engine == 'Google':
+            konteks, sumber_referensi = self.cari_dengan_google(keyword)
+        else:
+            konteks, sumber_referensi = self.cari_gabungan(keyword)
+        if konteks and sumber_referensi:
+            cache.simpan_hasil(search_engine, keyword, FILTER_SITUS, konteks, sumber_referensi)
+        return konteks, sumber_referensi
+
+    # --- Generator AI ---
+
+    def generate_teks(self, prompt, saat_stream=None, konfigurasi=None, tugas="brief"):
+        # Semua panggilan Gemini lewat sini agar prompt yang identik dijawab dari cache.
+        # Jika saat_stream diberikan, jawaban di-stream dan saat_stream(teks_sejauh_ini)
+        # dipanggil setiap ada potongan baru. konfigurasi (misal skema JSON) ditambahkan ke
+        # konfigurasi generasi tugas untuk panggilan ini saja dan ikut menjadi kunci cache.
+        # Model dicoba sesuai urutan rute tugas; model selain yang terakhir hanya dicoba sekali
+        # agar model cadangan segera dipakai saat model utama lambat atau tidak tersedia.
+        urutan = self.rute.urutan(tugas)
+        konfigurasi = {**KONFIGURASI_GENERASI, **self.rute.konfigurasi(tugas), **(konfigurasi or {})}
+        for nama in urutan:
+            tersimpan = self.cache_llm.ambil(nama, prompt, konfigurasi)
+            if tersimpan is not None:
+                return tersimpan
+        argumen = {"generation_config": konfigurasi} if konfigurasi else {}
+        if self.rute.batas_waktu(tugas):
+            argumen["request_options"] = {"timeout": self.rute.batas_waktu(tugas)}
+
+        def panggil(model):
+            # Dijalankan ulang utuh saat dicoba ulang; stream dimulai lagi dari awal.
+            # usage_metadata (jumlah token) ada di jawaban biasa atau di chunk terakhir stream.
+            with self._pakai("gemini"):
+                if saat_stream is None:
+                    respon = model.generate_content(prompt, **argumen)
+                    return respon.text, getattr(respon, "usage_metadata", None)
+                potongan = []
+                usage = None
+                for chunk in model.generate_content(prompt, stream=True, **argumen):
+                    usage = getattr(chunk, "usage_metadata", None) or usage
+                    try:
+                        potongan.append(chunk.text)
+                    except ValueError:
+                        continue  # Chunk tanpa teks (misal hanya metadata keamanan)
+                    saat_stream("".join(potongan))
+                return "".join(potongan), usage
+
+        for posisi, nama in enumerate(urutan):
+            terakhir = posisi == len(urutan) - 1
+            mulai = time.perf_counter()
+            try:
+                with self.jejak.span(
+                    "gemini", tugas=tugas, model=nama, cadangan=posisi > 0, stream=saat_stream is not None
+                ) as atribut:
+                    teks, usage = ketahanan.jalankan_terbatas(
+                        f"gemini/{nama}", None if terakhir else 1, panggil, self.rute.model(nama)
+                    )
+                    atribut.update(pemakaian_token(prompt, teks, usage))
+            except Exception as e:
+                self.rute.catat(tugas, nama, time.perf_counter() - mulai, berhasil=False)
+                if terakhir:
+                    raise
+                self.lapor.warning(f"Model {nama} gagal untuk tugas {tugas} ({e}); beralih ke {urutan[posisi + 1]}.")
+                continue
+            self.rute.catat(tugas, nama, time.perf_counter() - mulai, berhasil=True, cadangan=posisi > 0)
+            break
+        if teks:
+            self.cache_llm.simpan(nama, prompt, konfigurasi, teks)
+        return teks
+
+    def buang_furnitur(self, halaman):
+        # Header, footer dan nomor halaman yang berulang di banyak halaman tidak ikut ke konteks.
+        # Halaman dipisah baris kosong agar batas halaman juga menjadi batas passage.
+        with self.jejak.span("furnitur_halaman", halaman=len(halaman)) as atribut:
+            halaman, info = impor("deduplikasi").buang_furnitur_halaman(halaman)
+            atribut.update(info)
+        return "\n".join(halaman), info
+
+    def hapus_duplikat(self, konteks):
+        # Passage yang hampir sama (MinHash + LSH) dibuang sebelum konteks masuk ke prompt
+        if not self.pengaturan.ambang_duplikat:
+            return konteks
+        with self.jejak.span("deduplikasi") as atribut:
+            konteks, info = impor("deduplikasi").hapus_duplikat_passage(konteks, self.pengaturan.ambang_duplikat)
+            atribut.update(info)
+        if info["passage_dibuang"]:
+            self.lapor.write(
+                f"🧹 {info['passage_dibuang']} dari {info['passage_awal']} passage hampir sama dibuang "
+                f"(hemat ~{info['token_dihemat']:,} token)."
+            )
+        return konteks
+
+    def hitung_token(self, teks):
+        if not self.pengaturan.hitung_token_api:
+            return perkiraan_token(teks)
+        with self._pakai("gemini"):
+            return ketahanan.jalankan("gemini", self.model.count_tokens, teks).total_tokens
+
+    def batasi_konteks(self, konteks, batas_token, kueri="", utamakan_angka=False):
+        # Konteks dipangkas sesuai anggaran sebelum disisipkan ke prompt (lihat anggaran_token.py)
+        with self.jejak.span("anggaran_token", batas_token=batas_token) as atribut:
+            konteks, info = sesuaikan_anggaran(
+                konteks, batas_token, kueri=kueri, utamakan_angka=utamakan_angka, hitung=self.hitung_token
+            )
+            atribut.update(info)
+        if info["dipangkas"]:
+            self.lapor.write(
+                f"✂️ Konteks dipangkas dari {info['token_awal']:,} ke {info['token_akhir']:,} token "
+                f"agar sesuai anggaran {batas_token:,} token."
+            )
+        return konteks
+
+    def generate_brief_dengan_ai(self, sumber_info, konteks, saat_stream=None):
+        self.lapor.write("🤖 AI menganalisis & menyusun draf teks...")
+        try:
+            konteks = self.batasi_konteks(konteks, self.pengaturan.batas_token_brief, kueri=sumber_info)
+            with self.jejak.span("generate_brief"):
+                return self.generate_teks(buat_prompt_brief(sumber_info, konteks), saat_stream)
+        except Exception as e:
+            self.lapor.error(f"Error saat generate brief: {e}")
+            return None
+
+    def generate_chart_code(self, konteks):
+        self.lapor.write("📊 AI merancang kode untuk visualisasi data (fokus pada bar chart)...")
+        try:
+            # Grafik hanya butuh data kunci, jadi anggarannya lebih kecil dan passage berangka diutamakan
+            konteks = self.batasi_konteks(konteks, self.pengaturan.batas_token_grafik, utamakan_angka=True)
+            with self.jejak.span("generate_grafik"):
+                clean_code = self.generate_teks(buat_prompt_grafik(konteks), tugas="grafik").replace("```python", "").replace("```", "").strip()
+            return clean_code
+        except Exception as e:
+            self.lapor.error(f"Error saat generate chart code: {e}")
+            return None
+
+    def jalankan_bersamaan(self, *daftar_tugas):
+        # Menjalankan beberapa fungsi sekaligus di thread terpisah
+        with ThreadPoolExecutor(max_workers=len(daftar_tugas), initializer=self.initializer) as executor:
+            futures = [executor.submit(fungsi, *args) for fungsi, args in daftar_tugas]
+            hasil = []
+            for future in futures:
+                # Kegagalan satu tugas tidak membatalkan tugas lainnya
+                try:
+                    hasil.append(future.result())
+                except Exception as e:
+                    self.lapor.error(f"Tugas paralel gagal: {e}")
+                    hasil.append(None)
+            return hasil
+
+    def generate_brief_terstruktur(self, sumber_info, konteks):
+        # Satu panggilan JSON untuk brief dan data grafik: konteks hanya dikirim sekali.
+        # Grafik berupa dict spesifikasi (lihat buat_chart_dari_spesifikasi), bukan kode Python.
+        # Mengembalikan (brief, spesifikasi_grafik), atau None jika panggilan gagal atau jawaban tidak
+        # sesuai skema; pemanggil lalu beralih ke dua panggilan terpisah.
+        self.lapor.write("🤖 AI menyusun draf teks dan data grafik dalam satu panggilan...")
+        try:
+            konteks = self.batasi_konteks(konteks, self.pengaturan.batas_token_brief, kueri=sumber_info)
+            with self.jejak.span("generate_terstruktur"):
+                jawaban = self.generate_teks(buat_prompt_terstruktur(sumber_info, konteks), konfigurasi=KONFIGURASI_TERSTRUKTUR)
+            data = json.loads(jawaban)
+            return susun_brief_markdown(data), bersihkan_spesifikasi_grafik(data.get("grafik"))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self.lapor.warning(f"Jawaban terstruktur tidak valid ({e}), beralih ke dua panggilan terpisah.")
+            return None
+        except Exception as e:
+            self.lapor.warning(f"Panggilan terstruktur gagal ({e}), beralih ke dua panggilan terpisah.")
+            return None
+
+    def generate_brief_dan_grafik(self, sumber_info, konteks, saat_stream=None):
+        konteks = self.hapus_duplikat(konteks)
+        if self.pengaturan.mode_terstruktur:
+            hasil = self.generate_brief_terstruktur(sumber_info, konteks)
+            if hasil is not None:
+                return hasil
+        # Brief dan kode grafik dikirim ke Gemini bersamaan, bukan berurutan
+        hasil_brief, kode_grafik = self.jalankan_bersamaan(
+            (self.generate_brief_dengan_ai, (sumber_info, konteks, saat_stream)),
+            (self.generate_chart_code, (konteks,)),
+        )
+        return hasil_brief, kode_grafik
+
+    # --- Persiapan konteks dokumen ---
+
+    def ringkas_potongan(self, potongan):
+        return self.generate_teks(buat_prompt_ringkasan(potongan), tugas="ringkasan")
+
+    def pilih_passage_relevan(self, teks, kunci_dokumen, fokus_topik, batas_token):
+        self.lapor.write(f"🎯 Memilih bagian dokumen yang relevan dengan **{fokus_topik}**...")
+        with self.jejak.span("retrieval_bm25"):
+            indeks = impor("indeks_bm25").indeks_untuk_dokumen(kunci_dokumen, teks)
+            konteks = indeks.pilih_konteks(fokus_topik, batas_token)
+        if konteks:
+            return konteks
+        self.lapor.warning("Tidak ada bagian dokumen yang cocok dengan fokus topik, memakai seluruh dokumen.")
+        return teks
+
+    def siapkan_konteks_pdf(self, teks, kunci_dokumen, fokus_topik=""):
+        # Jika fokus topik diisi, hanya passage yang relevan (BM25) yang dikirim ke model.
+        # Tanpa fokus, dokumen kecil dipakai utuh dan dokumen besar diringkas bertingkat.
+        if fokus_topik.strip():
+            teks = self.pilih_passage_relevan(teks, kunci_dokumen, fokus_topik, self.pengaturan.batas_token_retrieval)
+        return self.ringkas_jika_terlalu_besar(teks)
+
+    def ringkas_jika_terlalu_besar(self, teks):
+        if perkiraan_token(teks) <= self.pengaturan.ambang_token_map_reduce:
+            return teks
+        self.lapor.write("📚 Dokumen sangat besar, meringkas per bagian secara paralel...")
+        progress_bar = self.lapor.progress(0.0)
+
+        def lapor_progress(selesai, total):
+            progress_bar.progress(selesai / total, text=f"Bagian {selesai} dari {total} selesai diringkas")
+
+        def lapor_gagal(nomor, total, e):
+            self.lapor.warning(f"Bagian {nomor} dari {total} gagal diringkas dan dilewati: {e}")
+
+        try:
+            with self.jejak.span("ringkasan_map_reduce"):
+                konteks = ringkas_map_reduce(
+                    teks,
+                    self.ringkas_potongan,
+                    batas_token_potongan=self.pengaturan.batas_token_potongan,
+                    ambang_token=self.pengaturan.ambang_token_map_reduce,
+                    max_paralel=self.pengaturan.max_paralel_ringkasan,
+                    initializer=self.initializer,
+                    progress=lapor_progress,
+                    saat_gagal=lapor_gagal,
+                )
+        finally:
+            progress_bar.empty()
+        return konteks
+
+    def gabungkan_konteks_pdf(self, dokumen, fokus_topik):
+        # Anggaran token retrieval dibagi rata ke semua dokumen, lalu gabungannya
+        # diringkas bertingkat jika masih terlalu besar
+        blok = []
+        for nama, kunci_dokumen, teks in dokumen:
+            if fokus_topik.strip():
+                teks = self.pilih_passage_relevan(
+                    teks, kunci_dokumen, fokus_topik, self.pengaturan.batas_token_retrieval // len(dokumen)
+                )
+            blok.append(tandai_sumber(nama, teks))
+        return self.ringkas_jika_terlalu_besar("\n\n".join(blok))
+
+    def generate_brief_per_file(self, dokumen, fokus_topik, batas_paralel):
+        # Brief dan grafik setiap file dibuat dalam satu pool sehingga paling banyak batas_paralel
+        # panggilan AI berjalan sekaligus, termasuk dua panggilan cadangan untuk file yang
+        # jawaban terstrukturnya gagal. File yang konteksnya gagal disiapkan dilewati tanpa
+        # menggagalkan file lain.
+        daftar = []
+        for nama, kunci_dokumen, teks in dokumen:
+            try:
+                konteks = self.hapus_duplikat(self.siapkan_konteks_pdf(teks, kunci_dokumen, fokus_topik))
+            except Exception as e:
+                self.lapor.error(f"Gagal menyiapkan konteks file PDF '{nama}': {e}")
+                konteks = None
+            daftar.append((nama, buat_sumber_info_pdf([nama], fokus_topik), konteks))
+        with ThreadPoolExecutor(max_workers=batas_paralel, initializer=self.initializer) as executor:
+            terstruktur = [None] * len(daftar)
+            if self.pengaturan.mode_terstruktur:
+                futures = [
+                    executor.submit(self.generate_brief_terstruktur, info, konteks) if konteks is not None else None
+                    for _, info, konteks in daftar
+                ]
+                terstruktur = [future.result() if future is not None else None for future in futures]
+            cadangan = [
+                None if hasil is not None or konteks is None else (
+                    executor.submit(self.generate_brief_dengan_ai, info, konteks),
+                    executor.submit(self.generate_chart_code, konteks),
+                )
+                for hasil, (_, info, konteks) in zip(terstruktur, daftar)
+            ]
+            hasil_per_file = []
+            for (nama, _, _), hasil, futures in zip(daftar, terstruktur, cadangan):
+                if hasil is not None:
+                    hasil_brief, grafik = hasil
+                elif futures is not None:
+                    hasil_brief, grafik = futures[0].result(), futures[1].result()
+                else:
+                    hasil_brief, grafik = None, None
+                hasil_per_file.append({"nama": nama, "hasil_brief": hasil_brief, "kode_grafik": grafik})
+            return hasil_per_file
@@ -0,0 +1,73 @@
+# Ringkasan bertingkat (map-reduce) untuk dokumen yang lebih besar dari konteks model.
+# Dokumen dipecah menjadi potongan berdasarkan anggaran token, setiap potongan diringkas
+# secara paralel (map), lalu ringkasannya digabung menjadi konteks baru (reduce).
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+KARAKTER_PER_TOKEN = 4  # Perkiraan kasar yang cukup untuk teks Indonesia/Inggris
+MAX_TINGKAT = 3  # Batas pengulangan reduce agar waktu proses tetap terbatas
+
+
+def perkiraan_token(teks):
+    return len(teks) // KARAKTER_PER_TOKEN + 1
+
+
+def pecah_teks(teks, batas_token):
+    # Memecah per paragraf agar potongan tidak memotong kalimat di tengah.
+    # Paragraf yang sendirian sudah melebihi batas dipotong paksa per karakter.
+    batas_karakter = batas_token * KARAKTER_PER_TOKEN
+    potongan, sekarang, panjang = [], [], 0
+    for paragraf in teks.split("\n\n"):
+        while len(paragraf) > batas_karakter:
+            potongan.append(paragraf[:batas_karakter])
+            paragraf = paragraf[batas_karakter:]
+        if panjang + len(paragraf) > batas_karakter and sekarang:
+            potongan.append("\n\n".join(sekarang))
+            sekarang, panjang = [], 0
+        sekarang.append(paragraf)
+        panjang += len(paragraf) + 2
+    if sekarang:
+        potongan.append("\n\n".join(sekarang))
+    return [p for p in potongan if p.strip()]
+
+
+def _map(daftar_potongan, fungsi_ringkas, max_paralel, initializer, progress, saat_gagal):
+    # Potongan yang gagal diringkas bernilai None; pesan galatnya tidak boleh ikut menjadi konteks
+    hasil = [None] * len(daftar_potongan)
+    galat_terakhir = "jawaban kosong"
+    with ThreadPoolExecutor(max_workers=max_paralel, initializer=initializer) as executor:
+        futures = {
+            executor.submit(fungsi_ringkas, potongan): i
+            for i, potongan in enumerate(daftar_potongan)
+        }
+        for selesai, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            try:
+                hasil[i] = future.result()
+            except Exception as e:
+                if saat_gagal:
+                    saat_gagal(i + 1, len(daftar_potongan), e)
+                galat_terakhir = e
+            if progress:
+                progress(selesai, len(daftar_potongan))
+    if daftar_potongan and not any(hasil):
+        raise RuntimeError(f"Semua {len(daftar_potongan)} bagian dokumen gagal diringkas: {galat_terakhir}")
+    return hasil
+
+
+def ringkas_map_reduce(teks, fungsi_ringkas, batas_token_potongan, ambang_token,
+                       max_paralel=4, initializer=None, progress=None, saat_gagal=None):
+    # fungsi_ringkas(potongan) -> str dipanggil paralel dengan paling banyak max_paralel sekaligus.
+    # Jika gabungan ringkasan masih di atas ambang, langkah map diulang pada ringkasan tersebut.
+    # Potongan yang gagal dilewati (saat_gagal(nomor, total, galat) dipanggil); jika semua
+    # potongan gagal, RuntimeError dinaikkan.
+    for _ in range(MAX_TINGKAT):
+        daftar_potongan = pecah_teks(teks, batas_token_potongan)
+        daftar_ringkasan = _map(daftar_potongan, fungsi_ringkas, max_paralel, initializer, progress, saat_gagal)
+        teks = "\n\n".join(
+            f"[Bagian {i}/{len(daftar_ringkasan)}]\n{ringkasan}"
+            for i, ringkasan in enumerate(daftar_ringkasan, start=1)
+            if ringkasan
+        )
+        if perkiraan_token(teks) <= ambang_token:
+            break
+    return teks
@@ -0,0 +1,101 @@
+# Rute model per tugas: brief panjang memakai model yang kuat, sedangkan ekstraksi kode grafik
+# dan ringkasan potongan dokumen bisa memakai model yang lebih cepat dan murah. Setiap tugas punya
+# nama model, konfigurasi generasi dan batas waktu sendiri; jika model utama lambat atau tidak
+# tersedia, model cadangan dicoba berurutan. Statistik mencatat model yang melayani setiap tugas.
+import json
+import threading
+
+TUGAS = ("brief", "grafik", "ringkasan")
+
+
+def nama_lengkap(nama):
+    # GenerativeModel.model_name berbentuk "models/gemini-1.5-flash", sedangkan pengaturan boleh
+    # ditulis tanpa awalan; semua nama disamakan ke bentuk lengkap (juga kunci cache jawaban AI)
+    nama = nama.strip()
+    return nama if "/" in nama else f"models/{nama}"
+
+
+def baca_konfigurasi(teks):
+    # Konfigurasi generasi per tugas ditulis sebagai JSON, misal {"temperature": 0.2}
+    if not teks:
+        return {}
+    konfigurasi = json.loads(teks)
+    if not isinstance(konfigurasi, dict):
+        raise ValueError(f"Konfigurasi generasi harus berupa objek JSON: {teks}")
+    return konfigurasi
+
+
+class _Statistik:
+
+    def __init__(self):
+        self.berhasil = 0
+        self.gagal = 0
+        self.sebagai_cadangan = 0
+        self.total_detik = 0.0
+
+    def sebagai_dict(self):
+        return {
+            "berhasil": self.berhasil,
+            "gagal": self.gagal,
+            "sebagai_cadangan": self.sebagai_cadangan,
+            "rata_rata_ms": round(self.total_detik / self.berhasil * 1000, 1) if self.berhasil else None,
+        }
+
+
+class RuteModel:
+    # buat(nama) membuat model Gemini baru saat pertama kali dibutuhkan. Tanpa buat (misal model
+    # tiruan di benchmark) hanya model_utama yang dipakai untuk semua tugas.
+
+    def __init__(self, pengaturan, buat=None, model_utama=None):
+        self.pengaturan = pengaturan
+        self._buat = buat
+        self._model = {}
+        self._utama = nama_lengkap(model_utama.model_name if model_utama is not None else pengaturan.nama_model)
+        if model_utama is not None:
+            self._model[self._utama] = model_utama
+        self._konfigurasi = {tugas: baca_konfigurasi(getattr(pengaturan, f"konfigurasi_{tugas}")) for tugas in TUGAS}
+        self._statistik = {}
+        self._lock = threading.Lock()
+
+    def urutan(self, tugas):
+        # Model utama tugas lebih dulu, lalu model cadangan (tanpa duplikat)
+        utama = nama_lengkap(getattr(self.pengaturan, f"model_{tugas}") or self._utama)
+        cadangan = [nama_lengkap(nama) for nama in self.pengaturan.model_cadangan.split(",") if nama.strip()]
+        daftar = list(dict.fromkeys([utama, *cadangan]))
+        if self._buat is None:
+            daftar = [nama for nama in daftar if nama in self._model]
+        return daftar or [self._utama]
+
+    def model(self, nama):
+        nama = nama_lengkap(nama)
+        with self._lock:
+            if nama not in self._model:
+                self._model[nama] = self._buat(nama)
+            return self._model[nama]
+
+    def konfigurasi(self, tugas):
+        return dict(self._konfigurasi[tugas])
+
+    def batas_waktu(self, tugas):
+        # Detik per panggilan; 0 berarti memakai batas bawaan library
+        return getattr(self.pengaturan, f"batas_waktu_{tugas}")
+
+    def catat(self, tugas, nama, detik, berhasil, cadangan=False):
+        with self._lock:
+            statistik = self._statistik.setdefault((tugas, nama), _Statistik())
+            if berhasil:
+                statistik.berhasil += 1
+                statistik.sebagai_cadangan += cadangan
+                statistik.total_detik += detik
+            else:
+                statistik.gagal += 1
+
+    def statistik(self):
+        # {tugas: {model: {...}}}, termasuk model yang sudah dikonfigurasi tetapi belum dipakai
+        with self._lock:
+            tercatat = {kunci: s.sebagai_dict() for kunci, s in self._statistik.items()}
+        hasil = {}
+        for tugas in TUGAS:
+            nama_model = list(dict.fromkeys([*self.urutan(tugas), *(n for t, n in tercatat if t == tugas)]))
+            hasil[tugas] = {nama: tercatat.get((tugas, nama), _Statistik().sebagai_dict()) for nama in nama_model}
+        return hasil
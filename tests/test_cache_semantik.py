@@ -0,0 +1,48 @@
+# Pasangan topik yang boleh dan tidak boleh dianggap sama oleh cache semantik
+import pytest
+
+from cache_semantik import CacheSemantik
+
+AMBANG = 0.75
+
+
+def cocok(topik_arsip, topik_baru):
+    cache = CacheSemantik()
+    cache.tambah("arsip", topik_arsip)
+    return bool(cache.cari(topik_baru, AMBANG))
+
+
+@pytest.mark.parametrize("topik_arsip, topik_baru", [
+    ("digitalisasi umkm di solo", "digitalisasi UMKM Surakarta"),
+    ("Stunting di Kabupaten Brebes", "stunting kab. brebes"),
+    ("inflasi pangan 2023", "Inflasi Pangan 2023"),
+])
+def test_topik_sama_ditemukan(topik_arsip, topik_baru):
+    assert cocok(topik_arsip, topik_baru)
+
+
+@pytest.mark.parametrize("topik_arsip, topik_baru", [
+    ("stunting di kota semarang", "stunting di kabupaten semarang"),
+    ("kemiskinan kota magelang", "kemiskinan kabupaten magelang"),
+    ("inflasi pangan 2022", "inflasi pangan 2023"),
+    ("inflasi pangan", "inflasi pangan 2023"),
+])
+def test_wilayah_atau_tahun_berbeda_tidak_ditawarkan(topik_arsip, topik_baru):
+    assert not cocok(topik_arsip, topik_baru)
+
+
+def test_kandidat_terbaik_dengan_tahun_sama_dipilih():
+    cache = CacheSemantik()
+    cache.tambah("2022", "inflasi pangan jawa tengah 2022")
+    cache.tambah("2023", "inflasi pangan jawa tengah 2023")
+    assert [kunci for kunci, _, _ in cache.cari("inflasi pangan di jawa tengah 2023", AMBANG)] == ["2023"]
+
+
+def test_hapus_memindahkan_baris_terakhir():
+    cache = CacheSemantik()
+    for tahun in range(2015, 2025):
+        cache.tambah(tahun, f"pengangguran terbuka {tahun}")
+    cache.hapus(2015)
+    assert len(cache) == 9
+    assert cache.cari("pengangguran terbuka 2024", AMBANG)[0][0] == 2024
+    assert not cache.cari("pengangguran terbuka 2015", AMBANG)
@@ -0,0 +1,27 @@
+# Pembacaan masukan dan pengaturan CLI
+import json
+
+import cli
+
+
+def test_nilai_jsonl_bukan_teks_dibaca_sebagai_teks(tmp_path):
+    path = tmp_path / "topik.jsonl"
+    baris = [{"topik": 2024}, {"topik": ["stunting", "brebes"]}, {"topik": None, "pdf": "a.pdf"}, {"topik": None}]
+    path.write_text("\n".join(json.dumps(b) for b in baris), encoding="utf-8")
+    masukan = cli.baca_masukan(str(path))
+    assert [b["topik"] for b in masukan] == ["2024", "['stunting', 'brebes']", "", ""]
+    assert [cli.buat_id(nomor, b) for nomor, b in enumerate(masukan[:3], start=1)] == [
+        "0001_2024", "0002_stunting_brebes", "0003_a_pdf",
+    ]
+
+
+def test_buat_id_menerima_nilai_bukan_teks():
+    assert cli.buat_id(7, {"topik": 3.5}) == "0007_3_5"
+
+
+def test_environment_hanya_menimpa_kunci_pengaturan(tmp_path):
+    path = tmp_path / "secrets.toml"
+    path.write_text('GOOGLE_API_KEY = "dari-file"\nARCHIVE_PATH = "arsip.sqlite"\n', encoding="utf-8")
+    environ = {"GOOGLE_API_KEY": "dari-env", "MODEL_NAME": "gemini-1.5-pro", "PATH": "/usr/bin", "HOME": "/root"}
+    sumber = cli.baca_sumber_pengaturan(environ, str(path))
+    assert sumber == {"GOOGLE_API_KEY": "dari-env", "ARCHIVE_PATH": "arsip.sqlite", "MODEL_NAME": "gemini-1.5-pro"}
@@ -0,0 +1,99 @@
+# Furnitur halaman PDF dan passage hampir sama
+import random
+
+import fitz
+
+import deduplikasi
+from ekstraksi_pdf import iter_halaman_pdf
+from pipeline import PembuatBrief, Pengaturan
+
+JUMLAH_HALAMAN = 10
+WILAYAH = ["Semarang", "Kudus", "Jepara", "Demak"]
+
+
+def halaman_laporan_tabel(nomor):
+    # Laporan berisi tabel: label baris dan angka tiap sel berada di baris sendiri, tabel
+    # langsung menempel ke header dan footer halaman
+    baris = ["Badan Pusat Statistik Provinsi Jawa Tengah", "Wilayah", "Tahun"]
+    for i, wilayah in enumerate(WILAYAH):
+        baris += [wilayah, str(1007 + i), "2013"]
+    baris += ["Jumlah", str(4000 + nomor), "Total", "2013"]
+    baris.append(f"Narasi halaman {nomor}: pertumbuhan ekonomi daerah meningkat dibanding tahun lalu.")
+    baris += ["Jumlah", "Total", "2013"]
+    baris.append(f"Halaman {nomor} dari {JUMLAH_HALAMAN}")
+    return "\n".join(baris) + "\n"
+
+
+def test_tabel_tidak_dibuang_sebagai_furnitur():
+    halaman = [halaman_laporan_tabel(n) for n in range(1, JUMLAH_HALAMAN + 1)]
+    bersih, info = deduplikasi.buang_furnitur_halaman(halaman)
+    # Hanya header dan nomor halaman yang dibuang
+    assert info["baris_dibuang"] == 2 * JUMLAH_HALAMAN
+    for nomor, (asli, hasil) in enumerate(zip(halaman, bersih), start=1):
+        dibuang = [b for b in asli.splitlines() if b not in hasil.splitlines()]
+        assert dibuang == ["Badan Pusat Statistik Provinsi Jawa Tengah", f"Halaman {nomor} dari {JUMLAH_HALAMAN}"]
+        for wilayah in WILAYAH:
+            assert wilayah in hasil
+        assert hasil.count("2013") == asli.count("2013")
+        assert hasil.count("Jumlah") == 2 and hasil.count("Total") == 2
+
+
+def test_baris_angka_saja_tidak_pernah_dibuang():
+    halaman = [f"Judul Laporan Kinerja Daerah\nIsi halaman {n} tentang anggaran daerah.\n{n}\n" for n in range(1, 8)]
+    bersih, info = deduplikasi.buang_furnitur_halaman(halaman)
+    assert info["baris_dibuang"] == 7
+    assert all(hasil.splitlines()[-1] == str(n) for n, hasil in enumerate(bersih, start=1))
+
+
+def test_dokumen_pendek_tidak_diubah():
+    halaman = ["Header Laporan Daerah\nIsi satu\n", "Header Laporan Daerah\nIsi dua\n"]
+    assert deduplikasi.buang_furnitur_halaman(halaman) == (halaman, {"baris_dibuang": 0, "token_dihemat": 0})
+
+
+def test_passage_hampir_sama_dibuang():
+    dasar = "Angka stunting di Kabupaten Brebes turun menjadi 20 persen pada tahun 2023 berkat intervensi gizi terpadu"
+    konteks = "\n\n".join([dasar, dasar + " dan posyandu", "Inflasi pangan di Kota Semarang naik pada triwulan ketiga"])
+    hasil, info = deduplikasi.hapus_duplikat_passage(konteks, ambang=0.7)
+    assert info["passage_dibuang"] == 1
+    assert hasil.split("\n\n") == [dasar, "Inflasi pangan di Kota Semarang naik pada triwulan ketiga"]
+
+
+def buat_paragraf(acak, n_kalimat=4):
+    kata = ("anggaran daerah program digitalisasi usaha mikro pelatihan pemasaran daring koperasi desa "
+            "akses modal kredit rakyat jaringan internet sekolah puskesmas gizi balita sanitasi").split()
+    return " ".join(
+        " ".join(acak.choice(kata) for _ in range(acak.randint(10, 16))).capitalize() + "."
+        for _ in range(n_kalimat)
+    )
+
+
+def test_paragraf_berulang_di_teks_pdf_dibuang(tmp_path):
+    # Teks hasil ekstraksi PDF tidak punya baris kosong antar paragraf: paragraf metodologi yang
+    # diulang di tiga halaman dan satu halaman ringkasan yang diulang harus tetap terdeteksi
+    acak = random.Random(7)
+    ulang = "Catatan metodologi. " + buat_paragraf(acak, 3)
+    ringkasan = "\n".join(f"Ringkasan {i}. " + buat_paragraf(acak) for i in range(3))
+    temuan = []
+    path = str(tmp_path / "laporan.pdf")
+    with fitz.open() as doc:
+        for nomor in range(10):
+            paragraf = []
+            for _ in range(3):
+                temuan.append(f"Temuan {len(temuan)}.")
+                paragraf.append(f"{temuan[-1]} " + buat_paragraf(acak))
+            if nomor in (1, 4, 6):
+                paragraf.insert(acak.randint(0, 3), ulang)
+            teks = ringkasan if nomor in (2, 8) else "\n".join(paragraf)
+            doc.new_page().insert_textbox(fitz.Rect(72, 72, 520, 800), teks, fontsize=9)
+        doc.save(path)
+    pembuat = PembuatBrief(None, None, None, Pengaturan())
+    konteks, _ = pembuat.buang_furnitur(list(iter_halaman_pdf(path)))
+
+    hasil, info = deduplikasi.hapus_duplikat_passage(konteks)
+
+    assert info["passage_dibuang"] > 0
+    assert hasil.count("Catatan metodologi") == 1
+    for i in range(3):
+        assert hasil.count(f"Ringkasan {i}.") == 1
+    halaman_unik = [t for n, t in enumerate(temuan) if n // 3 not in (2, 8)]
+    assert all(t in hasil for t in halaman_unik)
@@ -0,0 +1,57 @@
+# Ekstraksi paralel: worker tidak boleh menjalankan ulang __main__ (di Streamlit: app.py)
+import os
+import sys
+import types
+
+import fitz
+import pytest
+
+import ekstraksi_pdf
+
+FOLDER_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def buat_pdf(path, jumlah_halaman):
+    with fitz.open() as doc:
+        for i in range(jumlah_halaman):
+            doc.new_page().insert_text((72, 72), f"Halaman {i} data UMKM {i * 3} unit")
+        doc.save(path)
+
+
+@pytest.fixture
+def pool_baru(monkeypatch):
+    monkeypatch.setattr(ekstraksi_pdf, "_pool", None)
+    monkeypatch.setattr(ekstraksi_pdf, "_cache", ekstraksi_pdf.OrderedDict())
+    yield
+    if ekstraksi_pdf._pool is not None:
+        ekstraksi_pdf._pool.shutdown()
+
+
+def test_worker_tidak_menjalankan_ulang_main(tmp_path, monkeypatch, pool_baru):
+    # Seperti Streamlit: skrip app dipasang sebagai __main__ dengan __file__, tanpa __spec__
+    penanda = tmp_path / "app_dijalankan"
+    skrip = tmp_path / "app_tiruan.py"
+    skrip.write_text(f"open({str(penanda)!r}, 'a').write(__name__)\n")
+    app = types.ModuleType("__main__")
+    app.__file__ = str(skrip)
+    monkeypatch.setitem(sys.modules, "__main__", app)
+    monkeypatch.chdir(FOLDER_REPO)
+    path = str(tmp_path / "laporan.pdf")
+    buat_pdf(path, ekstraksi_pdf.MIN_HALAMAN_PARALEL + 5)
+
+    halaman = list(ekstraksi_pdf.iter_halaman_pdf(path))
+
+    assert ekstraksi_pdf._pool is not None
+    assert sys.modules["__main__"] is app
+    assert not penanda.exists()
+    with fitz.open(path) as doc:
+        assert halaman == [p.get_text() for p in doc]
+
+
+def test_tanpa_pekerja_pdf_diekstrak_tanpa_pool(tmp_path, monkeypatch, pool_baru):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("PYTHONPATH", raising=False)
+    path = str(tmp_path / "laporan.pdf")
+    buat_pdf(path, ekstraksi_pdf.MIN_HALAMAN_PARALEL + 5)
+    assert len(list(ekstraksi_pdf.iter_halaman_pdf(path))) == ekstraksi_pdf.MIN_HALAMAN_PARALEL + 5
+    assert ekstraksi_pdf._pool is None
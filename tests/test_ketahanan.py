@@ -0,0 +1,161 @@
+# Token bucket, pemutus sirkuit dan coba ulang diuji dengan jam tiruan (tanpa sleep sungguhan)
+import pytest
+
+import ketahanan
+
+
+class JamTiruan:
+
+    def __init__(self):
+        self.sekarang = 1000.0
+        self.tidur = []
+
+    def monotonic(self):
+        return self.sekarang
+
+    def sleep(self, detik):
+        self.tidur.append(detik)
+        self.sekarang += detik
+
+
+@pytest.fixture
+def jam(monkeypatch):
+    jam = JamTiruan()
+    monkeypatch.setattr(ketahanan.time, "monotonic", jam.monotonic)
+    monkeypatch.setattr(ketahanan.time, "sleep", jam.sleep)
+    monkeypatch.setattr(ketahanan.random, "uniform", lambda a, b: b)
+    return jam
+
+
+class GalatHttp(Exception):
+
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+def test_token_bucket_ledakan_lalu_menunggu(jam):
+    bucket = ketahanan.TokenBucket(laju_per_menit=60, kapasitas=3)
+    assert [bucket.ambil() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Token keempat baru tersedia satu detik kemudian (60 per menit)
+    assert bucket.ambil() == pytest.approx(1.0)
+    assert jam.tidur == [pytest.approx(1.0)]
+
+
+def test_token_bucket_terisi_kembali_sampai_kapasitas(jam):
+    bucket = ketahanan.TokenBucket(laju_per_menit=60, kapasitas=2)
+    bucket.ambil()
+    bucket.ambil()
+    jam.sekarang += 100
+    assert [bucket.ambil() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.ambil() == pytest.approx(1.0)
+
+
+def test_sirkuit_terbuka_setelah_ambang_lalu_setengah_terbuka(jam):
+    sirkuit = ketahanan.PemutusSirkuit(ambang_gagal=2, jeda_pulih=30)
+    sirkuit.catat_gagal()
+    assert sirkuit.status == "tertutup" and sirkuit.izinkan()
+    sirkuit.catat_gagal()
+    assert sirkuit.status == "terbuka" and not sirkuit.izinkan()
+    jam.sekarang += 30
+    assert sirkuit.izinkan() and sirkuit.status == "setengah_terbuka"
+    # Hanya satu panggilan percobaan yang diizinkan
+    assert not sirkuit.izinkan()
+
+
+def test_sirkuit_setengah_terbuka_berhasil_menutup(jam):
+    sirkuit = ketahanan.PemutusSirkuit(ambang_gagal=1, jeda_pulih=10)
+    sirkuit.catat_gagal()
+    jam.sekarang += 10
+    sirkuit.izinkan()
+    sirkuit.catat_berhasil()
+    assert sirkuit.status == "tertutup" and sirkuit.izinkan()
+
+
+def test_sirkuit_setengah_terbuka_gagal_membuka_lagi(jam):
+    sirkuit = ketahanan.PemutusSirkuit(ambang_gagal=3, jeda_pulih=10)
+    for _ in range(3):
+        sirkuit.catat_gagal()
+    jam.sekarang += 10
+    sirkuit.izinkan()
+    sirkuit.catat_gagal()
+    assert sirkuit.status == "terbuka" and not sirkuit.izinkan()
+
+
+def test_backend_mencoba_ulang_galat_sementara(jam):
+    backend = ketahanan.Backend("uji", laju_per_menit=1e6, kapasitas=10, max_percobaan=3)
+    jawaban = iter([GalatHttp(503), GalatHttp(429), "ok"])
+
+    def panggil():
+        hasil = next(jawaban)
+        if isinstance(hasil, Exception):
+            raise hasil
+        return hasil
+
+    assert backend.jalankan(panggil) == "ok"
+    assert backend.statistik()["dicoba_ulang"] == 2
+    assert backend.sirkuit.status == "tertutup"
+
+
+def test_backend_tidak_mencoba_ulang_galat_permanen(jam):
+    backend = ketahanan.Backend("uji", laju_per_menit=1e6, kapasitas=10)
+    panggilan = []
+
+    def panggil():
+        panggilan.append(1)
+        raise GalatHttp(400)
+
+    with pytest.raises(GalatHttp):
+        backend.jalankan(panggil)
+    assert len(panggilan) == 1
+
+
+def test_galat_permanen_pada_panggilan_percobaan_melepas_sirkuit(jam):
+    # 503 membuka sirkuit; panggilan percobaan setelah jeda gagal dengan galat non-sementara
+    # (misal ValueError jawaban diblokir). Panggilan berikutnya tetap harus diizinkan.
+    backend = ketahanan.Backend("uji", laju_per_menit=1e6, kapasitas=10, max_percobaan=1, ambang_gagal=1, jeda_pulih=5)
+    with pytest.raises(GalatHttp):
+        backend.jalankan(lambda: (_ for _ in ()).throw(GalatHttp(503)))
+    assert backend.sirkuit.status == "terbuka"
+    with pytest.raises(ketahanan.SirkuitTerbuka):
+        backend.jalankan(lambda: "ok")
+    jam.sekarang += 5
+    with pytest.raises(ValueError):
+        backend.jalankan(lambda: (_ for _ in ()).throw(ValueError("diblokir")))
+    assert backend.sirkuit.status == "tertutup"
+    assert backend.jalankan(lambda: "ok") == "ok"
+
+
+def test_backend_turunan_memakai_bucket_induk(jam, monkeypatch):
+    # Semua model Gemini memakai kuota API key yang sama: N model tidak boleh berarti N kali laju
+    monkeypatch.setattr(ketahanan, "_backend", {})
+    ketahanan.atur("gemini", 60.0, 2)
+    cepat = ketahanan.get_backend("gemini/model-cepat")
+    kuat = ketahanan.get_backend("gemini/model-kuat")
+    assert cepat.bucket is kuat.bucket is ketahanan.get_backend("gemini").bucket
+    assert [cepat.jalankan(lambda: "ok"), kuat.jalankan(lambda: "ok")] == ["ok", "ok"]
+    assert jam.tidur == []
+    kuat.jalankan(lambda: "ok")
+    assert jam.tidur == [pytest.approx(1.0)]
+    ketahanan.atur("gemini", 30.0)
+    assert cepat.bucket.laju * 60 == pytest.approx(30.0)
+
+
+def test_backend_turunan_punya_sirkuit_sendiri(jam, monkeypatch):
+    monkeypatch.setattr(ketahanan, "_backend", {})
+    cepat = ketahanan.get_backend("gemini/model-cepat")
+    cepat.max_percobaan = 1
+    cepat.sirkuit.ambang_gagal = 1
+    with pytest.raises(GalatHttp):
+        cepat.jalankan(lambda: (_ for _ in ()).throw(GalatHttp(503)))
+    assert cepat.sirkuit.status == "terbuka"
+    assert ketahanan.get_backend("gemini/model-kuat").sirkuit.status == "tertutup"
+
+
+@pytest.mark.parametrize("laju", [0, -5.0])
+def test_laju_nol_atau_negatif_ditolak(monkeypatch, laju):
+    monkeypatch.setattr(ketahanan, "_backend", {})
+    ketahanan.atur("gemini", 60.0)
+    with pytest.raises(ValueError, match="gemini"):
+        ketahanan.atur("gemini", laju)
+    assert ketahanan.get_backend("gemini").bucket.laju * 60 == pytest.approx(60.0)
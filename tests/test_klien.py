@@ -0,0 +1,64 @@
+# Pemanasan klien bersama: satu instance DDGS dan panggilan Gemini lewat ketahanan
+import threading
+import time
+import types
+
+import pytest
+
+import ketahanan
+import klien
+
+
+class DDGSTiruan:
+    dibuat = 0
+
+    def __init__(self):
+        # Konstruktor lambat memperlebar jendela balapan antara pemanasan dan pencarian
+        time.sleep(0.05)
+        DDGSTiruan.dibuat += 1
+
+    def text(self, query, **kwargs):
+        return [{"title": query}]
+
+
+class ModelTiruan:
+
+    def __init__(self):
+        self.panggilan = 0
+
+    def count_tokens(self, teks):
+        self.panggilan += 1
+        return types.SimpleNamespace(total_tokens=1)
+
+
+@pytest.fixture
+def kumpulan(monkeypatch):
+    DDGSTiruan.dibuat = 0
+    monkeypatch.setattr(ketahanan, "_backend", {})
+    monkeypatch.setattr(klien, "impor", lambda nama: types.SimpleNamespace(DDGS=DDGSTiruan))
+    kumpulan = klien.KumpulanKlien(ModelTiruan())
+    monkeypatch.setattr(kumpulan, "_get_http", lambda: None)
+    return kumpulan
+
+
+def test_pemanasan_dan_pencarian_bersamaan_membuat_satu_ddgs(kumpulan):
+    pemanasan = threading.Thread(target=kumpulan._panaskan)
+    pemanasan.start()
+    assert kumpulan.cari_duckduckgo("umkm") == [{"title": "umkm"}]
+    pemanasan.join()
+    assert DDGSTiruan.dibuat == 1
+    assert kumpulan.status_pemanasan.startswith("siap")
+
+
+def test_ping_gemini_pemanasan_melewati_ketahanan(kumpulan):
+    kumpulan._panaskan()
+    assert kumpulan.model.panggilan == 1
+    assert ketahanan.statistik()["gemini"]["panggilan"] == 1
+
+
+def test_ping_gemini_ditolak_saat_sirkuit_terbuka(kumpulan):
+    ketahanan.get_backend("gemini").sirkuit.status = "terbuka"
+    ketahanan.get_backend("gemini").sirkuit._dibuka_pada = time.monotonic()
+    kumpulan._panaskan()
+    assert kumpulan.model.panggilan == 0
+    assert kumpulan.status_pemanasan.startswith("gagal")
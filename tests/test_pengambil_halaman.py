@@ -0,0 +1,86 @@
+# Pengambilan halaman diuji terhadap server HTTP lokal pengganti situs sungguhan
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import pengambil_halaman
+
+BATAS = 64 * 1024
+UKURAN_TANPA_PANJANG = 256 * 1024 * 1024
+KALIMAT = "Angka stunting di Jawa Tengah turun dibanding tahun sebelumnya menurut data dinas."
+
+
+class _Handler(BaseHTTPRequestHandler):
+    terkirim = {}
+
+    def do_GET(self):
+        if self.path == "/artikel.html":
+            isi = f"<html><body><nav>Menu</nav><article><p>{KALIMAT}</p></article></body></html>".encode("utf-8")
+            self._kirim(isi, "text/html; charset=utf-8", panjang=True)
+        elif self.path == "/besar.pdf":
+            # Content-Length di atas batas: ditolak tanpa membaca isi
+            self._kirim(b"%PDF-" + b"0" * (BATAS * 4), "application/pdf", panjang=True)
+        elif self.path == "/besar-tanpa-panjang.html":
+            # Tanpa Content-Length: unduhan harus dihentikan saat isi melewati batas. Isinya jauh
+            # lebih besar dari buffer socket loopback agar penghentian dini terlihat di server.
+            self._kirim(b"x" * (16 * 1024), "text/html", panjang=False, ulang=UKURAN_TANPA_PANJANG // (16 * 1024))
+        else:
+            self.send_error(404)
+
+    def _kirim(self, isi, jenis, panjang, ulang=1):
+        self.send_response(200)
+        self.send_header("Content-Type", jenis)
+        if panjang:
+            self.send_header("Content-Length", str(len(isi) * ulang))
+        self.end_headers()
+        terkirim = 0
+        try:
+            for _ in range(ulang):
+                for i in range(0, len(isi), 16 * 1024):
+                    self.wfile.write(isi[i:i + 16 * 1024])
+                    terkirim += len(isi[i:i + 16 * 1024])
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        _Handler.terkirim[self.path] = terkirim
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(pengambil_halaman, "MAX_BYTES_RESPON", BATAS)
+    _Handler.terkirim = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_halaman_html_diekstrak(server):
+    hasil = dict(asyncio.run(pengambil_halaman.ambil_semua([f"{server}/artikel.html"])))
+    assert hasil[f"{server}/artikel.html"] == KALIMAT
+
+
+def test_respon_melebihi_batas_dilewati(server):
+    urls = [f"{server}/besar.pdf", f"{server}/besar-tanpa-panjang.html", f"{server}/tidak-ada.html"]
+    hasil = dict(asyncio.run(pengambil_halaman.ambil_semua(urls)))
+    assert hasil == {url: None for url in urls}
+
+
+def test_unduhan_besar_dihentikan_lebih_awal(server):
+    asyncio.run(pengambil_halaman.ambil_semua([f"{server}/besar-tanpa-panjang.html"]))
+    # Server berhenti mengirim jauh sebelum seluruh isi terkirim
+    for _ in range(50):
+        if "/besar-tanpa-panjang.html" in _Handler.terkirim:
+            break
+        threading.Event().wait(0.1)
+    assert _Handler.terkirim["/besar-tanpa-panjang.html"] < UKURAN_TANPA_PANJANG // 4
+
+
+def test_dokumen_dideduplikasi():
+    hasil = pengambil_halaman.deduplikasi([("a", "Baris sama\nBaris a"), ("b", "baris  SAMA\nBaris b"), ("c", None)])
+    assert hasil == [("a", "Baris sama\nBaris a"), ("b", "Baris b")]
@@ -0,0 +1,42 @@
+# Mode per file: kegagalan satu file tidak menggagalkan file lain
+import types
+
+import pytest
+
+import ketahanan
+from pipeline import PembuatBrief, Pengaturan, buat_cache_llm, buat_cache_pencarian
+
+
+class ModelTiruan:
+    # Gagal (tanpa dicoba ulang) untuk setiap prompt yang memuat kata "rusak"
+    model_name = "models/model-tiruan"
+
+    def generate_content(self, prompt, stream=False, generation_config=None, request_options=None):
+        if "rusak" in prompt:
+            raise ValueError("permintaan ditolak")
+        return types.SimpleNamespace(text="**Judul:** ok")
+
+
+@pytest.mark.parametrize("mode_terstruktur", [False, True])
+def test_file_yang_gagal_diringkas_tidak_menggagalkan_file_lain(tmp_path, monkeypatch, mode_terstruktur):
+    monkeypatch.setattr(ketahanan, "_backend", {})
+    pengaturan = Pengaturan(
+        ambang_token_map_reduce=200,
+        batas_token_potongan=100,
+        mode_terstruktur=mode_terstruktur,
+        laju_gemini_per_menit=6000,
+        llm_cache_path=str(tmp_path / "llm.sqlite"),
+        search_cache_path=str(tmp_path / "pencarian.sqlite"),
+    )
+    pembuat = PembuatBrief(ModelTiruan(), buat_cache_llm(pengaturan), buat_cache_pencarian(pengaturan), pengaturan)
+    rusak = "\n".join(f"Paragraf {i} laporan rusak tentang anggaran daerah tahun berjalan." for i in range(30))
+    dokumen = [
+        ("a.pdf", "kunci-a", "Laporan singkat tentang digitalisasi UMKM."),
+        ("rusak.pdf", "kunci-rusak", rusak),
+        ("b.pdf", "kunci-b", "Laporan singkat tentang stunting."),
+    ]
+    hasil = pembuat.generate_brief_per_file(dokumen, "", batas_paralel=2)
+    assert [(h["nama"], h["hasil_brief"] is not None) for h in hasil] == [
+        ("a.pdf", True), ("rusak.pdf", False), ("b.pdf", True),
+    ]
+    assert hasil[1]["kode_grafik"] is None
@@ -0,0 +1,84 @@
+# Rute model per tugas dan peralihan ke model cadangan
+import types
+
+import pytest
+
+import ketahanan
+from pipeline import PembuatBrief, Pengaturan, buat_cache_llm, buat_cache_pencarian
+from rute_model import RuteModel
+
+
+class ModelTiruan:
+
+    def __init__(self, nama, galat=None):
+        # Seperti genai.GenerativeModel, model_name selalu berawalan "models/"
+        self.model_name = f"models/{nama}"
+        self.galat = galat
+        self.panggilan = []
+
+    def generate_content(self, prompt, stream=False, generation_config=None, request_options=None):
+        self.panggilan.append({"konfigurasi": generation_config, "opsi": request_options})
+        if self.galat is not None:
+            raise self.galat
+        return types.SimpleNamespace(text=f"{self.model_name}: {prompt}")
+
+
+class GalatHttp(Exception):
+
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+@pytest.fixture
+def pengaturan(tmp_path, monkeypatch):
+    monkeypatch.setattr(ketahanan, "_backend", {})
+    return Pengaturan(
+        nama_model="gemini-1.5-flash",
+        model_brief="gemini-1.5-pro",
+        model_cadangan="gemini-1.5-flash, models/gemini-1.5-pro",
+        konfigurasi_grafik='{"temperature": 0}',
+        llm_cache_path=str(tmp_path / "llm.sqlite"),
+        search_cache_path=str(tmp_path / "pencarian.sqlite"),
+    )
+
+
+def test_nama_model_disamakan_tanpa_duplikat(pengaturan):
+    rute = RuteModel(pengaturan, buat=ModelTiruan, model_utama=ModelTiruan("gemini-1.5-flash"))
+    assert rute.urutan("brief") == ["models/gemini-1.5-pro", "models/gemini-1.5-flash"]
+    assert rute.urutan("grafik") == ["models/gemini-1.5-flash", "models/gemini-1.5-pro"]
+
+
+def test_tanpa_pembuat_hanya_model_utama(pengaturan):
+    utama = ModelTiruan("model-tiruan")
+    rute = RuteModel(pengaturan, model_utama=utama)
+    assert rute.urutan("brief") == ["models/model-tiruan"]
+    assert rute.model("models/model-tiruan") is utama
+
+
+def test_konfigurasi_dan_batas_waktu_per_tugas(pengaturan):
+    utama = ModelTiruan("gemini-1.5-flash")
+    pembuat = PembuatBrief(utama, buat_cache_llm(pengaturan), buat_cache_pencarian(pengaturan), pengaturan,
+                           rute=RuteModel(pengaturan, buat=ModelTiruan, model_utama=utama))
+    assert pembuat.generate_teks("data", tugas="grafik") == "models/gemini-1.5-flash: data"
+    assert utama.panggilan == [{"konfigurasi": {"temperature": 0}, "opsi": {"timeout": pengaturan.batas_waktu_grafik}}]
+
+
+def test_model_cadangan_dipakai_saat_model_utama_gagal(pengaturan):
+    model = {
+        "models/gemini-1.5-pro": ModelTiruan("gemini-1.5-pro", galat=GalatHttp(503)),
+        "models/gemini-1.5-flash": ModelTiruan("gemini-1.5-flash"),
+    }
+    rute = RuteModel(pengaturan, buat=model.__getitem__, model_utama=model["models/gemini-1.5-flash"])
+    pembuat = PembuatBrief(model["models/gemini-1.5-flash"], buat_cache_llm(pengaturan),
+                           buat_cache_pencarian(pengaturan), pengaturan, rute=rute)
+    assert pembuat.generate_teks("brief") == "models/gemini-1.5-flash: brief"
+    # Model selain yang terakhir hanya dicoba sekali
+    assert len(model["models/gemini-1.5-pro"].panggilan) == 1
+    statistik = rute.statistik()["brief"]
+    assert statistik["models/gemini-1.5-pro"]["gagal"] == 1
+    assert statistik["models/gemini-1.5-flash"]["sebagai_cadangan"] == 1
+    assert [(d["model"], d["cadangan"], d["status"]) for d in pembuat.jejak.daftar() if d["tahap"] == "gemini"] == [
+        ("models/gemini-1.5-pro", False, "gagal"),
+        ("models/gemini-1.5-flash", True, "ok"),
+    ]
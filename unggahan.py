@@ -0,0 +1,101 @@
+# Unggahan PDF disalin bertahap (spool) ke file sementara di disk, sehingga pekerjaan latar
+# belakang hanya memegang path, bukan salinan bytes seluruh file. Kuota per sesi membatasi
+# ukuran tiap file dan total ukuran unggahan yang sedang dipegang pekerjaan milik sesi itu.
+# Batasan: UploadedFile Streamlit sendiri tetap menyimpan seluruh unggahan di RAM selama
+# widget masih memegangnya (batas kerasnya server.maxUploadSize Streamlit); yang dihemat hanya
+# salinan selama pekerjaan berjalan. Pemilik adalah ID sesi dari parameter URL ?sesi= yang bisa
+# diganti pengguna, jadi kuota sesi bukan batas keamanan, hanya pencegah pemakaian berlebih.
+import os
+import shutil
+import tempfile
+import threading
+
+UKURAN_BLOK = 1 << 20  # Disalin per 1 MB
+
+
+class BatasUnggahanTerlampaui(ValueError):
+    pass
+
+
+class BerkasUnggahan:
+
+    def __init__(self, pemilik, nama, path, ukuran):
+        self.pemilik = pemilik
+        self.nama = nama
+        self.path = path
+        self.ukuran = ukuran
+
+
+class KuotaUnggahan:
+
+    def __init__(self, batas_file_mb=200, batas_sesi_mb=500, folder=None):
+        self.batas_file = int(batas_file_mb * 2**20)
+        self.batas_sesi = int(batas_sesi_mb * 2**20)
+        self.folder = folder
+        self._terpakai = {}
+        self._lock = threading.Lock()
+
+    def _pesan(self, pemilik, ukuran):
+        with self._lock:
+            terpakai = self._terpakai.get(pemilik, 0)
+            if terpakai + ukuran > self.batas_sesi:
+                raise BatasUnggahanTerlampaui(
+                    f"Kuota unggahan sesi ini {self.batas_sesi / 2**20:.0f} MB; "
+                    f"{terpakai / 2**20:.1f} MB masih dipakai pekerjaan yang berjalan."
+                )
+            self._terpakai[pemilik] = terpakai + ukuran
+
+    def _lepas_kuota(self, pemilik, ukuran):
+        with self._lock:
+            sisa = self._terpakai.get(pemilik, 0) - ukuran
+            if sisa > 0:
+                self._terpakai[pemilik] = sisa
+            else:
+                self._terpakai.pop(pemilik, None)
+
+    def simpan(self, pemilik, nama, sumber):
+        # sumber adalah objek file (mis. UploadedFile Streamlit). Ukuran diperiksa sebelum
+        # menyalin bila diketahui, dan tetap dihitung ulang selama penyalinan.
+        ukuran = getattr(sumber, "size", None)
+        if ukuran is None:
+            posisi = sumber.tell()
+            ukuran = sumber.seek(0, os.SEEK_END) - posisi
+            sumber.seek(posisi)
+        if ukuran > self.batas_file:
+            raise BatasUnggahanTerlampaui(
+                f"File '{nama}' berukuran {ukuran / 2**20:.1f} MB, melebihi batas {self.batas_file / 2**20:.0f} MB."
+            )
+        self._pesan(pemilik, ukuran)
+        berkas = BerkasUnggahan(pemilik, nama, None, ukuran)
+        try:
+            sumber.seek(0)
+            with tempfile.NamedTemporaryFile(prefix="pbg_", suffix=".pdf", dir=self.folder, delete=False) as tmp:
+                berkas.path = tmp.name
+                shutil.copyfileobj(sumber, tmp, UKURAN_BLOK)
+                tersalin = tmp.tell()
+            if tersalin > self.batas_file:
+                raise BatasUnggahanTerlampaui(f"File '{nama}' melebihi batas {self.batas_file / 2**20:.0f} MB.")
+        except BaseException:
+            self.lepas(berkas)
+            raise
+        # Kuota disesuaikan dengan jumlah byte yang benar-benar tersalin
+        self._lepas_kuota(pemilik, ukuran - tersalin)
+        berkas.ukuran = tersalin
+        return berkas
+
+    def lepas(self, berkas):
+        # Dipanggil setelah pekerjaan selesai (berhasil maupun gagal)
+        if berkas.path:
+            try:
+                os.remove(berkas.path)
+            except FileNotFoundError:
+                pass
+        self._lepas_kuota(berkas.pemilik, berkas.ukuran)
+
+    def pemakaian(self, pemilik):
+        with self._lock:
+            return self._terpakai.get(pemilik, 0)
+
+    def statistik(self):
+        with self._lock:
+            return {"sesi": len(self._terpakai), "mb_di_disk": round(sum(self._terpakai.values()) / 2**20, 1)}
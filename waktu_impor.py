@@ -0,0 +1,58 @@
+# Impor modul berat secara malas (saat tahap yang membutuhkannya dipakai) sambil mencatat
+# lama impor pertamanya, untuk memantau regresi waktu start aplikasi.
+#
+# Laporan cold start per modul (masing-masing di proses Python baru) bisa dibuat dengan:
+#   python waktu_impor.py > laporan_impor.json
+import importlib
+import json
+import subprocess
+import sys
+import threading
+import time
+
+# Modul berat yang dimuat malas oleh app.py dan pipeline.py
+MODUL_BERAT = [
+    "streamlit",
+    "google.generativeai",
+    "duckduckgo_search",
+    "googlesearch",
+    "docx",
+    "fitz",
+    "numpy",
+    "httpx",
+    "bs4",
+    "pandas",
+    "altair",
+]
+
+_catatan = {}
+_lock = threading.Lock()
+
+
+def impor(nama):
+    sudah_dimuat = nama in sys.modules
+    mulai = time.perf_counter()
+    modul = importlib.import_module(nama)
+    if not sudah_dimuat:
+        with _lock:
+            _catatan.setdefault(nama, time.perf_counter() - mulai)
+    return modul
+
+
+def laporan():
+    # Lama impor pertama (detik) per modul yang dimuat lewat impor(), terlama lebih dulu
+    with _lock:
+        return dict(sorted(_catatan.items(), key=lambda item: -item[1]))
+
+
+def ukur_cold_start(daftar_modul=MODUL_BERAT):
+    hasil = {}
+    for nama in daftar_modul:
+        kode = f"import time; t = time.perf_counter(); import {nama}; print(time.perf_counter() - t)"
+        proses = subprocess.run([sys.executable, "-c", kode], capture_output=True, text=True)
+        hasil[nama] = float(proses.stdout.strip().splitlines()[-1]) if proses.returncode == 0 else None
+    return hasil
+
+
+if __name__ == "__main__":
+    print(json.dumps({"python": sys.version.split()[0], "detik": ukur_cold_start()}, indent=2))